@@ -0,0 +1,73 @@
+"""Microbenchmark: Rects built per frame, and the cost of Game.check_collisions.
+
+Runs some of the suite's scenarios and counts every pygame.Rect the game
+code constructs, over whole frames and inside the collision pass alone.
+Rects that pygame hands back itself (from blit() and the like) are not
+counted. Run it on two trees to compare them.
+
+    python bench/collision_bench.py
+"""
+import copyreg
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pygame
+from suite import SCENARIOS, WARMUP_FRAMES, make_game, step
+
+SCENARIO_NAMES = ["gameplay-layer0", "static-circular-x5-layer4", "max-obstacles-drilling"]
+FRAMES = 600
+
+
+Rect = pygame.Rect
+
+
+class CountingRect(Rect):
+    created = 0
+
+    def __init__(self, *args):
+        CountingRect.created += 1
+        super().__init__(*args)
+
+    def __reduce__(self):
+        # Checkpoints only accept plain Rects
+        return copyreg.dispatch_table[Rect](self)
+
+
+def run(scenario):
+    random.seed(1)
+    game, keys, hook = make_game(scenario)
+    check_collisions = game.check_collisions
+    collisions = {"rects": 0, "seconds": 0.0}
+
+    def timed_check_collisions():
+        created = CountingRect.created
+        start = time.perf_counter()
+        check_collisions()
+        collisions["seconds"] += time.perf_counter() - start
+        collisions["rects"] += CountingRect.created - created
+    game.check_collisions = timed_check_collisions
+
+    for frame in range(WARMUP_FRAMES):
+        step(game, keys, hook, frame)
+    collisions.update(rects=0, seconds=0.0)
+    created = CountingRect.created
+    for frame in range(WARMUP_FRAMES, WARMUP_FRAMES + FRAMES):
+        step(game, keys, hook, frame)
+    return ((CountingRect.created - created) / FRAMES, collisions["rects"] / FRAMES,
+            collisions["seconds"] / FRAMES * 1e6)
+
+
+def main():
+    pygame.Rect = CountingRect
+    print(f"{'scenario':<28} {'rects/frame':>12} {'in collisions':>14} {'collisions us':>14}")
+    for name in SCENARIO_NAMES:
+        per_frame, in_collisions, collision_us = run(SCENARIOS[name])
+        print(f"{name:<28} {per_frame:>12.1f} {in_collisions:>14.1f} {collision_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
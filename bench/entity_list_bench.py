@@ -0,0 +1,63 @@
+"""Microbenchmark: list copy + list.remove versus EntityList swap-remove.
+
+Each tick iterates every entity and removes a fixed fraction of them, which is
+what Game.update and check_collisions do when many entities die in one frame.
+
+    python bench/entity_list_bench.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from zt_miner import EntityList
+
+ENTITY_COUNTS = [100, 500, 1000, 5000, 20000]
+REMOVE_FRACTION = 0.1
+
+
+class Entity:
+    def __init__(self, dead):
+        self.dead = dead
+
+
+def make_entities(count):
+    rng = random.Random(count)
+    return [Entity(rng.random() < REMOVE_FRACTION) for _ in range(count)]
+
+
+def tick_list(entities):
+    items = list(entities)
+    for entity in items[:]:
+        if entity.dead:
+            items.remove(entity)
+    return items
+
+
+def tick_entity_list(entities):
+    items = EntityList()
+    items.extend(entities)
+    for entity in items:
+        if entity.dead:
+            items.remove(entity)
+    items.flush()
+    return items
+
+
+def main():
+    print(f"{'entities':>10} {'list.remove ms':>15} {'EntityList ms':>15} {'speedup':>8}")
+    for count in ENTITY_COUNTS:
+        entities = make_entities(count)
+        assert len(tick_list(entities)) == len(tick_entity_list(entities))
+        repeats = max(3, 20000 // count)
+        list_ms = min(timeit.repeat(lambda: tick_list(entities), number=1, repeat=repeats)) * 1000
+        entity_list_ms = min(timeit.repeat(lambda: tick_entity_list(entities), number=1, repeat=repeats)) * 1000
+        print(f"{count:>10} {list_ms:>15.3f} {entity_list_ms:>15.3f} {list_ms / entity_list_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
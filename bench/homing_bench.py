@@ -0,0 +1,59 @@
+"""Microbenchmark: Enemy.move per enemy versus EnemyMovement's vectorized pass.
+
+Half the enemies are basic (drift), half aggressive (home in on the
+player). The looped enemies keep their own fields in a plain EntityList;
+the batched ones live in an EnemyList's arrays. Both paths are checked to
+produce exactly the same positions.
+
+    python bench/homing_bench.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from zt_miner import Enemy, EnemyList, EnemyMovement, EntityList
+
+ENEMY_COUNTS = [3, 10, 30, 100, 300, 1000]
+
+
+class Target:
+    x = 400
+    y = 500
+
+
+def make_enemies(count, enemies):
+    rng = random.Random(count)
+    for i in range(count):
+        enemies.append(Enemy(rng.uniform(0, 770), rng.uniform(-600, 600), ["basic", "aggressive"][i % 2], 0,
+                             rng.uniform(1, 3), rng.choice([-1, 1]), 100))
+    return enemies
+
+
+def tick_loop(enemies):
+    for enemy in enemies:
+        enemy.move(Target)
+
+
+def main():
+    print(f"{'enemies':>10} {'per enemy us':>13} {'batched us':>11} {'speedup':>8}")
+    for count in ENEMY_COUNTS:
+        loop_enemies = make_enemies(count, EntityList())
+        batch_enemies = make_enemies(count, EnemyList())
+        movement = EnemyMovement()
+        for _ in range(10):
+            tick_loop(loop_enemies)
+            movement.update(batch_enemies, Target)
+        assert [(e.x, e.y) for e in loop_enemies] == [(e.x, e.y) for e in batch_enemies]
+        repeats = max(20, 20000 // count)
+        loop_us = min(timeit.repeat(lambda: tick_loop(loop_enemies), number=1, repeat=repeats)) * 1e6
+        batch_us = min(timeit.repeat(lambda: movement.update(batch_enemies, Target), number=1, repeat=repeats)) * 1e6
+        print(f"{count:>10} {loop_us:>13.1f} {batch_us:>11.1f} {loop_us / batch_us:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
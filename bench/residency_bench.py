@@ -0,0 +1,63 @@
+"""Peak RSS of a full run with streaming backgrounds versus all layers preloaded.
+
+Each run starts a fresh interpreter, plays a seeded game through every
+layer (the player can't die, so it always reaches the surface) and reports
+resident memory after start-up and at its peak. With the baked bundle the
+layer images are mapped rather than decoded, so both sources are measured:
+
+    python bench/residency_bench.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Plays to the victory line, then prints "start-up KB peak KB" (Linux ru_maxrss is in KB)
+CHILD = r"""
+import os, random, resource, sys
+sys.path.insert(0, os.getcwd())
+import pygame
+import zt_miner
+if not {bundle!r}:
+    zt_miner.ASSET_BUNDLE_PATH = os.devnull
+random.seed(1)
+class Keys:
+    def __getitem__(self, key):
+        return key in (pygame.K_SPACE, pygame.K_x)
+pygame.key.get_pressed = Keys
+game = zt_miner.Game(zt_miner.GameConfig(seed=1, save_file=None, sound=False,
+                                         stream_backgrounds={streaming!r}))
+game.show_intro = game.show_conversation = False
+game.wait_for_assets()
+game.draw()
+startup = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+while not game.victory:
+    game.player.health = game.player.max_health
+    game.update()
+    game.draw()
+    pygame.display.flip()
+print(startup, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def peak_rss(bundle, streaming):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    output = subprocess.run([sys.executable, "-c", CHILD.format(bundle=bundle, streaming=streaming)],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    startup, peak = output.split()[-2:]
+    return int(startup) / 1024, int(peak) / 1024
+
+
+def main():
+    print(f"{'source':<8} {'backgrounds':<12} {'start-up MB':>12} {'peak MB':>9}")
+    for bundle in (True, False):
+        for streaming in (False, True):
+            startup, peak = peak_rss(bundle, streaming)
+            print(f"{'bundle' if bundle else 'png':<8} {'streamed' if streaming else 'preloaded':<12} "
+                  f"{startup:>12.1f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Frame times while the save store is written every frame.
+
+Compares a run without saving against the background writer and against
+writing the file on the main thread, using the same scripted input:
+
+    python bench/save_bench.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame
+import zt_miner
+
+FRAMES = 1500
+
+
+class ScriptedKeys:
+    """Stands in for pygame.key.get_pressed(): weave around and keep firing"""
+    def __init__(self):
+        self.frame = 0
+
+    def __getitem__(self, key):
+        direction = [pygame.K_LEFT, pygame.K_UP, pygame.K_RIGHT, pygame.K_DOWN][(self.frame // 40) % 4]
+        return key in (direction, pygame.K_SPACE)
+
+
+class SyncSaveStore(zt_miner.SaveStore):
+    """Writes on the caller's thread, as player_data.txt used to be written"""
+    def __init__(self, path):
+        super().__init__(None)
+        self.path = path
+
+    def mark_changed(self):
+        self.write(zt_miner.json.dumps(self.data, indent=1))
+
+
+def run(store):
+    keys = ScriptedKeys()
+    pygame.key.get_pressed = lambda: keys
+    game = zt_miner.Game(zt_miner.GameConfig(scale=1, seed=1, save_file=None))
+    if store:
+        game.save_store = store
+    game.show_intro = game.show_conversation = False
+    game.wait_for_assets()
+
+    times = []
+    for frame in range(FRAMES):
+        keys.frame = frame
+        start = time.perf_counter()
+        game.player.health = game.player.max_health  # Keep the run going
+        game.update()
+        if store:
+            store.record_layer(frame % 5, frame, frame)  # A save every frame, far more than the game makes
+        game.draw()
+        times.append((time.perf_counter() - start) * 1000)
+    if store:
+        store.close()
+    return sorted(times)
+
+
+def report(name, times, writes=None):
+    p99 = times[int(len(times) * 0.99)]
+    line = f"{name:<22} median {times[len(times) // 2]:6.3f} ms   p99 {p99:6.3f} ms   max {times[-1]:6.3f} ms"
+    if writes is not None:
+        line += f"   {writes} file writes"
+    print(line)
+
+
+def main():
+    pygame.display.init()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "save.json")
+        report("No saving", run(None))
+        store = zt_miner.SaveStore(path)
+        report("Background writer", run(store), store.writes)
+        store = SyncSaveStore(path)
+        report("Main-thread writes", run(store), store.writes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Time to first frame with and without the baked asset bundle.
+
+Every run starts a fresh interpreter so image decoding is measured cold:
+
+    python zt_miner.py --bake          # write res/assets.bundle first
+    python bench/startup_bench.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+RUNS = 5
+
+# Builds a Game and draws one frame, then prints milliseconds since interpreter start
+CHILD = r"""
+import time
+start = time.perf_counter()
+import os, sys
+sys.path.insert(0, os.getcwd())
+import pygame
+import zt_miner
+zt_miner.ASSET_BUNDLE_PATH = {bundle!r}
+zt_miner.ATLAS_CACHE_DIR = {cache!r}
+game = zt_miner.Game()
+game.draw()
+pygame.display.flip()
+print((time.perf_counter() - start) * 1000)
+"""
+
+def time_to_first_frame(bundle, cache=None):
+    if cache is None:
+        # A fresh, empty atlas cache for every run
+        with tempfile.TemporaryDirectory() as empty_cache:
+            return time_to_first_frame(bundle, empty_cache)
+
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    output = subprocess.run([sys.executable, "-c", CHILD.format(bundle=bundle, cache=cache)],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    bundle = os.path.join("res", "assets.bundle")
+    if not os.path.exists(os.path.join(ROOT, bundle)):
+        sys.exit("res/assets.bundle not found; run `python zt_miner.py --bake` first")
+    
+    with tempfile.TemporaryDirectory() as warm_cache:
+        time_to_first_frame("missing.bundle", warm_cache)  # Fill the atlas cache
+        scenarios = {
+            "PNG decode + scale (no caches)": lambda: time_to_first_frame("missing.bundle"),
+            "Atlas cache, PNG backgrounds": lambda: time_to_first_frame("missing.bundle", warm_cache),
+            "Asset bundle": lambda: time_to_first_frame(bundle),
+        }
+        for name, run in scenarios.items():
+            times = [run() for _ in range(RUNS)]
+            print(f"{name:<32} median {statistics.median(times):7.1f} ms   min {min(times):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Headless benchmark suite: named stress scenarios driven through Game.
+
+Each scenario sets up a Game, then runs it frame by frame with scripted
+input, timing update() and draw() (including the flip) separately. A
+second, shorter pass under tracemalloc measures allocations per frame:
+the peak of short-lived Python allocations within a frame, and the net
+change in live memory blocks (anything above zero is retained memory).
+Only Python allocations are traced; SDL surface pixel buffers are not.
+The same pass counts every pygame Surface created per frame with
+zt_miner.SurfaceTracker, which is how steady-state frames are kept free
+of Surface allocations.
+
+    python bench/suite.py                      # run everything, write bench/results.json
+    python bench/suite.py outro-typewriter     # run some scenarios
+    python bench/suite.py --save-baseline      # store these results as the baseline
+    python bench/suite.py --baseline bench/baseline.json --threshold 0.2
+
+With a baseline, the mean and p95 times of every scenario are compared
+against it and the script exits with status 1 if any got slower by more
+than the threshold or creates more Surface bytes per frame than before.
+Baselines are only comparable on the same machine, so record a fresh one
+before starting on a change.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame
+import zt_miner
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+WARMUP_FRAMES = 60
+ALLOC_FRAMES = 200
+NOISE_FLOOR_MS = 0.05  # Smaller slowdowns are never reported as regressions
+SURFACE_SLACK_KB = 1.0  # New Surfaces per frame allowed above the baseline
+
+
+class ScriptedKeys:
+    """Stands in for pygame.key.get_pressed(): weave around, firing and drilling as asked"""
+    def __init__(self, fire=True, drill=False):
+        self.frame = 0
+        self.held = {pygame.K_SPACE} if fire else set()
+        if drill:
+            self.held.add(pygame.K_x)
+
+    def __getitem__(self, key):
+        direction = [pygame.K_LEFT, pygame.K_UP, pygame.K_RIGHT, pygame.K_DOWN][(self.frame // 40) % 4]
+        return key == direction or key in self.held
+
+
+class Scenario:
+    def __init__(self, name, setup, scale=1, fire=True, drill=False):
+        self.name = name
+        self.setup = setup  # setup(game) -> per-frame hook(game) or None
+        self.scale = scale
+        self.fire = fire
+        self.drill = drill
+
+
+SCENARIOS = {}
+
+
+def scenario(name, **options):
+    def register(setup):
+        SCENARIOS[name] = Scenario(name, setup, **options)
+        return setup
+    return register
+
+
+def quiet_levels(game):
+    """Stop timeline spawns so a scenario controls what is in the world"""
+    for timeline in game.levels:
+        timeline.events = []
+    game.rewind_timeline()
+
+
+def enter_layer(game, layer, progress=0):
+    game.world.clear()
+    game.current_layer = layer
+    game.layer_progress = progress
+    game.world_y = layer * game.layer_height + progress
+
+
+@scenario("gameplay-layer0")
+def gameplay(game):
+    return None
+
+
+@scenario("static-circular-x5-layer4", fire=False)
+def static_circular(game):
+    quiet_levels(game)
+    enter_layer(game, 4)
+
+    def hook(game):
+        game.layer_progress = 0  # Never reach the victory line
+        while len(game.static_enemies) < 5:
+            x = 60 + len(game.static_enemies) * 150
+            game.static_enemies.append(zt_miner.StaticEnemy(x, 80, "circular", 4))
+        for static_enemy in game.static_enemies:
+            static_enemy.y = 80  # Hold them on screen
+    return hook
+
+
+@scenario("blend-mantle-lower-crust")
+def blend_zone(game):
+    quiet_levels(game)
+    progress = game.layer_height - game.background_manager.blend_zone_height // 2
+    enter_layer(game, 1, progress)
+
+    def hook(game):
+        game.layer_progress = progress  # Stay in the middle of the crossfade
+    return hook
+
+
+@scenario("max-obstacles-drilling", drill=True)
+def obstacles_drilling(game):
+    quiet_levels(game)
+    enter_layer(game, 2)
+    rng = random.Random(0)
+    types = ["basic", "crystal", "reinforced"]
+
+    def hook(game):
+        game.layer_progress = 0
+        while len(game.obstacles) < 14:
+            width = rng.randint(80, 260)
+            game.obstacles.append(game.obstacle_pool.acquire(
+                rng.randint(0, zt_miner.SCREEN_WIDTH - width), rng.randint(-100, zt_miner.SCREEN_HEIGHT - 150),
+                width, rng.randint(40, 70), 2, rng.choice(types)))
+    return hook
+
+
+@scenario("particles-20k", fire=False)
+def particles(game):
+    quiet_levels(game)
+    enter_layer(game, 0)
+    particles = game.particles
+    rng = random.Random(0)
+    while particles.live < particles.capacity:
+        x, y = rng.randrange(zt_miner.SCREEN_WIDTH), rng.randrange(zt_miner.SCREEN_HEIGHT)
+        particles.emit(x, y, 500, rng.choice([zt_miner.YELLOW, zt_miner.ORANGE, zt_miner.WHITE]),
+                       life=(5, 60))
+
+    def hook(game):
+        # Top the system back up to its cap and wrap stragglers onto the screen
+        game.layer_progress = 0
+        if particles.live < particles.capacity:
+            particles.emit(rng.randrange(zt_miner.SCREEN_WIDTH), rng.randrange(zt_miner.SCREEN_HEIGHT),
+                           particles.capacity - particles.live, zt_miner.RED, life=(5, 60))
+        particles.x %= zt_miner.SCREEN_WIDTH
+        particles.y %= zt_miner.SCREEN_HEIGHT
+    return hook
+
+
+@scenario("scaled-4x", scale=4)
+def scaled(game):
+    return None
+
+
+@scenario("outro-typewriter", fire=False)
+def outro(game):
+    game.show_outro = True
+    game.outro_scene = zt_miner.OutroScene()
+
+    def hook(game):
+        scene = game.outro_scene
+        if scene.line_complete:
+            # Keep typing: move on to the next line, looping over the dialogue
+            scene.next_line()
+            scene.current_line %= len(scene.dialogue)
+    return hook
+
+
+def make_game(scenario):
+    keys = ScriptedKeys(scenario.fire, scenario.drill)
+    pygame.key.get_pressed = lambda: keys
+    game = zt_miner.Game(zt_miner.GameConfig(scale=scenario.scale, seed=1, save_file=None))
+    game.show_intro = game.show_conversation = False
+    game.wait_for_assets()
+    hook = scenario.setup(game)
+    return game, keys, hook
+
+
+def step(game, keys, hook, frame):
+    """Run one frame; returns (update ms, draw ms)"""
+    keys.frame = frame
+    if hook:
+        hook(game)
+    game.player.health = game.player.max_health  # Keep every run going
+    start = time.perf_counter()
+    game.update()
+    updated = time.perf_counter()
+    game.draw()
+    pygame.display.flip()
+    drawn = time.perf_counter()
+    return (updated - start) * 1000, (drawn - updated) * 1000
+
+
+def summarize(times):
+    times = sorted(times)
+    def percentile(p):
+        return times[min(len(times) - 1, int(len(times) * p))]
+    return {"mean": sum(times) / len(times), "p95": percentile(0.95), "p99": percentile(0.99)}
+
+
+def run_scenario(scenario, frames):
+    random.seed(1)
+    game, keys, hook = make_game(scenario)
+    for frame in range(WARMUP_FRAMES):
+        step(game, keys, hook, frame)
+    update_times = []
+    draw_times = []
+    for frame in range(WARMUP_FRAMES, WARMUP_FRAMES + frames):
+        update_ms, draw_ms = step(game, keys, hook, frame)
+        update_times.append(update_ms)
+        draw_times.append(draw_ms)
+
+    # Allocation pass on a fresh game: tracemalloc and the Surface tracker slow everything down
+    random.seed(1)
+    surfaces = zt_miner.SurfaceTracker(max_reports=0)
+    surfaces.install()
+    game, keys, hook = make_game(scenario)
+    for frame in range(WARMUP_FRAMES):
+        step(game, keys, hook, frame)
+    surfaces.discard_frame()
+    tracemalloc.start()
+    peak_bytes = 0
+    surface_count = 0
+    surface_bytes = 0
+    blocks_before = sys.getallocatedblocks()
+    for frame in range(WARMUP_FRAMES, WARMUP_FRAMES + ALLOC_FRAMES):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        step(game, keys, hook, frame)
+        peak_bytes += tracemalloc.get_traced_memory()[1] - current
+        count, size = surfaces.end_frame(frame)
+        surface_count += count
+        surface_bytes += size
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+    surfaces.uninstall()
+
+    return {
+        "frames": frames,
+        "update_ms": summarize(update_times),
+        "draw_ms": summarize(draw_times),
+        "alloc_peak_kb_per_frame": peak_bytes / ALLOC_FRAMES / 1024,
+        "net_blocks_per_frame": (blocks_after - blocks_before) / ALLOC_FRAMES,
+        "surfaces_per_frame": surface_count / ALLOC_FRAMES,
+        "surface_kb_per_frame": surface_bytes / ALLOC_FRAMES / 1024,
+        "surface_frames": surfaces.flagged,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print the change against the baseline; return the regressed metrics"""
+    regressions = []
+    for name, result in results["scenarios"].items():
+        if name not in baseline["scenarios"]:
+            continue
+        base = baseline["scenarios"][name]
+        for phase in ("update_ms", "draw_ms"):
+            for stat in ("mean", "p95"):
+                now, before = result[phase][stat], base[phase][stat]
+                change = (now - before) / before if before else 0.0
+                flag = ""
+                if change > threshold and now - before > NOISE_FLOOR_MS:
+                    flag = "  REGRESSION"
+                    regressions.append(f"{name} {phase} {stat}")
+                print(f"  {name:<28} {phase[:-3]:<6} {stat:<4} {before:8.3f} -> {now:8.3f} ms "
+                      f"({change:+.0%}){flag}")
+        # New Surfaces per frame must not creep back in: any growth fails
+        if "surface_kb_per_frame" in base:
+            now, before = result["surface_kb_per_frame"], base["surface_kb_per_frame"]
+            flag = ""
+            if now > before + SURFACE_SLACK_KB:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} surfaces")
+            print(f"  {name:<28} surfaces    {before:8.1f} -> {now:8.1f} KB/frame{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless benchmark scenarios")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", type=int, default=600, help="timed frames per scenario")
+    parser.add_argument("--out", default=DEFAULT_RESULTS, help="where to write the results JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help=f"also write the results to {os.path.relpath(DEFAULT_BASELINE, ROOT)}")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown that counts as a regression (default 0.15)")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+
+    pygame.display.init()
+    results = {
+        "meta": {"python": platform.python_version(), "pygame": pygame.version.ver,
+                 "platform": platform.platform(), "time": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "scenarios": {},
+    }
+    for name in args.scenarios or SCENARIOS:
+        result = run_scenario(SCENARIOS[name], args.frames)
+        results["scenarios"][name] = result
+        update, draw = result["update_ms"], result["draw_ms"]
+        print(f"{name:<28} update {update['mean']:6.3f}/{update['p95']:6.3f}/{update['p99']:6.3f}  "
+              f"draw {draw['mean']:6.3f}/{draw['p95']:6.3f}/{draw['p99']:6.3f} ms (mean/p95/p99)  "
+              f"alloc {result['alloc_peak_kb_per_frame']:7.1f} KB  blocks {result['net_blocks_per_frame']:+.1f}  "
+              f"surfaces {result['surfaces_per_frame']:.2f}/frame in {result['surface_frames']} frames "
+              f"({result['surface_kb_per_frame']:.1f} KB/frame)")
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=1)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Cost of per-frame telemetry relative to the frame it records.
+
+Plays the same scripted run with and without a TelemetryWriter and times
+the record calls themselves, which are the only work added to a frame.
+With the dummy video driver a frame costs far less than it does on screen,
+so the share of measured frame time is a pessimistic upper bound:
+
+    python bench/telemetry_bench.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame
+import zt_miner
+
+FRAMES = 3000
+
+
+class ScriptedKeys:
+    """Stands in for pygame.key.get_pressed(): weave around and keep firing"""
+    def __init__(self):
+        self.frame = 0
+
+    def __getitem__(self, key):
+        direction = [pygame.K_LEFT, pygame.K_UP, pygame.K_RIGHT, pygame.K_DOWN][(self.frame // 40) % 4]
+        return key in (direction, pygame.K_SPACE)
+
+
+def run(telemetry_file):
+    """Return (total frame ms, ms spent recording telemetry)"""
+    keys = ScriptedKeys()
+    pygame.key.get_pressed = lambda: keys
+    game = zt_miner.Game(zt_miner.GameConfig(scale=1, seed=1, save_file=None,
+                                             telemetry_file=telemetry_file))
+    game.show_intro = game.show_conversation = False
+    game.wait_for_assets()
+
+    total = recording = 0.0
+    for frame in range(FRAMES):
+        keys.frame = frame
+        start = time.perf_counter()
+        game.player.health = game.player.max_health  # Keep the run going
+        game.update()
+        game.draw()
+        pygame.display.flip()
+        frame_ms = (time.perf_counter() - start) * 1000
+        if game.telemetry:
+            record_start = time.perf_counter()
+            game.record_telemetry(frame, frame_ms)
+            recording += (time.perf_counter() - record_start) * 1000
+        total += (time.perf_counter() - start) * 1000
+    if game.telemetry:
+        game.telemetry.close()
+    return total, recording
+
+
+def main():
+    pygame.display.init()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.ztl")
+        plain, _ = run(None)
+        logged, recording = run(path)
+        fields, record_struct, records = zt_miner.read_telemetry(path)
+        count = len(records) // record_struct.size
+
+    print(f"Without telemetry   {plain / FRAMES:.3f} ms/frame")
+    print(f"With telemetry      {logged / FRAMES:.3f} ms/frame")
+    print(f"record() per frame  {recording / FRAMES * 1000:.2f} us "
+          f"= {recording / logged * 100:.2f}% of measured frame time, "
+          f"{recording / FRAMES / (1000 / zt_miner.FPS) * 100:.3f}% of a {1000 / zt_miner.FPS:.1f} ms frame")
+    print(f"{count} records of {record_struct.size} bytes, {len(fields)} fields")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,32 @@ import math
 import json
 import os
 import argparse
+import sys
+from collections import OrderedDict, deque
+import mmap
+import io
+import pickle
+import struct
+import threading
+import queue
+import zlib
+import time
 
-# Parse command line arguments
-parser = argparse.ArgumentParser(description='ZT Miner - Chapter I: The Escape')
-parser.add_argument('--scale', type=int, choices=[1, 2, 4], default=1,
-                    help='Scale factor for the game window (1, 2, or 4)')
-args = parser.parse_args()
+try:
+    import numpy as np
+except ImportError:  # The game runs without particle effects
+    np = None
 
-# Initialize Pygame
-pygame.init()
+START_TIME = time.perf_counter()
 
 # Constants
 BASE_WIDTH = 800
 BASE_HEIGHT = 600
-SCALE_FACTOR = args.scale
 SCREEN_WIDTH = BASE_WIDTH
 SCREEN_HEIGHT = BASE_HEIGHT
 FPS = 60
+LAYER_HEIGHT = 3000  # World pixels scrolled per layer
+SCROLL_SPEED = 2
 
 # Colors
 BLACK = (0, 0, 0)
@@ -47,45 +56,551 @@ LAYER_THEMES = {
     4: {"name": "Ice", "bg_color": (135, 206, 235), "enemy_color": RED, "obstacle_color": (100, 100, 100), "static_enemy_color": PURPLE}
 }
 
+# Sprites packed into the texture atlas: name -> (file, (width, height)).
+# A width of None keeps the image's aspect ratio.
+SPRITE_FILES = {
+    "ship-body": ("res/ship-body.png", (40, 60)),
+    "ship-nose": ("res/ship-nose.png", (40, 15)),  # Full ship width, 25% of its height
+    "enemy-flying": ("res/enemy-flying.png", (None, 70)),
+    "static-enemy": ("res/static-enemy.png", (50, 50)),
+}
+ATLAS_CACHE_DIR = "cache"
+ATLAS_VERSION = 1  # Bump when the baked primitives change so cached atlases are rebuilt
+
+# Background layer images, one per layer
+LAYER_FILES = [
+    "res/layer1.png",  # Core
+    "res/layer2.png",  # Mantle
+    "res/layer3.png",  # Lower Crust
+    "res/layer4.png",  # Upper Crust
+    "res/layer6.png"   # Surface (using layer6 for layer 5)
+]
+
+# Per-layer music, streamed while the layer is played
+LAYER_MUSIC = [
+    "res/music/layer1.ogg",  # Core
+    "res/music/layer2.ogg",  # Mantle
+    "res/music/layer3.ogg",  # Lower crust
+    "res/music/layer4.ogg",  # Upper crust
+    "res/music/layer6.ogg"   # Surface
+]
+
+# Sound effects: name -> (file, priority, most voices at once, synthesized
+# stand-in used when the file is missing: (wave, start Hz, end Hz, seconds, volume))
+SOUND_CHANNELS = 16
+SOUND_EFFECTS = {
+    "player_shot": ("res/sfx/player-shot.wav", 1, 2, ("square", 880, 440, 0.06, 0.2)),
+    "enemy_shot": ("res/sfx/enemy-shot.wav", 0, 4, ("square", 330, 220, 0.05, 0.12)),
+    "hit": ("res/sfx/hit.wav", 2, 3, ("noise", 0, 0, 0.05, 0.25)),
+    "drill": ("res/sfx/drill.wav", 1, 1, ("noise", 0, 0, 0.08, 0.15)),
+    "explosion": ("res/sfx/explosion.wav", 3, 4, ("noise", 0, 0, 0.35, 0.45)),
+    "player_hit": ("res/sfx/player-hit.wav", 4, 1, ("square", 220, 110, 0.2, 0.35)),
+    "heal": ("res/sfx/heal.wav", 4, 1, ("sine", 440, 880, 0.3, 0.35)),
+    "note": ("res/sfx/note.wav", 5, 1, ("sine", 660, 1320, 0.6, 0.4)),
+}
+
+# Particle effects: a hard cap on live particles (the oldest are recycled first),
+# the age at which they shrink to the small stamp, and the stamps themselves
+# ("#" bright core, "+" particle colour, "." transparent)
+PARTICLE_CAPACITY = 20000
+PARTICLE_FADE = 10
+PARTICLE_STAMPS = [
+    (3, [".+.",
+         "+#+",
+         ".+."]),
+    (1, ["+"]),
+]
+
+# How fast each layer's background scrolls relative to the world; below 1.0
+# it lags behind as if further away (parallax)
+LAYER_DEPTHS = [1.0, 1.0, 1.0, 1.0, 1.0]
+
+# Streaming backgrounds: once this fraction of a layer has scrolled by, the
+# next layer starts decoding on a worker thread
+BACKGROUND_PREFETCH = 0.5
+
+# Bytes of cached surfaces and assets kept before the least recently used are evicted
+MEMORY_BUDGET = 32 * 1024 * 1024
+
+# Drawing features the QualityGovernor may switch off, in the order it drops them
+QUALITY_FEATURES = ["particles", "blend", "damage_overlays", "health_bars", "tint_flashes"]
+
+# Scores, best times and settings kept between sessions
+SAVE_FILE = "save.json"
+
+# Per-frame telemetry written with --telemetry. Each record is these fields
+# followed by one unsigned short entity count per World group.
+TELEMETRY_MAGIC = b"ZTTL"
+TELEMETRY_VERSION = 1
+TELEMETRY_FIELDS = ("frame", "frame_ms", "collision_tests", "score", "layer", "health", "quality")
+TELEMETRY_FORMAT = "<IfIiBhB"
+
+# Checkpoint files written with --checkpoint
+CHECKPOINT_MAGIC = b"ZTCK"
+CHECKPOINT_VERSION = 4
+
+# Obstacle formations spawned by the level timelines
+FORMATION_FILE = "res/formations.json"
+
+# Pre-scaled pixel data written by `zt_miner.py --bake`
+ASSET_BUNDLE_PATH = "res/assets.bundle"
+
+class AnimationClip:
+    """Frames of a looping animation rendered once and shared by every instance.
+    
+    All frames are regions of one sheet surface (normally the texture atlas).
+    """
+    def __init__(self, sheet, areas, anchor=(0, 0)):
+        self.sheet = sheet
+        self.areas = areas
+        self.anchor = anchor  # Point in each frame that lands on the drawn position
+        self.width = areas[0].width
+        self.height = areas[0].height
+    
+    @staticmethod
+    def render(frame_count, size, render_frame):
+        """Render render_frame(surface, index) into frame_count transparent surfaces"""
+        frames = []
+        for index in range(frame_count):
+            frame = pygame.Surface(size, pygame.SRCALPHA)
+            render_frame(frame, index)
+            frames.append(frame)
+        return frames
+    
+    def draw(self, surface, index, x, y):
+        area = self.areas[index % len(self.areas)]
+        surface.blit(self.sheet, (x - self.anchor[0], y - self.anchor[1]), area)
+
+class MemoryBudget:
+    """One byte budget shared by every cache of surfaces and assets.
+    
+    Caches register under a name and provide:
+        memory_bytes   bytes held right now
+        rebuild_cost   rough cost of recreating an entry (1 = rendering a line of text)
+        candidate()    (key, last used tick, bytes) of the entry it would give up next, or None
+        evict(key)     drop that entry
+    A cache calls enforce() after it grows, and entries are then evicted
+    across all caches until the total fits. The "lru" policy evicts the least
+    recently used entry anywhere, "cost" the one that frees the most bytes
+    per unit of rebuild cost. Caches never offer entries in use (the one just
+    returned, backgrounds on screen), so the total can stay over budget when
+    everything left is pinned.
+    """
+    def __init__(self, max_bytes=MEMORY_BUDGET, policy="lru"):
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.caches = {}
+        self.clock = 0  # Bumped on every use, for least-recently-used order
+        self.evictions = 0
+    
+    def register(self, name, cache):
+        self.caches[name] = cache
+        return cache
+    
+    def unregister(self, name):
+        self.caches.pop(name, None)
+    
+    def evict(self, cache, key):
+        """Drop an entry its cache no longer needs, counted with the budget's own evictions"""
+        cache.evict(key)
+        self.evictions += 1
+    
+    def tick(self):
+        self.clock += 1
+        return self.clock
+    
+    def usage(self):
+        """Bytes held by each registered cache"""
+        return {name: cache.memory_bytes for name, cache in self.caches.items()}
+    
+    def total(self):
+        return sum(cache.memory_bytes for cache in self.caches.values())
+    
+    def enforce(self):
+        total = self.total()
+        while total > self.max_bytes:
+            victim = None
+            best = None
+            for cache in self.caches.values():
+                candidate = cache.candidate()
+                if candidate is None:
+                    continue
+                key, last_used, size = candidate
+                score = last_used if self.policy == "lru" else -size / cache.rebuild_cost
+                if best is None or score < best:
+                    best = score
+                    victim = (cache, key, size)
+            if victim is None:
+                return  # Everything left is in use
+            cache, key, size = victim
+            cache.evict(key)
+            total -= size
+            self.evictions += 1
+    
+    def report(self):
+        print(f"Memory: {self.total() / 1048576:.1f} of {self.max_bytes / 1048576:.1f} MB in use, "
+              f"{self.evictions} evictions ({self.policy})")
+        for name, size in self.usage().items():
+            print(f"  {name:<12} {size / 1048576:8.2f} MB")
+
+MEMORY = MemoryBudget()
+
+class TextureAtlas:
+    """Many small images packed into one surface, addressed by a region table"""
+    def __init__(self, surface, regions):
+        self.surface = surface
+        self.regions = regions  # name -> pygame.Rect
+    
+    @property
+    def memory_bytes(self):
+        return self.surface.get_pitch() * self.surface.get_height()
+    
+    def candidate(self):
+        return None  # Every sprite is drawn from it
+    
+    @classmethod
+    def pack(cls, images, max_width=1024, padding=1):
+        """Shelf-pack a dict of name -> surface, tallest images first"""
+        regions = {}
+        x = y = shelf_height = 0
+        for name, image in sorted(images.items(), key=lambda item: -item[1].get_height()):
+            width, height = image.get_size()
+            if x + width > max_width:
+                # Start a new shelf below the current one
+                x = 0
+                y += shelf_height + padding
+                shelf_height = 0
+            regions[name] = pygame.Rect(x, y, width, height)
+            x += width + padding
+            shelf_height = max(shelf_height, height)
+        
+        surface = pygame.Surface((max_width, max(1, y + shelf_height)), pygame.SRCALPHA)
+        for name, image in images.items():
+            surface.blit(image, regions[name])
+        return cls(surface, regions)
+    
+    def clip(self, name, frame_count=1, anchor=(0, 0)):
+        """Return an AnimationClip over the regions name (or name/0, name/1, ...)"""
+        names = [name] if frame_count == 1 else [f"{name}/{index}" for index in range(frame_count)]
+        if any(frame_name not in self.regions for frame_name in names):
+            return None
+        return AnimationClip(self.surface, [self.regions[frame_name] for frame_name in names], anchor)
+    
+    def save(self, image_path, table_path, stamp):
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        pygame.image.save(self.surface, image_path)
+        with open(table_path, "w") as f:
+            json.dump({"stamp": stamp,
+                       "regions": {name: list(rect) for name, rect in self.regions.items()}}, f)
+    
+    @classmethod
+    def load(cls, image_path, table_path, stamp):
+        """Load a saved atlas, or return None if it is missing or out of date"""
+        try:
+            with open(table_path, "r") as f:
+                table = json.load(f)
+            if table["stamp"] != stamp:
+                return None
+            surface = pygame.image.load(image_path).convert_alpha()
+        except (OSError, ValueError, KeyError, pygame.error):
+            return None
+        return cls(surface, {name: pygame.Rect(region) for name, region in table["regions"].items()})
+
+class EntityList:
+    """Unordered entity container with O(1) removal.
+    
+    remove() only marks an entity; flush() swap-removes the marked entities at
+    the end of the tick. Loops can therefore remove entities while iterating
+    without copying the list, and iteration skips anything already removed.
+    The entity objects themselves are the stable handles - an entity may only
+    belong to one EntityList at a time. If given, recycle is called with each
+    entity once it has been flushed out of the list. version changes whenever
+    an entity is added or flushed out, so per-slot data derived from items
+    can tell when it is stale.
+    """
+    def __init__(self, recycle=None):
+        self.items = []
+        self.pending = []
+        self.recycle = recycle
+        self.version = 0
+    
+    def __iter__(self):
+        for entity in self.items:
+            if not entity.removed:
+                yield entity
+    
+    def __len__(self):
+        return len(self.items) - len(self.pending)
+    
+    def append(self, entity):
+        entity.slot = len(self.items)
+        entity.removed = False
+        self.items.append(entity)
+        self.version += 1
+    
+    def extend(self, entities):
+        for entity in entities:
+            self.append(entity)
+    
+    def remove(self, entity):
+        if not entity.removed:
+            entity.removed = True
+            self.pending.append(entity)
+    
+    def flush(self):
+        items = self.items
+        for entity in self.pending:
+            # Move the last entity into the freed slot
+            last = items.pop()
+            if last is not entity:
+                items[entity.slot] = last
+                self.move_slot(len(items), entity.slot)
+                last.slot = entity.slot
+        if self.recycle:
+            for entity in self.pending:
+                self.recycle(entity)
+        if self.pending:
+            self.version += 1
+        self.pending.clear()
+    
+    def clear(self):
+        self.items.clear()
+        self.pending.clear()
+        self.version += 1
+    
+    def move_slot(self, source, target):
+        """Per-slot data kept by a subclass follows an entity from source to target"""
+
+class EnemyList(EntityList):
+    """EntityList that keeps its enemies' movement fields in arrays.
+    
+    The arrays are the source of truth: while an enemy is in the list, its
+    EnemyField attributes (x, y, speed, direction) read and write its row,
+    so EnemyMovement moves the whole group in place. Rows follow the swap
+    removal in flush(), and an enemy leaving the list takes its values
+    with it. Without NumPy the enemies just keep their own fields.
+    """
+    FIELDS = ("x", "y", "speed", "direction")
+    
+    def __init__(self, capacity=16):
+        super().__init__()
+        self.arrays = None
+        if np is not None:
+            for name in self.FIELDS:
+                setattr(self, name, np.zeros(capacity))
+            self.arrays = [getattr(self, name) for name in self.FIELDS]
+    
+    def append(self, enemy):
+        super().append(enemy)
+        if self.arrays is None:
+            return
+        if enemy.slot == len(self.arrays[0]):
+            # Double the rows, keeping the ones in use
+            for name, array in zip(self.FIELDS, self.arrays):
+                setattr(self, name, np.concatenate([array, np.zeros(len(array))]))
+            self.arrays = [getattr(self, name) for name in self.FIELDS]
+        enemy.set_group(self)
+    
+    def flush(self):
+        if self.arrays is not None:
+            for enemy in self.pending:
+                enemy.set_group(None)
+        super().flush()
+    
+    def clear(self):
+        if self.arrays is not None:
+            for enemy in self.items:
+                enemy.set_group(None)
+        super().clear()
+    
+    def move_slot(self, source, target):
+        if self.arrays is not None:
+            for array in self.arrays:
+                array[target] = array[source]
+
+class Archetype:
+    """Components shared by one group of entities in the World.
+    
+    Every entity has a position (x, y) and a hitbox: one Rect of its own
+    that get_rect() moves in place to the current position, so reading a
+    hitbox never allocates. The arguments switch on the systems that process the whole group:
+        batch_update      behaviour callback run once per tick with the whole group, before update
+        update            behaviour callback run once per entity per tick
+        velocity          entities move by (vel_x, vel_y) every tick
+        scrolls           entities move down with the world scroll
+        bounds            (left, top, right, bottom) area outside which entities are culled
+        drawn             entities are drawn by World.draw (in registration order)
+        bullet_damage     damage taken from a player bullet, None if bullets pass through
+        drill_damage      damage taken from the drill, None if it cannot be drilled
+        on_destroyed      called with an entity killed by a bullet or the drill
+        contact_damage    damage dealt to the player on contact
+        contact_priority  order in which contacts with the player resolve, None for no contact
+        contact_consumes  "always" or "on_damage" if the entity is removed on contact
+        drill_shields     destructible entities don't hurt the player while drilling
+        on_contact        called with an entity the player touches
+    """
+    def __init__(self, name, entities=None, batch_update=None, update=None, velocity=False, scrolls=True,
+                 bounds=(-math.inf, -math.inf, math.inf, SCREEN_HEIGHT + 50), drawn=True,
+                 bullet_damage=None, drill_damage=None, on_destroyed=None,
+                 contact_damage=0, contact_priority=None, contact_consumes=None,
+                 drill_shields=False, on_contact=None):
+        self.name = name
+        self.entities = entities if entities is not None else EntityList()
+        self.batch_update = batch_update
+        self.update = update
+        self.velocity = velocity
+        self.scrolls = scrolls
+        self.bounds = bounds
+        self.drawn = drawn
+        self.bullet_damage = bullet_damage
+        self.drill_damage = drill_damage
+        self.on_destroyed = on_destroyed
+        self.contact_damage = contact_damage
+        self.contact_priority = contact_priority
+        self.contact_consumes = contact_consumes
+        self.drill_shields = drill_shields
+        self.on_contact = on_contact
+        self.hitboxes = []  # Hitbox of every slot in entities.items, for Rect.collidelist
+        self.hitboxes_version = -1
+
+class World:
+    """Entity groups plus the systems that process all of them in bulk.
+    
+    A new kind of entity only needs an Archetype; scrolling, culling,
+    drawing and collisions then run over it without new loops.
+    """
+    def __init__(self):
+        self.archetypes = []
+        self.groups = {}
+        self.shootable = []
+        self.drillable = []
+        self.hazards = []
+        self.colliders = []  # Archetypes with a collision role, in registration order
+    
+    def register(self, archetype):
+        self.archetypes.append(archetype)
+        self.groups[archetype.name] = archetype.entities
+        if archetype.bullet_damage is not None:
+            self.shootable.append(archetype)
+        if archetype.drill_damage is not None:
+            self.drillable.append(archetype)
+        if archetype.contact_priority is not None:
+            self.hazards.append(archetype)
+            self.hazards.sort(key=lambda hazard: hazard.contact_priority)
+        if archetype in self.shootable or archetype in self.drillable or archetype in self.hazards:
+            self.colliders.append(archetype)
+        return archetype.entities
+    
+    def update(self, scroll_speed):
+        # Behaviour
+        for archetype in self.archetypes:
+            if archetype.batch_update:
+                archetype.batch_update(archetype.entities)
+            if archetype.update:
+                update = archetype.update
+                for entity in archetype.entities:
+                    update(entity)
+        
+        # Velocity
+        for archetype in self.archetypes:
+            if archetype.velocity:
+                for entity in archetype.entities:
+                    entity.x += entity.vel_x
+                    entity.y += entity.vel_y
+        
+        # Scroll with the world
+        for archetype in self.archetypes:
+            if archetype.scrolls:
+                for entity in archetype.entities:
+                    entity.y += scroll_speed
+        
+        # Cull everything that left its bounds
+        for archetype in self.archetypes:
+            left, top, right, bottom = archetype.bounds
+            entities = archetype.entities
+            for entity in entities:
+                if not (left <= entity.x <= right and top <= entity.y <= bottom):
+                    entities.remove(entity)
+    
+    def sync_hitboxes(self):
+        """Move every collider's hitbox to its entity's position; hits() and
+        first_hit() test against the hitboxes as of the last call.
+
+        The hitbox list itself is only rebuilt when entities were added or
+        flushed out; between those it holds the same Rects, updated in place.
+        Removed-but-not-flushed entities keep their slot, so an index from
+        collidelist maps straight back to entities.items.
+        """
+        for archetype in self.colliders:
+            entities = archetype.entities
+            if archetype.hitboxes_version != entities.version:
+                archetype.hitboxes = [entity.get_rect() for entity in entities.items]
+                archetype.hitboxes_version = entities.version
+            else:
+                for entity in entities.items:
+                    entity.get_rect()
+    
+    def hits(self, rect, archetype):
+        """Every live entity of archetype whose hitbox collides with rect, in order"""
+        items = archetype.entities.items
+        return [items[i] for i in rect.collidelistall(archetype.hitboxes) if not items[i].removed]
+    
+    def first_hit(self, rect, archetype):
+        """Return the first live entity of archetype whose hitbox collides with rect, or None"""
+        index = rect.collidelist(archetype.hitboxes)
+        if index < 0:
+            return None
+        entity = archetype.entities.items[index]
+        if not entity.removed:
+            return entity
+        # The first hit is waiting to be flushed out; look past it
+        hits = self.hits(rect, archetype)
+        return hits[0] if hits else None
+    
+    def draw(self, surface):
+        for archetype in self.archetypes:
+            if archetype.drawn:
+                for entity in archetype.entities:
+                    entity.draw(surface)
+    
+    def flush(self):
+        for archetype in self.archetypes:
+            archetype.entities.flush()
+    
+    def clear(self):
+        for archetype in self.archetypes:
+            archetype.entities.clear()
+
 class Player:
-    def __init__(self, x, y):
+    # Ship sprites and their tinted variants, loaded by load_graphics()
+    body_clip = None
+    body_flash_clip = None
+    drill_clip = None
+    drill_active_clip = None
+    drill_flash_clip = None
+    tint_flashes = True  # Switched off by the QualityGovernor when frames run long
+    
+    def __init__(self, x, y, bullets=None):
         self.x = x
         self.y = y
         self.width = 40
         self.height = 60
+        self.rect = pygame.Rect(x, y, self.width, self.height)  # Hitbox, moved in place by get_rect()
+        self.drill_rect = pygame.Rect(0, 0, 10, 15)
         self.speed = 5
         self.health = 100
         self.max_health = 100
         self.drill_active = False
         self.drill_cooldown = 0
-        self.bullets = []
+        self.bullets = bullets if bullets is not None else EntityList()
         self.bullet_cooldown = 0
         self.invulnerable = 0
-        
-        # Load ship images
-        self.ship_body_img = None
-        self.drill_img = None
-        self.images_loaded = False
-        
-        try:
-            # Try to load ship body image
-            ship_body_raw = pygame.image.load("res/ship-body.png").convert_alpha()
-            self.ship_body_img = pygame.transform.scale(ship_body_raw, (self.width, self.height))
-            
-            # Try to load drill image
-            drill_raw = pygame.image.load("res/ship-nose.png").convert_alpha()
-            # Scale drill to be proportional - make it smaller than the ship body
-            drill_width = int(self.width)  # 100% of ship width
-            drill_height = int(self.height * 0.25)  # 25% of ship height
-            self.drill_img = pygame.transform.scale(drill_raw, (drill_width, drill_height))
-            
-            self.images_loaded = True
-            print("Ship images loaded successfully")
-            
-        except (pygame.error, FileNotFoundError) as e:
-            print(f"Could not load ship images: {e}")
-            print("Using fallback rectangle graphics")
-            self.images_loaded = False
+    
+    def __getstate__(self):
+        # The bullet list belongs to the World; checkpoints store it with the other groups
+        state = self.__dict__.copy()
+        del state["bullets"]
+        return state
         
     def update(self, keys):
         # Movement
@@ -117,19 +632,13 @@ class Player:
 
         if self.bullet_cooldown > 0:
             self.bullet_cooldown -= 1
-
-            
-        # Update bullets
-        for bullet in self.bullets[:]:
-            bullet.update()
-            if bullet.y < 0:
-                self.bullets.remove(bullet)
                 
         # Update invulnerability
         if self.invulnerable > 0:
             self.invulnerable -= 1
     
-    def apply_color_overlay(self, surface, overlay_color, alpha_percent):
+    @staticmethod
+    def apply_color_overlay(surface, overlay_color, alpha_percent):
         """Apply a color overlay to non-transparent parts of the surface using pygame blending"""
         try:
             # Create a copy of the surface
@@ -148,32 +657,28 @@ class Player:
             return surface
     
     def draw(self, screen):
-        if self.images_loaded and self.ship_body_img and self.drill_img:
-            # Draw ship body
-            ship_surface = self.ship_body_img
-            
-            # Apply white overlay if invulnerable (flashing effect)
-            if self.invulnerable > 0 and self.invulnerable % 10 < 5:
-                ship_surface = self.apply_color_overlay(self.ship_body_img, (255, 255, 255), 10)  # 10% white overlay
+        if Player.body_clip and Player.drill_clip:
+            flashing = Player.tint_flashes and self.invulnerable > 0 and self.invulnerable % 10 < 5
             
-            screen.blit(ship_surface, (self.x, self.y))
+            # Draw ship body, with the pre-tinted white overlay if invulnerable (flashing effect)
+            body_clip = Player.body_flash_clip if flashing else Player.body_clip
+            body_clip.draw(screen, 0, self.x, self.y)
             
             # Draw bullets BEFORE drill so drill appears on top
             for bullet in self.bullets:
                 bullet.draw(screen)
             
-            # Draw drill (always on top)
-            drill_surface = self.drill_img
-            
+            # Draw drill (always on top): yellow tint when active, white when invulnerable
+            drill_clip = Player.drill_clip
             if self.drill_active:
-                drill_surface = self.apply_color_overlay(self.drill_img, (255, 255, 0), 10)  # 10% yellow overlay when active
-            elif self.invulnerable > 0 and self.invulnerable % 10 < 5:
-                drill_surface = self.apply_color_overlay(self.drill_img, (255, 255, 255), 10)  # 10% white overlay when invulnerable
+                drill_clip = Player.drill_active_clip
+            elif flashing:
+                drill_clip = Player.drill_flash_clip
             
             # Position drill at the front of the ship
-            drill_x = self.x + (self.width - self.drill_img.get_width()) // 2
-            drill_y = self.y - self.drill_img.get_height() + 5  # Slightly overlap with ship
-            screen.blit(drill_surface, (drill_x, drill_y))
+            drill_x = self.x + (self.width - drill_clip.width) // 2
+            drill_y = self.y - drill_clip.height + 5  # Slightly overlap with ship
+            drill_clip.draw(screen, 0, drill_x, drill_y)
             
         else:
             # Fallback to original rectangle drawing if images fail to load
@@ -189,17 +694,12 @@ class Player:
             pygame.draw.rect(screen, drill_color, (self.x + 15, self.y - 10, 10, 15))
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
-    
-    def take_damage(self, damage):
-        if self.invulnerable == 0:
-            self.health -= damage
-            self.invulnerable = 60  # 1 second of invulnerability
-            return True
-        return False
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
     
-    def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+    def get_drill_rect(self):
+        self.drill_rect.update(self.x + 15, self.y - 10, 10, 15)
+        return self.drill_rect
     
     def take_damage(self, damage):
         if self.invulnerable == 0:
@@ -213,65 +713,88 @@ class Bullet:
         self.x = x
         self.y = y
         self.speed = 8
+        self.vel_x = 0
+        self.vel_y = -self.speed
         self.width = 4
         self.height = 10
+        self.rect = pygame.Rect(x, y, self.width, self.height)  # Hitbox, moved in place by get_rect()
     
     def update(self):
-        self.y -= self.speed
+        self.y += self.vel_y
     
     def draw(self, screen):
         pygame.draw.rect(screen, YELLOW, (self.x, self.y, self.width, self.height))
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
+
+class EnemyField:
+    """Enemy attribute kept in its EnemyList's array while it is in one,
+    and in stored_<name> on the enemy otherwise"""
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.stored = "stored_" + name
+    
+    def __get__(self, enemy, owner=None):
+        if enemy is None:
+            return self
+        group = enemy.group
+        if group is None:
+            return enemy.__dict__[self.stored]
+        return getattr(group, self.name).item(enemy.slot)  # A Python float, not a NumPy scalar
+    
+    def __set__(self, enemy, value):
+        group = enemy.group
+        if group is None:
+            enemy.__dict__[self.stored] = value
+        else:
+            getattr(group, self.name)[enemy.slot] = value
 
 class Enemy:
-    def __init__(self, x, y, enemy_type, layer):
+    sprite = None  # Loaded by load_graphics()
+    health_bars = True  # Switched off by the QualityGovernor when frames run long
+    x = EnemyField()
+    y = EnemyField()
+    speed = EnemyField()
+    direction = EnemyField()
+    
+    def __init__(self, x, y, enemy_type, layer, speed=None, direction=None, shoot_timer=None):
+        self.group = None  # EnemyList holding the fields above, None while the enemy keeps them
         self.x = x
         self.y = y
         self.enemy_type = enemy_type
         self.layer = layer
         self.height = 70  # Keep original height
-        self.speed = random.uniform(1, 3)
+        # Level timelines pre-roll these; roll them here otherwise
+        self.speed = speed if speed is not None else random.uniform(1, 3)
         self.health = 20 if enemy_type == "basic" else 40
         self.max_health = self.health
-        self.direction = random.choice([-1, 1])
-        self.shoot_timer = random.randint(60, 180)
+        self.direction = direction if direction is not None else random.choice([-1, 1])
+        self.shoot_timer = shoot_timer if shoot_timer is not None else random.randint(60, 180)
         self.bullets = []
         
-        # Load flying enemy image
-        self.enemy_img = None
-        self.image_loaded = False
-        
-        try:
-            # Load the flying enemy image
-            enemy_raw = pygame.image.load("res/enemy-flying.png").convert_alpha()
-            
-            # Calculate width based on aspect ratio while keeping height at 30
-            original_width = enemy_raw.get_width()
-            original_height = enemy_raw.get_height()
-            aspect_ratio = original_width / original_height
-            self.width = int(self.height * aspect_ratio)
-            
-            # Scale the image
-            self.enemy_img = pygame.transform.scale(enemy_raw, (self.width, self.height))
-            self.image_loaded = True
-            
-            # Only print once per game session, not per enemy
-            if not hasattr(Enemy, '_image_load_logged'):
-                print(f"Flying enemy image loaded successfully (size: {self.width}x{self.height})")
-                Enemy._image_load_logged = True
-                
-        except (pygame.error, FileNotFoundError) as e:
-            if not hasattr(Enemy, '_image_error_logged'):
-                print(f"Could not load flying enemy image: {e}")
-                print("Using fallback rectangle graphics for flying enemies")
-                Enemy._image_error_logged = True
-            self.image_loaded = False
-            self.width = 30  # Fallback to original square size
-        
-    def update(self, player, global_bullet_list):
-        # Movement patterns based on type
+        # Width follows the sprite's aspect ratio, or the original square size without it
+        self.width = Enemy.sprite.width if Enemy.sprite else 30
+        self.rect = pygame.Rect(x, y, self.width, self.height)  # Hitbox, moved in place by get_rect()
+    
+    def __getstate__(self):
+        # Checkpoints keep the field values, not the list's arrays
+        state = self.__dict__.copy()
+        for name in EnemyList.FIELDS:
+            state["stored_" + name] = getattr(self, name)
+        state["group"] = None
+        return state
+    
+    def set_group(self, group):
+        """Move the EnemyField values into group's arrays, or back onto the enemy for None"""
+        values = [getattr(self, name) for name in EnemyList.FIELDS]
+        self.group = group
+        for name, value in zip(EnemyList.FIELDS, values):
+            setattr(self, name, value)
+        
+    def move(self, player):
+        # Movement patterns based on type (EnemyMovement does the same for whole groups)
         if self.enemy_type == "basic":
             self.y += self.speed
             self.x += self.direction * 0.5
@@ -283,8 +806,9 @@ class Enemy:
             if distance > 0:
                 self.x += (dx / distance) * self.speed * 0.7
                 self.y += (dy / distance) * self.speed * 0.7
-        
-        # Shooting
+    
+    def update(self, player, global_bullet_list):
+        # Shooting; movement has already been applied by EnemyMovement
         self.shoot_timer -= 1
         if self.shoot_timer <= 0 and len(self.bullets) < 2:
             bullet = EnemyBullet(self.x + self.width // 2, self.y + self.height)
@@ -292,23 +816,22 @@ class Enemy:
             global_bullet_list.append(bullet)  # Add to global list
             self.shoot_timer = random.randint(60, 180)
         
-        # Update bullets
-        for bullet in self.bullets[:]:
+        # Update bullets, keeping only those still on screen
+        for bullet in self.bullets:
             bullet.update()
-            if bullet.y > SCREEN_HEIGHT:
-                self.bullets.remove(bullet)
+        self.bullets = [bullet for bullet in self.bullets if bullet.y <= SCREEN_HEIGHT]
     
     def draw(self, screen):
-        if self.image_loaded and self.enemy_img:
+        if Enemy.sprite:
             # Draw the flying enemy image
-            screen.blit(self.enemy_img, (self.x, self.y))
+            Enemy.sprite.draw(screen, 0, self.x, self.y)
         else:
             # Fallback to original rectangle drawing if image fails to load
             color = LAYER_THEMES[self.layer]["enemy_color"]
             pygame.draw.rect(screen, color, (self.x, self.y, self.width, self.height))
         
         # Health bar (always drawn on top)
-        if self.health < self.max_health:
+        if Enemy.health_bars and self.health < self.max_health:
             bar_width = self.width  # Use actual width for health bar
             bar_height = 4
             health_ratio = self.health / self.max_health
@@ -316,30 +839,206 @@ class Enemy:
             pygame.draw.rect(screen, GREEN, (self.x, self.y - 8, bar_width * health_ratio, bar_height))
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
     
     def take_damage(self, damage):
         self.health -= damage
         return self.health <= 0
 
+class EnemyMovement:
+    """Movement for a whole EnemyList in one vectorized pass.
+    
+    The drift of basic enemies and the homing step of aggressive ones are
+    applied straight to the list's x and y rows, with the constant factor
+    of each step on the rows of its enemy type and 0.0 elsewhere. The steps
+    follow Enemy.move's operation order, so both give the same positions.
+    The factors are kept until the list changes. Without NumPy every enemy
+    calls Enemy.move instead.
+    """
+    def __init__(self):
+        self.version = None  # EntityList version the factors were built for
+    
+    def update(self, enemies, player):
+        items = enemies.items  # Nothing has been removed yet this tick
+        if enemies.arrays is None:
+            for enemy in items:
+                enemy.move(player)
+            return
+        count = len(items)
+        if not count:
+            return
+        if enemies.version != self.version:
+            basic = np.array([enemy.enemy_type == "basic" for enemy in items], np.float64)
+            aggressive = np.array([enemy.enemy_type == "aggressive" for enemy in items], np.float64)
+            self.drift_y = basic  # Times speed
+            self.drift_x = basic * 0.5  # Times direction
+            self.homing = aggressive * 0.7  # Times the unit vector to the player and speed
+            self.drifting = basic.any()
+            self.homing_in = aggressive.any()
+            self.version = enemies.version
+        x = enemies.x[:count]
+        y = enemies.y[:count]
+        speed = enemies.speed[:count]
+        
+        if self.drifting:
+            y += speed * self.drift_y
+            x += enemies.direction[:count] * self.drift_x
+        
+        # Home in on the player
+        if self.homing_in:
+            dx = player.x - x
+            dy = player.y - y
+            distance = np.sqrt(dx * dx + dy * dy)
+            if not distance.all():
+                distance[distance == 0] = np.inf  # A zero step: enemies on the player stay put
+            for coords, delta in ((x, dx), (y, dy)):
+                delta /= distance
+                delta *= speed
+                delta *= self.homing
+                coords += delta
+
 class EnemyBullet:
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.speed = 4
+        self.vel_x = 0
+        self.vel_y = self.speed
         self.width = 3
         self.height = 8
+        self.rect = pygame.Rect(x, y, self.width, self.height)  # Hitbox, moved in place by get_rect()
     
     def update(self):
-        self.y += self.speed
+        self.y += self.vel_y
     
     def draw(self, screen):
         pygame.draw.rect(screen, RED, (self.x, self.y, self.width, self.height))
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
+
+# Bullet patterns fired by static enemies. Directions come from precomputed
+# tables, so adding a pattern here needs no new per-bullet math.
+#   kind        "ring" fires `count` bullets `spacing` table steps apart,
+#               "line" fires a laser-like column of `count` bullets `gap` px apart,
+#               "aimed" fans `count` bullets `spread` radians apart at the player
+#   interval    frames between volleys
+#   angle_step  resolution of the direction table in degrees (ring/line)
+#   rotate      table steps the pattern turns after every volley (ring/line)
+#   speeds      bullet speed, cycled per volley to fire waves (ring/line)
+#   muzzle      distance from the enemy centre where bullets appear
+BULLET_PATTERNS = {
+    "circular": {"kind": "ring", "interval": 20, "angle_step": 22.5, "count": 8, "spacing": 2,
+                 "rotate": 1, "speeds": [3], "muzzle": 10},
+    "spiral": {"kind": "ring", "interval": 8, "angle_step": 15, "count": 1, "spacing": 0,
+               "rotate": 1, "speeds": [4], "muzzle": 10},
+    "aimed": {"kind": "aimed", "interval": 40, "count": 3, "spread": 0.3, "speed": 4},
+    "wave": {"kind": "ring", "interval": 30, "angle_step": 15, "count": 12, "spacing": 2,
+             "rotate": 1, "speeds": [2, 2.5, 3], "muzzle": 10},
+    "laser": {"kind": "line", "interval": 45, "angle_step": 15, "count": 6, "gap": 8,
+              "rotate": 3, "speeds": [5], "muzzle": 10},
+}
+
+_direction_tables = {}
+_compiled_patterns = {}
+
+def get_direction_table(angle_step):
+    """Return the shared (cos, sin) table for directions angle_step degrees apart"""
+    if angle_step not in _direction_tables:
+        steps = int(round(360 / angle_step))
+        _direction_tables[angle_step] = [(math.cos(math.radians(i * angle_step)),
+                                          math.sin(math.radians(i * angle_step)))
+                                         for i in range(steps)]
+    return _direction_tables[angle_step]
+
+def get_bullet_pattern(name):
+    """Return the compiled BulletPattern for a BULLET_PATTERNS entry"""
+    if name not in _compiled_patterns:
+        _compiled_patterns[name] = BulletPattern(BULLET_PATTERNS[name])
+    return _compiled_patterns[name]
+
+class BulletPattern:
+    def __init__(self, spec):
+        self.kind = spec["kind"]
+        self.interval = spec["interval"]
+        self.count = spec["count"]
+        
+        if self.kind == "aimed":
+            # Rotations of the aim direction for each bullet in the fan, pre-multiplied by speed
+            speed = spec["speed"]
+            self.fan = [(math.cos((i - (self.count - 1) / 2) * spec["spread"]) * speed,
+                         math.sin((i - (self.count - 1) / 2) * spec["spread"]) * speed)
+                        for i in range(self.count)]
+            return
+        
+        # Precompute the (offset_x, offset_y, vel_x, vel_y) of every bullet for
+        # each volley until both the rotation and the speed cycle repeat
+        table = get_direction_table(spec["angle_step"])
+        speeds = spec["speeds"]
+        rotate = spec["rotate"]
+        muzzle = spec["muzzle"]
+        phases = len(table) // math.gcd(len(table), rotate) if rotate else 1
+        cycle = phases * len(speeds) // math.gcd(phases, len(speeds))
+        self.volleys = []
+        for volley in range(cycle):
+            speed = speeds[volley % len(speeds)]
+            bullets = []
+            for i in range(self.count):
+                if self.kind == "line":
+                    cos_a, sin_a = table[(volley * rotate) % len(table)]
+                    distance = muzzle + i * spec["gap"]
+                else:
+                    cos_a, sin_a = table[(volley * rotate + i * spec["spacing"]) % len(table)]
+                    distance = muzzle
+                bullets.append((cos_a * distance, sin_a * distance, cos_a * speed, sin_a * speed))
+            self.volleys.append(bullets)
+    
+    def emit(self, volley, center_x, center_y, aim_dx, aim_dy):
+        """Create the bullets of one volley fired from (center_x, center_y)"""
+        if self.kind == "aimed":
+            distance = math.hypot(aim_dx, aim_dy)
+            if distance == 0:
+                return []
+            aim_x = aim_dx / distance
+            aim_y = aim_dy / distance
+            return [PatternBullet(center_x, center_y, aim_x * cos_s - aim_y * sin_s, aim_y * cos_s + aim_x * sin_s)
+                    for cos_s, sin_s in self.fan]
+        
+        return [PatternBullet(center_x + offset_x, center_y + offset_y, vel_x, vel_y)
+                for offset_x, offset_y, vel_x, vel_y in self.volleys[volley % len(self.volleys)]]
+
+# Rotating triangle drawn on spiral enemies: 72 steps of 5 degrees, radius 8
+SPIRAL_INDICATOR_POINTS = [
+    [(math.cos(math.radians(step * 5 + i * 120)) * 8, math.sin(math.radians(step * 5 + i * 120)) * 8)
+     for i in range(3)]
+    for step in range(72)
+]
 
 class StaticEnemy:
+    sprite = None  # Loaded by load_graphics()
+    health_bars = True  # Switched off by the QualityGovernor when frames run long
+    indicator_clips = {}  # Pattern indicators baked by load_graphics()
+    
+    @staticmethod
+    def render_circular_indicator(surface, index):
+        # Concentric circles
+        pygame.draw.circle(surface, WHITE, (12, 12), 8, 2)
+        pygame.draw.circle(surface, WHITE, (12, 12), 4, 2)
+    
+    @staticmethod
+    def render_spiral_indicator(surface, index):
+        # Rotating triangle, one frame per 5 degree step
+        points = [(12 + dx, 12 + dy) for dx, dy in SPIRAL_INDICATOR_POINTS[index]]
+        pygame.draw.polygon(surface, YELLOW, points, 2)
+    
+    @staticmethod
+    def render_aimed_indicator(surface, index):
+        # Crosshair
+        pygame.draw.line(surface, RED, (4, 12), (20, 12), 3)
+        pygame.draw.line(surface, RED, (12, 4), (12, 20), 3)
+    
     def __init__(self, x, y, pattern_type, layer):
         self.x = x
         self.y = y
@@ -348,121 +1047,54 @@ class StaticEnemy:
         self.width = 50
         self.height = 50
         self.health = 60
+        self.rect = pygame.Rect(x, y, self.width, self.height)  # Hitbox, moved in place by get_rect()
         self.max_health = 60
         self.shoot_timer = 0
         self.bullets = []
-        self.angle = 0
-        self.spiral_offset = 0
+        self.pattern = get_bullet_pattern(pattern_type)
+        self.volley = 0  # Number of volleys fired, selects the pattern's rotation phase
         self.pattern_timer = 0
-        
-        # Load static enemy image
-        self.enemy_img = None
-        self.image_loaded = False
-        
-        try:
-            # Load and scale the static enemy image
-            enemy_raw = pygame.image.load("res/static-enemy.png").convert_alpha()
-            self.enemy_img = pygame.transform.scale(enemy_raw, (self.width, self.height))
-            self.image_loaded = True
-            # Only print once per game session, not per enemy
-            if not hasattr(StaticEnemy, '_image_load_logged'):
-                print("Static enemy image loaded successfully")
-                StaticEnemy._image_load_logged = True
-        except (pygame.error, FileNotFoundError) as e:
-            if not hasattr(StaticEnemy, '_image_error_logged'):
-                print(f"Could not load static enemy image: {e}")
-                print("Using fallback rectangle graphics for static enemies")
-                StaticEnemy._image_error_logged = True
-            self.image_loaded = False
+    
+    def __getstate__(self):
+        # Compiled patterns are shared; checkpoints only keep the name
+        state = self.__dict__.copy()
+        del state["pattern"]
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.pattern = get_bullet_pattern(self.pattern_type)
         
     def update(self, player, global_pattern_bullets):
         # Static enemies don't move on their own - world scrolling handles movement
         
-        # Different firing patterns
+        # Fire the next volley of this enemy's bullet pattern
         self.shoot_timer += 1
         self.pattern_timer += 1
         
-        if self.pattern_type == "circular":
-            if self.shoot_timer >= 20:  # Fire every 1/3 second
-                # Fire 8 bullets in a circle
-                for i in range(8):
-                    angle = (i * 45 + self.angle) * math.pi / 180
-                    bullet_x = self.x + self.width // 2 + math.cos(angle) * 10
-                    bullet_y = self.y + self.height // 2 + math.sin(angle) * 10
-                    vel_x = math.cos(angle) * 3
-                    vel_y = math.sin(angle) * 3
-                    bullet = PatternBullet(bullet_x, bullet_y, vel_x, vel_y)
-                    self.bullets.append(bullet)
-                    global_pattern_bullets.append(bullet)  # Add to global list
-                self.angle += 22.5  # Rotate pattern
-                self.shoot_timer = 0
-                
-        elif self.pattern_type == "spiral":
-            if self.shoot_timer >= 8:  # Fire more frequently for spiral
-                angle = (self.spiral_offset * 15) * math.pi / 180
-                bullet_x = self.x + self.width // 2 + math.cos(angle) * 10
-                bullet_y = self.y + self.height // 2 + math.sin(angle) * 10
-                vel_x = math.cos(angle) * 4
-                vel_y = math.sin(angle) * 4
-                bullet = PatternBullet(bullet_x, bullet_y, vel_x, vel_y)
-                self.bullets.append(bullet)
-                global_pattern_bullets.append(bullet)  # Add to global list
-                self.spiral_offset += 1
-                self.shoot_timer = 0
-                
-        elif self.pattern_type == "aimed":
-            if self.shoot_timer >= 40:  # Fire every 2/3 second
-                # Fire 3 bullets aimed at player with slight spread
-                for i in range(3):
-                    dx = player.x - self.x
-                    dy = player.y - self.y
-                    distance = math.sqrt(dx*dx + dy*dy)
-                    if distance > 0:
-                        spread_angle = (i - 1) * 0.3  # -0.3, 0, 0.3 radians spread
-                        base_angle = math.atan2(dy, dx)
-                        final_angle = base_angle + spread_angle
-                        vel_x = math.cos(final_angle) * 4
-                        vel_y = math.sin(final_angle) * 4
-                        bullet = PatternBullet(self.x + self.width // 2, self.y + self.height // 2, vel_x, vel_y)
-                        self.bullets.append(bullet)
-                        global_pattern_bullets.append(bullet)  # Add to global list
-                self.shoot_timer = 0
-        
-        # Update bullets
-        for bullet in self.bullets[:]:
+        if self.shoot_timer >= self.pattern.interval:
+            volley = self.pattern.emit(self.volley, self.x + self.width // 2, self.y + self.height // 2,
+                                       player.x - self.x, player.y - self.y)
+            self.bullets.extend(volley)
+            global_pattern_bullets.extend(volley)  # Add to global list
+            self.volley += 1
+            self.shoot_timer = 0
+        
+        # Update bullets, keeping only those still on screen
+        for bullet in self.bullets:
             bullet.update()
-            if (bullet.x < -20 or bullet.x > SCREEN_WIDTH + 20 or 
-                bullet.y < -20 or bullet.y > SCREEN_HEIGHT + 20):
-                self.bullets.remove(bullet)
+        self.bullets = [bullet for bullet in self.bullets
+                        if -20 <= bullet.x <= SCREEN_WIDTH + 20 and -20 <= bullet.y <= SCREEN_HEIGHT + 20]
     
     def draw(self, screen):
-        if self.image_loaded and self.enemy_img:
+        if StaticEnemy.sprite:
             # Draw the static enemy image
-            screen.blit(self.enemy_img, (self.x, self.y))
+            StaticEnemy.sprite.draw(screen, 0, self.x, self.y)
             
             # Draw pattern indicator overlays on top of the image
-            if self.pattern_type == "circular":
-                # Draw circular pattern indicator - concentric circles
-                pygame.draw.circle(screen, WHITE, (self.x + self.width // 2, self.y + self.height // 2), 8, 2)
-                pygame.draw.circle(screen, WHITE, (self.x + self.width // 2, self.y + self.height // 2), 4, 2)
-            elif self.pattern_type == "spiral":
-                # Draw spiral pattern indicator - rotating triangle
-                center_x = self.x + self.width // 2
-                center_y = self.y + self.height // 2
-                angle_offset = (self.pattern_timer * 5) % 360
-                points = []
-                for i in range(3):
-                    angle = math.radians(angle_offset + i * 120)
-                    px = center_x + math.cos(angle) * 8
-                    py = center_y + math.sin(angle) * 8
-                    points.append((px, py))
-                pygame.draw.polygon(screen, YELLOW, points, 2)
-            elif self.pattern_type == "aimed":
-                # Draw aimed pattern indicator - crosshair
-                center_x = self.x + self.width // 2
-                center_y = self.y + self.height // 2
-                pygame.draw.line(screen, RED, (center_x - 8, center_y), (center_x + 8, center_y), 3)
-                pygame.draw.line(screen, RED, (center_x, center_y - 8), (center_x, center_y + 8), 3)
+            indicator = StaticEnemy.indicator_clips.get(self.pattern_type)
+            if indicator:
+                indicator.draw(screen, self.pattern_timer, self.x + self.width // 2, self.y + self.height // 2)
         else:
             # Fallback to original rectangle drawing if image fails to load
             color = LAYER_THEMES[self.layer]["static_enemy_color"]
@@ -481,7 +1113,7 @@ class StaticEnemy:
                 pygame.draw.rect(screen, RED, (self.x + 15, self.y + 15, 10, 10))
         
         # Health bar (always drawn on top)
-        if self.health < self.max_health:
+        if StaticEnemy.health_bars and self.health < self.max_health:
             bar_width = 40
             bar_height = 4
             health_ratio = self.health / self.max_health
@@ -489,7 +1121,8 @@ class StaticEnemy:
             pygame.draw.rect(screen, GREEN, (self.x, self.y - 8, bar_width * health_ratio, bar_height))
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
     
     def take_damage(self, damage):
         self.health -= damage
@@ -503,6 +1136,7 @@ class PatternBullet:
         self.vel_y = vel_y
         self.width = 4
         self.height = 4
+        self.rect = pygame.Rect(x - 2, y - 2, self.width, self.height)  # Hitbox, moved in place by get_rect()
     
     def update(self):
         self.x += self.vel_x
@@ -512,49 +1146,51 @@ class PatternBullet:
         pygame.draw.circle(screen, ORANGE, (int(self.x), int(self.y)), 3)
     
     def get_rect(self):
-        return pygame.Rect(self.x - 2, self.y - 2, self.width, self.height)
+        self.rect.update(self.x - 2, self.y - 2, self.width, self.height)
+        return self.rect
 
 
 class NiNaNote:
+    clip = None  # Baked by load_graphics()
+    damage_overlay = True  # Switched off by the QualityGovernor when frames run long
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.width = 60
         self.height = 40
         self.health = 30
+        self.rect = pygame.Rect(x, y, self.width, self.height)  # Hitbox, moved in place by get_rect()
         self.max_health = 30
         self.destructible = True
         self.found = False
         self.pulse_timer = 0
         
-    def update(self, scroll_speed):
-        # Move with world scroll
-        self.y += scroll_speed
-        
-        # Pulse animation
+    def update(self):
+        # Pulse animation (the World scrolls the position)
         self.pulse_timer += 1
         if self.pulse_timer > 60:
             self.pulse_timer = 0
     
-    def draw(self, surface):
-        # Pink rectangle with slight pulsing effect
-        pulse_factor = math.sin(self.pulse_timer * 0.1) * 0.1 + 1.0
-        
+    @staticmethod
+    def render_frame(surface, index):
         # Pink color (255, 105, 180)
-        pygame.draw.rect(surface, (255, 105, 180), (self.x, self.y, self.width, self.height))
+        pygame.draw.rect(surface, (255, 105, 180), (0, 0, 60, 40))
         # Add border for better visibility
-        pygame.draw.rect(surface, WHITE, (self.x, self.y, self.width, self.height), 2)
+        pygame.draw.rect(surface, WHITE, (0, 0, 60, 40), 2)
+    
+    def draw(self, surface):
+        # Pink rectangle, baked once by load_graphics()
+        NiNaNote.clip.draw(surface, self.pulse_timer, self.x, self.y)
         
         # Damage visualization
-        if self.health < self.max_health:
+        if NiNaNote.damage_overlay and self.health < self.max_health:
             damage_ratio = 1 - (self.health / self.max_health)
-            s = pygame.Surface((self.width, self.height))
-            s.set_alpha(int(150 * damage_ratio))
-            s.fill(RED)
-            surface.blit(s, (self.x, self.y))
+            SHADES.draw(surface, RED, int(150 * damage_ratio), (self.x, self.y, self.width, self.height))
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
     
     def take_damage(self, damage):
         self.health -= damage
@@ -562,32 +1198,33 @@ class NiNaNote:
 
 
 class HealthOrb:
+    clip = None  # Baked by load_graphics()
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.width = 20
         self.height = 20
+        self.rect = pygame.Rect(x, y, self.width, self.height)  # Hitbox, moved in place by get_rect()
         self.heal_amount = 0.15  # 15% of max health
         self.collected = False
         self.pulse_timer = 0
     
-    def update(self, scroll_speed):
-        # Move with world scroll
-        self.y += scroll_speed
-        
-        # Pulse animation
+    def update(self):
+        # Pulse animation (the World scrolls the position)
         self.pulse_timer += 1
         if self.pulse_timer > 60:
             self.pulse_timer = 0
     
-    def draw(self, surface):
+    @staticmethod
+    def render_frame(surface, pulse_timer):
         # Calculate pulse size (between 18 and 22 pixels)
-        pulse_factor = math.sin(self.pulse_timer * 0.1) * 0.1 + 1.0
-        size = int(self.width * pulse_factor)
+        pulse_factor = math.sin(pulse_timer * 0.1) * 0.1 + 1.0
+        size = int(20 * pulse_factor)
         
         # Draw red circle
-        center_x = self.x + self.width // 2
-        center_y = self.y + self.height // 2
+        center_x = 12
+        center_y = 12
         pygame.draw.circle(surface, RED, (center_x, center_y), size // 2)
         
         # Draw white plus sign
@@ -608,12 +1245,23 @@ class HealthOrb:
                          line_width,
                          plus_size))
     
+    def draw(self, surface):
+        # Pulse frames are baked once by load_graphics()
+        HealthOrb.clip.draw(surface, self.pulse_timer, self.x + self.width // 2, self.y + self.height // 2)
+    
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
 
 
 class Obstacle:
+    damage_overlay = True  # Switched off by the QualityGovernor when frames run long
+    
     def __init__(self, x, y, width, height, layer, obstacle_type="basic"):
+        self.rect = pygame.Rect(x, y, width, height)  # Hitbox, moved in place by get_rect()
+        self.reset(x, y, width, height, layer, obstacle_type)
+    
+    def reset(self, x, y, width, height, layer, obstacle_type="basic"):
         self.x = x
         self.y = y
         self.width = width
@@ -664,96 +1312,963 @@ class Obstacle:
             pygame.draw.rect(screen, RED, (self.x, self.y, self.width, self.height), 3)
         
         # Damage visualization for destructible obstacles
-        if self.destructible and self.health < self.max_health:
+        if Obstacle.damage_overlay and self.destructible and self.health < self.max_health:
             damage_ratio = 1 - (self.health / self.max_health)
-            s = pygame.Surface((self.width, self.height))
-            s.set_alpha(int(150 * damage_ratio))
-            s.fill(RED)
-            screen.blit(s, (self.x, self.y))
+            SHADES.draw(screen, RED, int(150 * damage_ratio), (self.x, self.y, self.width, self.height))
     
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
+    
+    def take_damage(self, damage):
+        if not self.destructible:
+            return False
+        self.health -= damage
+        return self.health <= 0
+
+class ObstaclePool:
+    """Reuses Obstacle objects once they have left the world"""
+    def __init__(self):
+        self.free = []
+    
+    def acquire(self, x, y, width, height, layer, obstacle_type):
+        if self.free:
+            obstacle = self.free.pop()
+            obstacle.reset(x, y, width, height, layer, obstacle_type)
+            return obstacle
+        return Obstacle(x, y, width, height, layer, obstacle_type)
+    
+    def release(self, obstacle):
+        self.free.append(obstacle)
+
+# Everything a checkpoint may contain besides plain Python values
+CHECKPOINT_CLASSES = {cls.__name__: cls for cls in
+                      (Player, Bullet, Enemy, EnemyBullet, StaticEnemy, PatternBullet,
+                       NiNaNote, HealthOrb, Obstacle)}
+# Hitboxes: pygame pickles a Rect as a call to its own constructor function
+CHECKPOINT_CLASSES["__rect_constructor"] = pygame.Rect
+
+class CheckpointUnpickler(pickle.Unpickler):
+    """Unpickler that only rebuilds game entities, so a checkpoint file
+    cannot name arbitrary callables"""
+    def find_class(self, module, name):
+        # Match by name: the module is __main__ or zt_miner depending on how the game was started
+        if name in CHECKPOINT_CLASSES:
+            return CHECKPOINT_CLASSES[name]
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a checkpoint")
+
+def load_checkpoint(data):
+    return CheckpointUnpickler(io.BytesIO(data)).load()
+
+def write_checkpoint_file(path, data):
+    """Atomically replace the checkpoint file with a new snapshot"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(CHECKPOINT_MAGIC + struct.pack("<I", CHECKPOINT_VERSION) + data)
+    os.replace(temp_path, path)
+
+def read_checkpoint_file(path):
+    """Return the snapshot bytes in a checkpoint file, or None if unusable"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if data[:4] != CHECKPOINT_MAGIC or struct.unpack_from("<I", data, 4)[0] != CHECKPOINT_VERSION:
+        print(f"Ignoring checkpoint {path}: written by another version")
+        return None
+    return data[8:]
+
+class CheckpointFile:
+    """Keeps the checkpoint file on disk from a writer thread.
+    
+    save() and remove() only record what the file should become; the
+    writer thread catches up with the latest request, so a frame never
+    waits on the disk and an older snapshot can't overwrite a newer one.
+    """
+    REMOVE = object()  # Pending request to delete the file
+    
+    def __init__(self, path):
+        self.path = path
+        self.pending = None  # Snapshot bytes to write, or REMOVE
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="checkpoint-writer", daemon=True)
+        self.thread.start()
+    
+    def save(self, data):
+        with self.lock:
+            self.pending = data
+        self.changed.set()
+    
+    def remove(self):
+        with self.lock:
+            self.pending = self.REMOVE
+        self.changed.set()
+    
+    def run(self):
+        while True:
+            self.changed.wait()
+            with self.lock:
+                self.changed.clear()
+                pending, self.pending = self.pending, None
+            try:
+                if pending is self.REMOVE:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                elif pending is not None:
+                    write_checkpoint_file(self.path, pending)
+            except OSError as e:
+                print(f"Could not save checkpoint: {e}")
+            if self.stop.is_set() and not self.changed.is_set():
+                return
+    
+    def close(self):
+        """Finish the last request and stop the writer thread"""
+        if self.thread:
+            self.stop.set()
+            self.changed.set()
+            self.thread.join(timeout=5)
+            self.thread = None
+
+# Level timelines: every spawn decision for a run, rolled ahead of time
+LEVEL_EVENT_KINDS = ("nina_note", "enemy", "static_enemy", "formation", "health_orb")
+ENEMY_TYPES = ["basic", "aggressive"]
+STATIC_ENEMY_TYPES = ["circular", "spiral", "aimed"]
+OBSTACLE_TYPES = ["basic", "crystal", "reinforced", "indestructible"]
+LEVEL_REFILLS = 32  # Pre-rolled "basic obstacle" pairs per layer, reused in a cycle
+LEVEL_ORB_ROLLS = 64  # Pre-rolled health orb attempts (orb limit, x) per layer, reused in a cycle
+
+class FormationTemplate:
+    """One validated formation from the library.
+    
+    "gap" formations are a full-width barrier with one opening; "rows"
+    formations are count obstacles either stacked spacing pixels apart or,
+    with no spacing, each at its own random offset. Rolling a template gives
+    [x, offset, width, height, type] rows; the world y of each obstacle is
+    -world_y - offset when it spawns.
+    """
+    def __init__(self, spec):
+        self.name = spec["name"]
+        self.kind = spec["kind"]
+        self.weight = spec.get("weight", 1)
+        self.offset = tuple(spec["offset"])
+        if self.kind == "gap":
+            self.gap = tuple(spec["gap"])
+            self.margin = spec["margin"]
+            self.height = spec["height"]
+            self.obstacle_type = spec["type"]
+            self.min_piece = spec.get("min_piece", 20)  # Narrower wall pieces are left out
+        else:
+            self.count = tuple(spec["count"])
+            self.spacing = spec.get("spacing")
+            self.width = tuple(spec["width"])
+            self.height = tuple(spec["height"])
+            self.types = list(spec["types"])
+    
+    def validate(self):
+        """Return a list of problems with this template"""
+        problems = []
+        ranges = [("offset", self.offset)]
+        if self.kind == "gap":
+            ranges.append(("gap", self.gap))
+            types = [self.obstacle_type]
+            if self.gap[1] + 2 * self.margin > SCREEN_WIDTH:
+                problems.append("gap plus margins is wider than the screen")
+            if self.height <= 0:
+                problems.append("height must be positive")
+        elif self.kind == "rows":
+            ranges += [("count", self.count), ("width", self.width), ("height", self.height)]
+            types = self.types
+            if not types:
+                problems.append("no obstacle types")
+            if self.count[0] < 1:
+                problems.append("count must be at least 1")
+            if self.width[0] <= 0 or self.width[1] > SCREEN_WIDTH:
+                problems.append("width must fit on the screen")
+            if self.height[0] <= 0:
+                problems.append("height must be positive")
+            if self.spacing is not None and self.offset[0] - (self.count[1] - 1) * self.spacing < 0:
+                problems.append("the last row would spawn on screen")
+        else:
+            return [f"unknown kind {self.kind!r}"]
+        
+        for name, (low, high) in ranges:
+            if low > high:
+                problems.append(f"{name} range {low}-{high} is empty")
+        if self.offset[0] < 0:
+            problems.append("offset must not be negative")
+        if self.weight < 0:
+            problems.append("weight must not be negative")
+        for obstacle_type in types:
+            if obstacle_type not in OBSTACLE_TYPES:
+                problems.append(f"unknown obstacle type {obstacle_type!r}")
+        return problems
+    
+    def roll(self, rng):
+        if self.kind == "gap":
+            offset = rng.randint(*self.offset)
+            gap_size = rng.randint(*self.gap)
+            gap_start = rng.randint(self.margin, SCREEN_WIDTH - gap_size - self.margin)
+            gap_end = gap_start + gap_size
+            rows = []
+            if gap_start > self.min_piece:
+                rows.append([0, offset, gap_start, self.height, self.obstacle_type])
+            if gap_end < SCREEN_WIDTH - self.min_piece:
+                rows.append([gap_end, offset, SCREEN_WIDTH - gap_end, self.height, self.obstacle_type])
+            return rows
+        
+        rows = []
+        base_offset = rng.randint(*self.offset) if self.spacing is not None else 0
+        for i in range(rng.randint(*self.count)):
+            width = rng.randint(*self.width)
+            height = rng.randint(*self.height)
+            x = rng.randint(0, SCREEN_WIDTH - width)
+            if self.spacing is not None:
+                offset = base_offset - i * self.spacing
+            else:
+                offset = rng.randint(*self.offset)
+            rows.append([x, offset, width, height, rng.choice(self.types)])
+        return rows
+    
+    def passability(self, ship_width=40, ship_height=60):
+        """Worst case over every roll: (narrowest guaranteed opening, verdict).
+        
+        The verdict is "open" when the ship always fits through without
+        drilling, "drill" when it may have to drill through destructible
+        obstacles, and "blocked" when indestructible obstacles can close it.
+        """
+        if self.kind == "gap":
+            # The pieces never reach into the gap
+            opening = self.gap[0]
+            types = [self.obstacle_type]
+        else:
+            types = self.types
+            if self.spacing is not None and self.spacing - self.height[1] >= ship_height:
+                # The ship can pass between rows, so each row is its own band
+                pieces = 1
+            else:
+                pieces = self.count[1]
+            # n pieces leave n + 1 openings; the widest is at least their average
+            opening = max(0, (SCREEN_WIDTH - pieces * self.width[1]) // (pieces + 1))
+        
+        if opening >= ship_width:
+            return opening, "open"
+        if "indestructible" not in types:
+            return opening, "drill"
+        return opening, "blocked"
+
+class FormationLibrary:
+    """Formation templates parsed and validated from a JSON file"""
+    def __init__(self, templates):
+        self.templates = {template.name: template for template in templates}
+        # Weight 0 templates are only spawned by name
+        self.weighted = [template for template in templates if template.weight > 0]
+        self.cum_weights = []
+        total = 0
+        for template in self.weighted:
+            total += template.weight
+            self.cum_weights.append(total)
+    
+    @classmethod
+    def load(cls, path=FORMATION_FILE):
+        with open(path) as f:
+            data = json.load(f)
+        templates = []
+        problems = []
+        for index, spec in enumerate(data["formations"]):
+            name = spec.get("name", f"#{index}")
+            try:
+                template = FormationTemplate(spec)
+            except (KeyError, TypeError, ValueError) as e:
+                problems.append(f"{name}: malformed ({e!r})")
+                continue
+            problems += [f"{name}: {problem}" for problem in template.validate()]
+            if template.name in [other.name for other in templates]:
+                problems.append(f"{name}: duplicate name")
+            templates.append(template)
+        if "refill" not in [template.name for template in templates]:
+            problems.append("missing the 'refill' formation used to top up obstacles")
+        if not any(template.weight > 0 for template in templates):
+            problems.append("no formation has a positive weight")
+        if problems:
+            raise ValueError(f"{path}: " + "; ".join(problems))
+        return cls(templates)
+    
+    def roll(self, rng, name=None):
+        """Roll the named formation, or a random one by weight"""
+        if name is not None:
+            return self.templates[name].roll(rng)
+        return rng.choices(self.weighted, cum_weights=self.cum_weights)[0].roll(rng)
+
+_formation_libraries = {}
+
+def get_formation_library(path=FORMATION_FILE):
+    """Return the shared FormationLibrary for a file, loading it once"""
+    if path not in _formation_libraries:
+        _formation_libraries[path] = FormationLibrary.load(path)
+    return _formation_libraries[path]
+
+class LevelTimeline:
+    """Spawn events for one layer, sorted by layer progress"""
+    def __init__(self, layer, events=None, refills=None, orb_rolls=None):
+        self.layer = layer
+        self.events = events or []  # Dicts with "progress", "kind" and the pre-rolled parameters
+        self.refills = refills or []  # Obstacle pairs for the "always two obstacles" rule
+        self.orb_rolls = orb_rolls or []  # [orb limit, x] tried once per frame while a health orb is due
+    
+    def add(self, progress, kind, **params):
+        params["progress"] = progress
+        params["kind"] = kind
+        self.events.append(params)
+    
+    def to_json(self):
+        return {"layer": self.layer, "events": self.events, "refills": self.refills, "orb_rolls": self.orb_rolls}
+    
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["layer"], data.get("events", []), data.get("refills", []), data.get("orb_rolls", []))
+
+def compile_levels(seed, layer_height, scroll_speed, layer_count=len(LAYER_THEMES), formations=None):
+    """Replay the spawn timers of a whole run and record what they would spawn.
+    Capacity limits (enemy counts, obstacle counts, orbs) are still applied
+    when an event fires, since they depend on what the player has destroyed.
+    For the same reason health orbs aren't events: Game retries one every
+    frame until it finds room, drawing the attempts from orb_rolls."""
+    rng = random.Random(seed)
+    formations = formations or get_formation_library()
+    levels = [LevelTimeline(layer) for layer in range(layer_count)]
+    layer = 0
+    progress = 0
+    spawn_timer = static_spawn_timer = formation_timer = 0
+    note_spawned = False
+    
+    while True:
+        # Same progression as Game.update()
+        progress += scroll_speed
+        if progress >= layer_height and layer < layer_count - 1:
+            layer += 1
+            progress = 0
+        if layer >= layer_count - 1 and progress >= layer_height // 2:
+            break
+        timeline = levels[layer]
+        
+        # NiNa's note somewhere in the first half of the Upper Crust
+        if layer == 3 and not note_spawned and 500 < progress < layer_height // 2:
+            timeline.add(progress, "nina_note", x=rng.randint(SCREEN_WIDTH // 4, 3 * SCREEN_WIDTH // 4))
+            note_spawned = True
+        
+        spawn_timer += 1
+        static_spawn_timer += 1
+        formation_timer += 1
+        
+        # Progressive spawn rates - faster spawning in higher layers
+        enemy_spawn_rate = max(30, 60 - (layer * 10))  # 60, 50, 40, 30, 30 frames
+        static_spawn_rate = max(120, 180 - (layer * 15))  # 180, 165, 150, 135, 120 frames
+        
+        if spawn_timer >= enemy_spawn_rate:
+            timeline.add(progress, "enemy",
+                         x=rng.randint(0, SCREEN_WIDTH - 30), offset=rng.randint(100, 200),
+                         type=rng.choice(ENEMY_TYPES), speed=rng.uniform(1, 3),
+                         direction=rng.choice([-1, 1]), shoot_timer=rng.randint(60, 180))
+            spawn_timer = 0
+        
+        if static_spawn_timer >= static_spawn_rate:
+            timeline.add(progress, "static_enemy",
+                         x=rng.randint(50, SCREEN_WIDTH - 90), offset=rng.randint(150, 300),
+                         type=rng.choice(STATIC_ENEMY_TYPES))
+            static_spawn_timer = 0
+        
+        if formation_timer >= 90:  # Obstacle formations every 1.5 seconds
+            timeline.add(progress, "formation", obstacles=formations.roll(rng))
+            formation_timer = 0
+    
+    for timeline in levels:
+        timeline.refills = [formations.roll(rng, "refill") for _ in range(LEVEL_REFILLS)]
+        timeline.orb_rolls = [[rng.randint(1, 3), rng.randint(50, SCREEN_WIDTH - 50)] for _ in range(LEVEL_ORB_ROLLS)]
+    return levels
+
+def validate_levels(levels, layer_height):
+    """Return a list of problems found in the timelines (empty when valid)"""
+    problems = []
+    
+    def check_obstacle(where, row):
+        if len(row) != 5:
+            problems.append(f"{where}: obstacle needs [x, offset, width, height, type]")
+            return
+        x, offset, width, height, obstacle_type = row
+        if width <= 0 or height <= 0:
+            problems.append(f"{where}: obstacle size {width}x{height} is not positive")
+        if x < 0 or x + width > SCREEN_WIDTH:
+            problems.append(f"{where}: obstacle x={x} width={width} leaves the screen")
+        if offset < 0:
+            problems.append(f"{where}: obstacle offset {offset} would spawn on screen")
+        if obstacle_type not in OBSTACLE_TYPES:
+            problems.append(f"{where}: unknown obstacle type {obstacle_type!r}")
+    
+    notes = 0
+    for timeline in levels:
+        last_progress = 0
+        for index, event in enumerate(timeline.events):
+            where = f"layer {timeline.layer} event {index}"
+            kind = event.get("kind")
+            progress = event.get("progress", -1)
+            if kind not in LEVEL_EVENT_KINDS:
+                problems.append(f"{where}: unknown kind {kind!r}")
+                continue
+            if not 0 <= progress <= layer_height:
+                problems.append(f"{where}: progress {progress} outside the layer")
+            if progress < last_progress:
+                problems.append(f"{where}: events are not sorted by progress")
+            last_progress = progress
+            
+            try:
+                if kind == "enemy":
+                    if not 0 <= event["x"] <= SCREEN_WIDTH - 30:
+                        problems.append(f"{where}: enemy x={event['x']} leaves the screen")
+                    if event["type"] not in ENEMY_TYPES:
+                        problems.append(f"{where}: unknown enemy type {event['type']!r}")
+                elif kind == "static_enemy":
+                    if not 0 <= event["x"] <= SCREEN_WIDTH - 40:
+                        problems.append(f"{where}: static enemy x={event['x']} leaves the screen")
+                    if event["type"] not in STATIC_ENEMY_TYPES:
+                        problems.append(f"{where}: unknown pattern type {event['type']!r}")
+                elif kind == "formation":
+                    for row in event["obstacles"]:
+                        check_obstacle(where, row)
+                elif kind == "health_orb":
+                    if not event["candidates"]:
+                        problems.append(f"{where}: health orb has no candidate positions")
+                    for limit, x in event["candidates"]:
+                        if not 0 <= x <= SCREEN_WIDTH - 20:
+                            problems.append(f"{where}: health orb x={x} leaves the screen")
+                else:  # nina_note
+                    notes += 1
+                    if not 0 <= event["x"] <= SCREEN_WIDTH - 30:
+                        problems.append(f"{where}: note x={event['x']} leaves the screen")
+            except (KeyError, TypeError, ValueError) as e:
+                problems.append(f"{where}: malformed {kind} event ({e!r})")
+        
+        if not timeline.refills:
+            problems.append(f"layer {timeline.layer}: no basic obstacle refills")
+        for index, pair in enumerate(timeline.refills):
+            for row in pair:
+                check_obstacle(f"layer {timeline.layer} refill {index}", row)
+        for index, roll in enumerate(timeline.orb_rolls):
+            try:
+                limit, x = roll
+                if not 0 <= x <= SCREEN_WIDTH - 20:
+                    problems.append(f"layer {timeline.layer} orb roll {index}: health orb x={x} leaves the screen")
+            except (TypeError, ValueError) as e:
+                problems.append(f"layer {timeline.layer} orb roll {index}: malformed ({e!r})")
+    
+    if notes > 1:
+        problems.append(f"{notes} NiNa's notes (at most one is allowed)")
+    return problems
+
+def save_levels(path, levels, seed=None):
+    with open(path, "w") as f:
+        json.dump({"seed": seed, "layers": [timeline.to_json() for timeline in levels]}, f, indent=1)
+
+def load_levels(path, layer_height):
+    """Load hand-written or dumped timelines, raising ValueError if invalid"""
+    with open(path) as f:
+        data = json.load(f)
+    levels = [LevelTimeline.from_json(layer) for layer in data["layers"]]
+    levels.sort(key=lambda timeline: timeline.layer)
+    if [timeline.layer for timeline in levels] != list(range(len(LAYER_THEMES))):
+        raise ValueError(f"{path}: expected one timeline per layer")
+    for timeline in levels:
+        # Hand-written files needn't be in order
+        timeline.events.sort(key=lambda event: event.get("progress", -1))
+    problems = validate_levels(levels, layer_height)
+    if problems:
+        raise ValueError(f"{path}: " + "; ".join(problems))
+    return levels
+
+def load_sprite_images():
+    """Load and scale the sprite PNGs, skipping any that fail to load"""
+    images = {}
+    for name, (filename, (width, height)) in SPRITE_FILES.items():
+        try:
+            raw_image = pygame.image.load(filename).convert_alpha()
+            if width is None:
+                # Calculate width based on aspect ratio while keeping the height
+                width = int(height * raw_image.get_width() / raw_image.get_height())
+            images[name] = pygame.transform.scale(raw_image, (width, height))
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Could not load {filename}: {e}")
+            print("Using fallback rectangle graphics")
+    
+    # Tinted variants of the ship, so flashing doesn't re-blend every frame
+    if "ship-body" in images:
+        images["ship-body-flash"] = Player.apply_color_overlay(images["ship-body"], (255, 255, 255), 10)  # 10% white overlay
+    if "ship-nose" in images:
+        images["ship-nose-active"] = Player.apply_color_overlay(images["ship-nose"], (255, 255, 0), 10)  # 10% yellow overlay
+        images["ship-nose-flash"] = Player.apply_color_overlay(images["ship-nose"], (255, 255, 255), 10)  # 10% white overlay
+    return images
+
+def render_primitive_images():
+    """Render the pulse and indicator animations frame by frame.
+    
+    pulse_timer wraps at 60, so a health orb has only 61 distinct frames.
+    """
+    clips = {
+        "health-orb": AnimationClip.render(61, (24, 24), HealthOrb.render_frame),
+        "nina-note": AnimationClip.render(1, (60, 40), NiNaNote.render_frame),
+        "indicator-circular": AnimationClip.render(1, (24, 24), StaticEnemy.render_circular_indicator),
+        "indicator-spiral": AnimationClip.render(len(SPIRAL_INDICATOR_POINTS), (24, 24), StaticEnemy.render_spiral_indicator),
+        "indicator-aimed": AnimationClip.render(1, (24, 24), StaticEnemy.render_aimed_indicator),
+    }
+    images = {}
+    for name, frames in clips.items():
+        if len(frames) == 1:
+            images[name] = frames[0]
+        else:
+            for index, frame in enumerate(frames):
+                images[f"{name}/{index}"] = frame
+    return images
+
+def file_stamp(filenames):
+    """Return the mtime and size of each file, None for missing ones"""
+    sources = {}
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+            sources[filename] = [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            sources[filename] = None
+    return sources
+
+def atlas_stamp():
+    """Identify the inputs of the sprite atlas so a stale cache is rebuilt"""
+    return {"version": ATLAS_VERSION, "sources": file_stamp(filename for filename, size in SPRITE_FILES.values())}
+
+def bundle_stamp():
+    """Identify the inputs of the asset bundle so a stale bundle is ignored"""
+    return {"version": AssetBundle.VERSION, "atlas": atlas_stamp(),
+            "layers": file_stamp(LAYER_FILES), "screen_width": SCREEN_WIDTH}
+
+def build_atlas():
+    """Scale every sprite, bake the animation frames and pack them together"""
+    images = load_sprite_images()
+    images.update(render_primitive_images())
+    return TextureAtlas.pack(images)
+
+def load_graphics(bundle=None):
+    """Load the sprite atlas and hand its regions to the entity classes.
+    
+    The atlas comes from the asset bundle if one was baked. Otherwise the
+    first run scales every sprite, bakes the animation frames, packs them
+    into one surface and saves it under ATLAS_CACHE_DIR; later runs load the
+    packed atlas directly.
+    """
+    image_path = os.path.join(ATLAS_CACHE_DIR, "atlas.png")
+    table_path = os.path.join(ATLAS_CACHE_DIR, "atlas.json")
+    stamp = atlas_stamp()
+    
+    if bundle and bundle.has("atlas"):
+        regions = {name: pygame.Rect(region) for name, region in bundle.meta("atlas")["regions"].items()}
+        atlas = TextureAtlas(bundle.surface("atlas").convert_alpha(), regions)
+    else:
+        atlas = TextureAtlas.load(image_path, table_path, stamp)
+        if atlas:
+            print(f"Sprite atlas loaded from {image_path}")
+    
+    if not atlas:
+        atlas = build_atlas()
+        print(f"Sprite atlas packed ({len(atlas.regions)} images, {atlas.surface.get_width()}x{atlas.surface.get_height()})")
+        try:
+            atlas.save(image_path, table_path, stamp)
+        except (OSError, pygame.error) as e:
+            print(f"Could not save sprite atlas: {e}")
+    
+    Player.body_clip = atlas.clip("ship-body")
+    Player.body_flash_clip = atlas.clip("ship-body-flash")
+    Player.drill_clip = atlas.clip("ship-nose")
+    Player.drill_active_clip = atlas.clip("ship-nose-active")
+    Player.drill_flash_clip = atlas.clip("ship-nose-flash")
+    Enemy.sprite = atlas.clip("enemy-flying")
+    StaticEnemy.sprite = atlas.clip("static-enemy")
+    HealthOrb.clip = atlas.clip("health-orb", 61, (12, 12))
+    NiNaNote.clip = atlas.clip("nina-note")
+    StaticEnemy.indicator_clips = {
+        "circular": atlas.clip("indicator-circular", 1, (12, 12)),
+        "spiral": atlas.clip("indicator-spiral", len(SPIRAL_INDICATOR_POINTS), (12, 12)),
+        "aimed": atlas.clip("indicator-aimed", 1, (12, 12)),
+    }
+    return atlas
+
+class AssetBundle:
+    """Pre-scaled pixel data in one memory-mapped file.
+    
+    Layout: MAGIC, a little-endian u32 index length, the JSON index, then the
+    raw pixel blocks. The index maps each name to its block's offset, length,
+    size and pygame pixel format, plus optional metadata (such as the atlas
+    region table). Surfaces wrap the mapped bytes with
+    pygame.image.frombuffer, so loading decodes nothing.
+    """
+    MAGIC = b"ZTBUNDLE"
+    VERSION = 1
+    ALIGNMENT = 16
+    
+    def __init__(self, data, index):
+        self.data = data  # mmap kept open for the surfaces that wrap it
+        self.index = index
+        self.view = memoryview(data)
+    
+    @classmethod
+    def open(cls, path, stamp):
+        """Map a bundle, or return None if it is missing or was baked from other inputs"""
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        
+        try:
+            header_size = len(cls.MAGIC) + 4
+            if data[:len(cls.MAGIC)] != cls.MAGIC:
+                raise ValueError("bad magic")
+            (index_length,) = struct.unpack_from("<I", data, len(cls.MAGIC))
+            index = json.loads(bytes(data[header_size:header_size + index_length]).decode("utf-8"))
+            if index["stamp"] != stamp:
+                print(f"Ignoring out of date asset bundle {path}; run with --bake to rebuild it")
+                data.close()
+                return None
+        except (ValueError, KeyError, struct.error) as e:
+            print(f"Could not read asset bundle {path}: {e}")
+            data.close()
+            return None
+        print(f"Asset bundle mapped from {path}")
+        return cls(data, index)
+    
+    def has(self, name):
+        return name in self.index["entries"]
+    
+    def meta(self, name):
+        return self.index["entries"][name].get("meta", {})
+    
+    def surface(self, name):
+        """Wrap a stored image without copying; convert() it before blitting"""
+        entry = self.index["entries"][name]
+        block = self.view[entry["offset"]:entry["offset"] + entry["length"]]
+        return pygame.image.frombuffer(block, tuple(entry["size"]), entry["format"])
+    
+    def release(self, name):
+        """Let the OS drop a block's mapped pages once it has been copied out; they are
+        read back from the file if the block is used again"""
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return  # Not on this platform; the pages just stay cached
+        entry = self.index["entries"][name]
+        start = entry["offset"] - entry["offset"] % mmap.PAGESIZE
+        self.data.madvise(mmap.MADV_DONTNEED, start, entry["offset"] + entry["length"] - start)
+    
+    @classmethod
+    def write(cls, path, images, stamp):
+        """Write images, a dict of name -> (surface, pixel format, metadata)"""
+        blocks = []
+        entries = {}
+        offset = 0
+        for name, (surface, pixel_format, meta) in images.items():
+            pixels = pygame.image.tobytes(surface, pixel_format)
+            entries[name] = {"offset": offset, "length": len(pixels), "size": list(surface.get_size()),
+                             "format": pixel_format, "meta": meta}
+            padding = -len(pixels) % cls.ALIGNMENT
+            blocks.append(pixels + bytes(padding))
+            offset += len(pixels) + padding
+        
+        # Block offsets are relative until the index size is known
+        def encode_index(base):
+            shifted = {name: dict(entry, offset=entry["offset"] + base) for name, entry in entries.items()}
+            return json.dumps({"stamp": stamp, "entries": shifted}).encode("utf-8")
+        
+        header_size = len(cls.MAGIC) + 4
+        base = 0
+        while True:
+            index = encode_index(base)
+            data_start = header_size + len(index)
+            data_start += -data_start % cls.ALIGNMENT
+            if data_start == base:
+                break
+            base = data_start
+        
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(cls.MAGIC)
+            f.write(struct.pack("<I", len(index)))
+            f.write(index)
+            f.write(bytes(base - header_size - len(index)))
+            for block in blocks:
+                f.write(block)
+        os.replace(temp_path, path)
+
+def bake_asset_bundle(path=ASSET_BUNDLE_PATH):
+    """Scale the backgrounds and build the sprite atlas, then store the pixels in one bundle"""
+    images = {}
+    atlas = build_atlas()
+    regions = {name: list(rect) for name, rect in atlas.regions.items()}
+    images["atlas"] = (atlas.surface, "RGBA", {"regions": regions})
+    
+    for i, filename in enumerate(LAYER_FILES):
+        try:
+            raw_image = pygame.image.load(filename).convert()
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Could not load {filename}: {e}")
+            continue
+        # Scale horizontally to screen width, keep original height for tiling
+        scaled_image = pygame.transform.scale(raw_image, (SCREEN_WIDTH, raw_image.get_height()))
+        images[f"layer/{i}"] = (scaled_image, "RGBX", {})
+    
+    AssetBundle.write(path, images, bundle_stamp())
+    print(f"Asset bundle written to {path} ({os.path.getsize(path) // 1024} KB, {len(images)} images)")
+
+class AssetLoader:
+    """Loads image files on a worker thread while the game keeps drawing.
+    
+    prepare(image) also runs on the worker (e.g. scaling). Anything that
+    needs the display, such as convert(), must wait until wait() returns.
+    on_progress(loaded, total) is called from the worker thread.
+    """
+    def __init__(self, filenames, prepare=None, on_progress=None):
+        self.filenames = list(filenames)
+        self.prepare = prepare
+        self.on_progress = on_progress
+        self.images = {}
+        self.errors = {}
+        self.loaded = 0
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="asset-loader", daemon=True)
+        self.thread.start()
+    
+    def run(self):
+        try:
+            for filename in self.filenames:
+                try:
+                    image = pygame.image.load(filename)
+                    if self.prepare:
+                        image = self.prepare(image)
+                    self.images[filename] = image
+                except Exception as e:
+                    self.errors[filename] = e
+                self.loaded += 1
+                if self.on_progress:
+                    self.on_progress(self.loaded, len(self.filenames))
+        finally:
+            self.done.set()
+    
+    @property
+    def progress(self):
+        return self.loaded / len(self.filenames) if self.filenames else 1.0
+    
+    def ready(self):
+        return self.done.is_set()
+    
+    def wait(self):
+        """Block until every file is loaded; returns (images, errors) keyed by filename"""
+        self.done.wait()
+        return self.images, self.errors
+
+class BackgroundManager:
+    """Layer backgrounds, scaled to the screen width and tiled vertically.
+    
+    Each layer is pre-composited once into a strip of its image repeated to
+    SCREEN_HEIGHT + the image height, so any scroll position is a single
+    sub-rect blit of the strip. A layer can scroll at its own LAYER_DEPTHS
+    speed for parallax at no extra cost, and the crossfade into the next
+    layer is one more blit with the strip's surface alpha.
+    
+    Only the strips are kept: the image a strip is built from is dropped
+    once it is composited, and a layer's pages in the asset bundle are
+    released once they have been copied out. The strips are a MEMORY
+    client: any layer that isn't on screen
+    may be evicted, and is loaded again the next time it is drawn. With
+    streaming, only the current and next layer are kept: update_residency()
+    evicts a layer through MEMORY once it has been passed, and decodes the
+    next one on a worker thread once the current one is BACKGROUND_PREFETCH
+    done.
+    """
+    rebuild_cost = 25  # Decoding a layer image, relative to rendering a line of text
+    
+    # Solid colours used when a layer image can't be loaded
+    FALLBACK_COLORS = [
+        (139, 0, 0),      # Core - Dark red
+        (255, 69, 0),     # Mantle - Orange red
+        (139, 69, 19),    # Lower Crust - Brown
+        (105, 105, 105),  # Upper Crust - Gray
+        (135, 206, 235)   # Surface - Sky blue
+    ]
+    
+    def __init__(self, bundle=None, async_load=False, on_progress=None, streaming=False):
+        self.bundle = bundle
+        self.streaming = streaming
+        self.initial_layers = [0, 1] if streaming else list(range(len(LAYER_FILES)))
+        self.prefetch = None  # (layer, AssetLoader) decoding ahead while streaming
+        self.strips = {}  # Layer -> pre-composited strip
+        self.periods = {}  # Layer -> height of its image, after which the strip repeats
+        self.last_used = {}  # Layer -> MEMORY tick when it was last drawn
+        self.in_use = {0, 1}  # Layers on screen, never evicted
+        self.failed = set()  # Layers drawn with a fallback colour
+        self.images_loaded = False
+        self.blend_zone_height = 200  # Height of blending zone between layers
+        self.blend_enabled = True  # Crossfade into the next layer; off cuts over at the boundary
+        self.loader = None
+        
+        # Load the starting layer images, from the bundle if it has them all
+        if bundle and all(bundle.has(f"layer/{i}") for i in self.initial_layers):
+            self.load_layer_images()
+        elif async_load:
+            self.loader = AssetLoader([LAYER_FILES[i] for i in self.initial_layers],
+                                      prepare=self.scale_to_screen_width, on_progress=on_progress)
+        else:
+            self.load_layer_images()
+    
+    @staticmethod
+    def scale_to_screen_width(image):
+        # Scale horizontally to screen width, keep original height for tiling
+        return pygame.transform.scale(image, (SCREEN_WIDTH, image.get_height()))
+    
+    def ready(self):
+        """True once finish_loading() won't have to wait for the loader"""
+        return self.loader is None or self.loader.ready()
+    
+    def finish_loading(self):
+        """Wait for the background loader, then convert its images on this thread"""
+        if self.loader is None:
+            return
+        images, errors = self.loader.wait()
+        self.loader = None
+        for i in self.initial_layers:
+            filename = LAYER_FILES[i]
+            if filename in images:
+                self.store(i, images[filename].convert())
+            else:
+                print(f"Could not load {filename}: {errors.get(filename)}")
+                self.failed.add(i)
+                self.store(i, self.fallback_surface(i))
+        self.images_loaded = True
+        print("Background layer images loaded successfully")
+        MEMORY.enforce()
+    
+    def fallback_surface(self, layer_index):
+        # Create fallback colored surface
+        fallback_surface = pygame.Surface((SCREEN_WIDTH, 200))
+        fallback_surface.fill(self.FALLBACK_COLORS[layer_index])
+        return fallback_surface
+    
+    def load_layer(self, i):
+        """Load layer i scaled to the screen width, or its fallback colour"""
+        if i in self.failed:
+            return self.fallback_surface(i)
+        if self.bundle and self.bundle.has(f"layer/{i}"):
+            # Already scaled by the bake step; only the strip built from the copy is kept
+            image = self.bundle.surface(f"layer/{i}").convert()
+            self.bundle.release(f"layer/{i}")
+            return image
+        
+        filename = LAYER_FILES[i]
+        try:
+            # Only the scaled image is kept; the full-size one is dropped right away
+            return self.scale_to_screen_width(pygame.image.load(filename).convert())
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Could not load {filename}: {e}")
+            self.failed.add(i)
+            return self.fallback_surface(i)
     
-    def take_damage(self, damage):
-        if not self.destructible:
-            return False
-        self.health -= damage
-        return self.health <= 0
-
-class BackgroundManager:
-    def __init__(self):
-        self.layer_images = {}
-        self.scaled_images = {}
-        self.images_loaded = False
-        self.blend_zone_height = 200  # Height of blending zone between layers
-        
-        # Load all layer images
-        self.load_layer_images()
+    def store(self, i, image):
+        """Pre-composite layer i's image into its strip and keep that instead"""
+        period = image.get_height()
+        strip = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT + period), 0, image)
+        for y in range(0, strip.get_height(), period):
+            strip.blit(image, (0, y))
+        self.strips[i] = strip
+        self.periods[i] = period
+        self.last_used[i] = MEMORY.tick()
     
     def load_layer_images(self):
-        """Load and scale all layer background images"""
-        layer_files = [
-            "res/layer1.png",  # Core
-            "res/layer2.png",  # Mantle
-            "res/layer3.png",  # Lower Crust
-            "res/layer4.png",  # Upper Crust
-            "res/layer6.png"   # Surface (using layer6 for layer 5)
-        ]
-        
+        """Load and scale the starting layer background images"""
         try:
-            for i, filename in enumerate(layer_files):
-                try:
-                    # Load the image
-                    raw_image = pygame.image.load(filename).convert()
-                    
-                    # Scale horizontally to screen width, keep original height for tiling
-                    original_height = raw_image.get_height()
-                    scaled_image = pygame.transform.scale(raw_image, (SCREEN_WIDTH, original_height))
-                    
-                    self.layer_images[i] = raw_image
-                    self.scaled_images[i] = scaled_image
-                    
-                except (pygame.error, FileNotFoundError) as e:
-                    print(f"Could not load {filename}: {e}")
-                    # Create fallback colored surface
-                    fallback_colors = [
-                        (139, 0, 0),      # Core - Dark red
-                        (255, 69, 0),     # Mantle - Orange red
-                        (139, 69, 19),    # Lower Crust - Brown
-                        (105, 105, 105),  # Upper Crust - Gray
-                        (135, 206, 235)   # Surface - Sky blue
-                    ]
-                    fallback_surface = pygame.Surface((SCREEN_WIDTH, 200))
-                    fallback_surface.fill(fallback_colors[i])
-                    self.scaled_images[i] = fallback_surface
+            for i in self.initial_layers:
+                self.store(i, self.load_layer(i))
             
             self.images_loaded = True
             print("Background layer images loaded successfully")
+            MEMORY.enforce()
             
         except Exception as e:
             print(f"Failed to load background images: {e}")
             self.images_loaded = False
     
-    def draw_tiled_background(self, screen, layer_index, world_y):
-        """Draw a tiled background for a specific layer"""
-        if layer_index not in self.scaled_images:
+    @property
+    def memory_bytes(self):
+        return sum(strip.get_pitch() * strip.get_height() for strip in self.strips.values())
+    
+    def candidate(self):
+        evictable = [i for i in self.strips if i not in self.in_use]
+        if not evictable:
+            return None
+        i = min(evictable, key=lambda layer: self.last_used[layer])
+        strip = self.strips[i]
+        return i, self.last_used[i], strip.get_pitch() * strip.get_height()
+    
+    def evict(self, i):
+        del self.strips[i]
+    
+    def update_residency(self, current_layer, layer_progress, layer_height):
+        """Streaming: keep only the current and next layer, decoding the next one ahead of time"""
+        if not self.streaming or not self.images_loaded:
             return
-            
-        image = self.scaled_images[layer_index]
-        image_height = image.get_height()
-        
-        # Calculate how many tiles we need vertically
-        tiles_needed = (SCREEN_HEIGHT // image_height) + 3
-        
-        # Calculate the starting Y position for tiling based on world position
-        # Background moves downward with world scrolling (like static enemies)
-        scroll_offset = world_y % image_height
-        start_y = scroll_offset - image_height
-        
-        # Draw tiles
-        for i in range(tiles_needed):
-            y_pos = start_y + (i * image_height)
-            screen.blit(image, (0, y_pos))
+        self.in_use = {current_layer, current_layer + 1}
+        for i in [i for i in self.strips if i not in self.in_use]:
+            MEMORY.evict(self, i)
+        
+        ahead = current_layer + 1
+        if self.prefetch:
+            if self.prefetch[1].ready():
+                self.finish_prefetch()
+        elif (ahead < len(LAYER_FILES) and ahead not in self.strips
+              and layer_progress >= layer_height * BACKGROUND_PREFETCH):
+            self.start_prefetch(ahead)
+    
+    def start_prefetch(self, i):
+        if i in self.failed or (self.bundle and self.bundle.has(f"layer/{i}")):
+            # Nothing to decode: mapped straight from the bundle
+            self.store(i, self.load_layer(i))
+            MEMORY.enforce()
+            return
+        self.prefetch = (i, AssetLoader([LAYER_FILES[i]], prepare=self.scale_to_screen_width))
+    
+    def finish_prefetch(self):
+        """Take the prefetched layer from its loader, waiting for it if needed"""
+        i, loader = self.prefetch
+        self.prefetch = None
+        images, errors = loader.wait()
+        filename = LAYER_FILES[i]
+        if filename in images:
+            self.store(i, images[filename].convert())
+        else:
+            print(f"Could not load {filename}: {errors.get(filename)}")
+            self.failed.add(i)
+            self.store(i, self.fallback_surface(i))
+        MEMORY.enforce()
+    
+    def draw_layer(self, screen, layer_index, world_y, alpha=None):
+        """Draw a layer's background for a world position: one blit of its strip"""
+        if self.prefetch and self.prefetch[0] == layer_index:
+            self.finish_prefetch()  # Needed before it finished decoding
+        if layer_index not in self.strips:
+            # Evicted (memory budget, streaming) or never loaded: load it now
+            self.store(layer_index, self.load_layer(layer_index))
+            MEMORY.enforce()
+        self.last_used[layer_index] = MEMORY.tick()
+        strip = self.strips[layer_index]
+        
+        # Background moves downward with world scrolling (like static enemies), at the layer's depth
+        period = self.periods[layer_index]
+        scroll_offset = int(world_y * LAYER_DEPTHS[layer_index]) % period
+        strip.set_alpha(alpha)
+        screen.blit(strip, (0, 0), (0, (period - scroll_offset) % period, SCREEN_WIDTH, SCREEN_HEIGHT))
     
     def draw_blended_background(self, screen, current_layer, layer_progress, layer_height, world_y):
         """Draw background with blending between layers during transitions"""
@@ -763,26 +2278,238 @@ class BackgroundManager:
             screen.fill(bg_color)
             return
         
-        # Draw current layer background
-        self.draw_tiled_background(screen, current_layer, world_y)
+        # Draw current layer background; it and the next one stay loaded
+        self.in_use = {current_layer, current_layer + 1}
+        self.draw_layer(screen, current_layer, world_y)
         
         # Check if we're in a transition zone (near the end of current layer)
         transition_start = layer_height - self.blend_zone_height
         
-        if layer_progress >= transition_start and current_layer < 4:
+        if self.blend_enabled and layer_progress >= transition_start and current_layer < 4:
             # Calculate blend ratio (0.0 to 1.0)
             blend_progress = (layer_progress - transition_start) / self.blend_zone_height
             blend_progress = max(0.0, min(1.0, blend_progress))
             
-            # Create a surface for the next layer
-            next_layer_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            next_layer_surface.set_alpha(int(255 * blend_progress))
-            
-            # Draw next layer on the blend surface
-            self.draw_tiled_background(next_layer_surface, current_layer + 1, world_y)
-            
-            # Blit the blended next layer on top
-            screen.blit(next_layer_surface, (0, 0))
+            # Next layer straight on top, faded in with its strip's surface alpha
+            self.draw_layer(screen, current_layer + 1, world_y, int(255 * blend_progress))
+
+class SoundBank:
+    """Sound effects and per-layer music.
+    
+    Every effect is decoded (or synthesized, when its file is missing) once
+    at load. Plays go through a fixed pool of channels: a free channel is
+    used if there is one, otherwise the oldest voice of the lowest priority
+    not above the new sound is stolen, and each effect is limited to a few
+    voices so a volley of enemy shots can't take over the pool. Layer music
+    is streamed with mixer.music; it fades out while the background blends
+    into the next layer and the next track fades in as that layer starts.
+    """
+    def __init__(self, enabled=True, channels=SOUND_CHANNELS):
+        self.enabled = False
+        self.sounds = {}
+        self.music_layer = None
+        self.music_fading = False
+        if not enabled:
+            return
+        try:
+            pygame.mixer.init(buffer=512)
+            pygame.mixer.set_num_channels(channels)
+        except pygame.error as e:
+            print(f"Sound disabled: {e}")
+            return
+        
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.playing = [None] * channels  # Effect name on each channel
+        self.started = [0] * channels  # Play counter when it started, for oldest-first stealing
+        self.plays = 0
+        for name, (filename, priority, voices, synth) in SOUND_EFFECTS.items():
+            sound = self.load(filename, synth)
+            if sound:
+                self.sounds[name] = (sound, priority, voices)
+        self.enabled = True
+    
+    def load(self, filename, synth):
+        if os.path.exists(filename):
+            try:
+                return pygame.mixer.Sound(filename)
+            except pygame.error as e:
+                print(f"Could not load {filename}: {e}")
+        return synthesize_sound(*synth)
+    
+    def play(self, name):
+        if name not in self.sounds:
+            return
+        sound, priority, voices = self.sounds[name]
+        
+        free = None
+        victim = None
+        victim_rank = None
+        same = 0
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                if free is None:
+                    free = index
+                continue
+            playing = self.playing[index]
+            if playing == name:
+                same += 1
+            # Lowest priority, then oldest; anything not started here goes first
+            rank = (self.sounds[playing][1] if playing in self.sounds else -1, self.started[index])
+            if rank[0] <= priority and (victim_rank is None or rank < victim_rank):
+                victim, victim_rank = index, rank
+        if same >= voices:
+            return
+        index = free if free is not None else victim
+        if index is None:
+            return  # Every channel is busy with something more important
+        
+        self.channels[index].play(sound)
+        self.playing[index] = name
+        self.plays += 1
+        self.started[index] = self.plays
+    
+    def update_music(self, layer, layer_progress, layer_height, blend_zone_height, scroll_speed):
+        """Keep the music in step with the layer and its blend into the next one"""
+        if not self.enabled:
+            return
+        fade_ms = int(blend_zone_height / scroll_speed * 1000 / FPS)
+        if layer != self.music_layer:
+            self.music_layer = layer
+            self.music_fading = False
+            pygame.mixer.music.stop()
+            filename = LAYER_MUSIC[layer]
+            if os.path.exists(filename):
+                try:
+                    pygame.mixer.music.load(filename)
+                    pygame.mixer.music.play(-1, fade_ms=fade_ms)
+                except pygame.error as e:
+                    print(f"Could not play {filename}: {e}")
+        elif not self.music_fading and layer < 4 and layer_progress >= layer_height - blend_zone_height:
+            pygame.mixer.music.fadeout(fade_ms)
+            self.music_fading = True
+    
+    def restart_music(self):
+        """Play the layer's track from the start on the next update, as after a retry"""
+        self.music_layer = None
+        self.music_fading = False
+    
+    def fade_music(self, fade_ms):
+        if self.enabled:
+            pygame.mixer.music.fadeout(fade_ms)
+            self.music_fading = True
+    
+    def close(self):
+        if self.enabled:
+            pygame.mixer.quit()
+            self.enabled = False
+
+def synthesize_sound(wave, start_hz, end_hz, seconds, volume):
+    """Stand-in for a missing effect file: a decaying tone sweep or noise burst"""
+    frequency, size, channels = pygame.mixer.get_init()
+    if np is None or size != -16:
+        return None  # Needs NumPy and signed 16-bit output
+    t = np.arange(int(frequency * seconds)) / (frequency * seconds)
+    phase = np.cumsum((start_hz + (end_hz - start_hz) * t) / frequency)
+    if wave == "sine":
+        values = np.sin(2 * np.pi * phase)
+    elif wave == "square":
+        values = np.where(phase % 1.0 < 0.5, 1.0, -1.0)
+    else:
+        values = np.random.default_rng(0).uniform(-1.0, 1.0, len(t))  # Never touch the gameplay random stream
+    samples = (values * volume * (1.0 - t) * 32767).astype(np.int16)
+    return pygame.mixer.Sound(buffer=np.repeat(samples, channels).tobytes())
+
+class FontRegistry:
+    """Fonts shared by every scene, opened once per (face, size)"""
+    def __init__(self):
+        self.fonts = {}
+    
+    def get(self, size, face=None):
+        key = (face, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(face, size)
+        return font
+
+class SurfaceCache:
+    """Surfaces that can be recreated, kept in least recently used order.
+    
+    Entries are dropped, oldest first, once the cache holds more than its
+    own max_bytes or when the MEMORY budget needs room. The entry used last
+    is never given up, so the surface a caller was just handed stays valid
+    until it is blitted.
+    """
+    rebuild_cost = 1
+    
+    def __init__(self, max_bytes=None):
+        self.surfaces = OrderedDict()  # key -> [surface, last used tick]
+        self.max_bytes = max_bytes
+        self.bytes = 0
+    
+    @property
+    def memory_bytes(self):
+        return self.bytes
+    
+    def get(self, key):
+        entry = self.surfaces.get(key)
+        if entry is None:
+            return None
+        self.surfaces.move_to_end(key)
+        entry[1] = MEMORY.tick()
+        return entry[0]
+    
+    def put(self, key, surface):
+        self.surfaces[key] = [surface, MEMORY.tick()]
+        self.bytes += surface.get_pitch() * surface.get_height()
+        while self.max_bytes is not None and self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            self.evict(next(iter(self.surfaces)))
+        MEMORY.enforce()
+        return surface
+    
+    def candidate(self):
+        if len(self.surfaces) < 2:
+            return None
+        key, (surface, last_used) = next(iter(self.surfaces.items()))
+        return key, last_used, surface.get_pitch() * surface.get_height()
+    
+    def evict(self, key):
+        surface, _ = self.surfaces.pop(key)
+        self.bytes -= surface.get_pitch() * surface.get_height()
+
+class TextCache(SurfaceCache):
+    """Rendered text surfaces, reused whenever the same text is drawn again.
+    
+    The surfaces are shared, so callers must only blit them.
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        super().__init__(max_bytes)
+    
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.get(key)
+        if surface is not None:
+            return surface
+        return self.put(key, font.render(text, True, color))
+
+class ShadeCache(SurfaceCache):
+    """Solid, screen-sized surfaces for tinting or darkening part of the screen.
+    
+    The shade is blitted with a per-surface alpha, so overlays that change
+    strength every frame don't need a Surface of their own.
+    """
+    def draw(self, surface, color, alpha, rect):
+        shade = self.get(color)
+        if shade is None:
+            shade = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            shade.fill(color)
+            self.put(color, shade)
+        shade.set_alpha(alpha)
+        area = surface.get_clip().clip(rect)
+        surface.blit(shade, area, (0, 0, area.width, area.height))
+
+FONTS = FontRegistry()
+TEXT_CACHE = MEMORY.register("text", TextCache())
+SHADES = MEMORY.register("shades", ShadeCache())
 
 class OutroScene:
     def __init__(self):
@@ -819,10 +2546,10 @@ class OutroScene:
         self.can_advance = False
         
         # Fonts
-        self.speaker_font = pygame.font.Font(None, 32)
-        self.dialogue_font = pygame.font.Font(None, 28)
-        self.instruction_font = pygame.font.Font(None, 24)
-        self.title_font = pygame.font.Font(None, 48)
+        self.speaker_font = FONTS.get(32)
+        self.dialogue_font = FONTS.get(28)
+        self.instruction_font = FONTS.get(24)
+        self.title_font = FONTS.get(48)
     
     def update(self):
         if self.show_to_be_continued:
@@ -878,12 +2605,12 @@ class OutroScene:
         
         if self.show_to_be_continued:
             # Draw "To be continued..." screen
-            title_text = self.title_font.render("To be continued...", True, YELLOW)
+            title_text = TEXT_CACHE.render(self.title_font, "To be continued...", YELLOW)
             title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
             screen.blit(title_text, title_rect)
             
             instruction_text = "Press any key to return to victory screen"
-            instruction_surface = self.instruction_font.render(instruction_text, True, WHITE)
+            instruction_surface = TEXT_CACHE.render(self.instruction_font, instruction_text, WHITE)
             instruction_rect = instruction_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 60))
             screen.blit(instruction_surface, instruction_rect)
             return
@@ -894,7 +2621,7 @@ class OutroScene:
         current_dialogue = self.dialogue[self.current_line]
         
         # Draw speaker name
-        speaker_text = self.speaker_font.render(current_dialogue["speaker"], True, current_dialogue["color"])
+        speaker_text = TEXT_CACHE.render(self.speaker_font, current_dialogue["speaker"], current_dialogue["color"])
         speaker_rect = speaker_text.get_rect(center=(SCREEN_WIDTH // 2, 150))
         screen.blit(speaker_text, speaker_rect)
         
@@ -909,8 +2636,7 @@ class OutroScene:
         
         for word in words:
             test_line = current_line_text + word + " "
-            test_surface = self.dialogue_font.render(test_line, True, WHITE)
-            if test_surface.get_width() > max_width and current_line_text:
+            if self.dialogue_font.size(test_line)[0] > max_width and current_line_text:
                 lines.append(current_line_text.strip())
                 current_line_text = word + " "
             else:
@@ -922,7 +2648,7 @@ class OutroScene:
         # Draw dialogue lines
         y_offset = 200
         for line in lines:
-            dialogue_surface = self.dialogue_font.render(line, True, WHITE)
+            dialogue_surface = TEXT_CACHE.render(self.dialogue_font, line, WHITE)
             dialogue_rect = dialogue_surface.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
             screen.blit(dialogue_surface, dialogue_rect)
             y_offset += 35
@@ -938,12 +2664,12 @@ class OutroScene:
             instruction_text = "Press SPACE or ENTER to skip typing"
             instruction_color = WHITE
         
-        instruction_surface = self.instruction_font.render(instruction_text, True, instruction_color)
+        instruction_surface = TEXT_CACHE.render(self.instruction_font, instruction_text, instruction_color)
         instruction_rect = instruction_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 80))
         screen.blit(instruction_surface, instruction_rect)
         
         skip_text = "Press ESC to skip outro"
-        skip_surface = self.instruction_font.render(skip_text, True, GRAY)
+        skip_surface = TEXT_CACHE.render(self.instruction_font, skip_text, GRAY)
         skip_rect = skip_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
         screen.blit(skip_surface, skip_rect)
         
@@ -991,9 +2717,9 @@ class ConversationScene:
         self.can_advance = False
         
         # Fonts
-        self.speaker_font = pygame.font.Font(None, 32)
-        self.dialogue_font = pygame.font.Font(None, 28)
-        self.instruction_font = pygame.font.Font(None, 24)
+        self.speaker_font = FONTS.get(32)
+        self.dialogue_font = FONTS.get(28)
+        self.instruction_font = FONTS.get(24)
     
     def update(self):
         if self.scene_complete:
@@ -1048,7 +2774,7 @@ class ConversationScene:
         current_dialogue = self.dialogue[self.current_line]
         
         # Draw speaker name
-        speaker_text = self.speaker_font.render(current_dialogue["speaker"], True, current_dialogue["color"])
+        speaker_text = TEXT_CACHE.render(self.speaker_font, current_dialogue["speaker"], current_dialogue["color"])
         speaker_rect = speaker_text.get_rect(center=(SCREEN_WIDTH // 2, 150))
         screen.blit(speaker_text, speaker_rect)
         
@@ -1063,8 +2789,7 @@ class ConversationScene:
         
         for word in words:
             test_line = current_line_text + word + " "
-            test_surface = self.dialogue_font.render(test_line, True, WHITE)
-            if test_surface.get_width() > max_width and current_line_text:
+            if self.dialogue_font.size(test_line)[0] > max_width and current_line_text:
                 lines.append(current_line_text.strip())
                 current_line_text = word + " "
             else:
@@ -1076,7 +2801,7 @@ class ConversationScene:
         # Draw dialogue lines
         y_offset = 200
         for line in lines:
-            dialogue_surface = self.dialogue_font.render(line, True, WHITE)
+            dialogue_surface = TEXT_CACHE.render(self.dialogue_font, line, WHITE)
             dialogue_rect = dialogue_surface.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
             screen.blit(dialogue_surface, dialogue_rect)
             y_offset += 35
@@ -1092,12 +2817,12 @@ class ConversationScene:
             instruction_text = "Press SPACE or ENTER to skip typing"
             instruction_color = WHITE
         
-        instruction_surface = self.instruction_font.render(instruction_text, True, instruction_color)
+        instruction_surface = TEXT_CACHE.render(self.instruction_font, instruction_text, instruction_color)
         instruction_rect = instruction_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 80))
         screen.blit(instruction_surface, instruction_rect)
         
         skip_text = "Press ESC to skip intro"
-        skip_surface = self.instruction_font.render(skip_text, True, GRAY)
+        skip_surface = TEXT_CACHE.render(self.instruction_font, skip_text, GRAY)
         skip_rect = skip_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
         screen.blit(skip_surface, skip_rect)
         
@@ -1111,45 +2836,797 @@ class ConversationScene:
         pygame.draw.rect(screen, DARK_GRAY, (progress_x, progress_y, progress_width, progress_height))
         pygame.draw.rect(screen, WHITE, (progress_x, progress_y, progress_width * progress, progress_height))
 
+class SaveStore:
+    """High scores, best times, discoveries and settings in one JSON file.
+    
+    Changes are made to the in-memory data on the main thread. A writer
+    thread saves the latest version a moment later, so a burst of changes
+    becomes a single write, and replaces the file atomically. No frame ever
+    waits on the disk. A store without a path keeps everything in memory.
+    """
+    VERSION = 1
+    
+    def __init__(self, path=SAVE_FILE, coalesce_delay=0.5):
+        self.path = path
+        self.coalesce_delay = coalesce_delay
+        self.data = self.load()
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.stop = threading.Event()
+        self.thread = None
+        if path:
+            self.thread = threading.Thread(target=self.run, name="save-writer", daemon=True)
+            self.thread.start()
+    
+    @classmethod
+    def defaults(cls):
+        return {
+            "version": cls.VERSION,
+            "played_before": False,
+            "high_score": 0,
+            "layer_high_scores": {},  # Layer index -> best score when finishing it
+            "best_layer_times": {},  # Layer index -> fewest seconds, retries included
+            "best_run_time": None,
+            "nina_note_found": False,
+            "settings": {},
+        }
+    
+    def load(self):
+        data = self.defaults()
+        if not self.path:
+            return data
+        try:
+            with open(self.path) as f:
+                data.update(json.load(f))
+        except FileNotFoundError:
+            # Older versions only remembered that the intro had been seen
+            try:
+                with open("player_data.txt") as f:
+                    data["played_before"] = f.read().strip() == "played_before"
+            except OSError:
+                pass
+        except (OSError, ValueError) as e:
+            print(f"Could not read save file {self.path}: {e}")
+        return data
+    
+    def run(self):
+        while True:
+            self.changed.wait()
+            if not self.stop.is_set():
+                # Let further changes pile up into the same write
+                self.stop.wait(self.coalesce_delay)
+            with self.lock:
+                self.changed.clear()
+                text = json.dumps(self.data, indent=1)
+            try:
+                self.write(text)
+            except OSError as e:
+                print(f"Could not save progress: {e}")
+            if self.stop.is_set() and not self.changed.is_set():
+                return
+    
+    def write(self, text):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self.writes += 1
+    
+    def mark_changed(self):
+        self.changed.set()
+    
+    def update(self, **values):
+        with self.lock:
+            self.data.update(values)
+        self.mark_changed()
+    
+    def setting(self, name, default=None):
+        return self.data["settings"].get(name, default)
+    
+    def set_setting(self, name, value):
+        if self.setting(name) == value:
+            return
+        with self.lock:
+            self.data["settings"][name] = value
+        self.mark_changed()
+    
+    def record_layer(self, layer, score, frames):
+        """Record finishing a layer with the given score after frames ticks"""
+        key = str(layer)  # JSON object keys are strings
+        with self.lock:
+            data = self.data
+            data["high_score"] = max(data["high_score"], score)
+            data["layer_high_scores"][key] = max(data["layer_high_scores"].get(key, 0), score)
+            seconds = round(frames / FPS, 2)
+            if key not in data["best_layer_times"] or seconds < data["best_layer_times"][key]:
+                data["best_layer_times"][key] = seconds
+        self.mark_changed()
+    
+    def record_run(self, score, frames):
+        """Record a finished game; frames is None if the run was resumed"""
+        with self.lock:
+            data = self.data
+            data["high_score"] = max(data["high_score"], score)
+            if frames is not None:
+                seconds = round(frames / FPS, 2)
+                if data["best_run_time"] is None or seconds < data["best_run_time"]:
+                    data["best_run_time"] = seconds
+        self.mark_changed()
+    
+    def close(self):
+        """Write any pending change and stop the writer thread"""
+        if self.thread:
+            self.stop.set()
+            self.changed.set()
+            self.thread.join(timeout=5)
+            self.thread = None
+
+class TelemetryWriter:
+    """Per-frame records kept in a preallocated ring of slots.
+    
+    record() only stores its values in the next slot; a background thread
+    packs the filled slots as fixed-width structs into a preallocated buffer
+    and appends that to the file. If the disk falls a whole ring behind,
+    new records are dropped and counted rather than blocking.
+    """
+    def __init__(self, path, groups, capacity=4096):
+        self.fields = list(TELEMETRY_FIELDS) + [f"count_{name}" for name in groups]
+        # Lists are flushed at the end of update(), so their items are exactly the live entities
+        self.group_items = [entities.items for entities in groups.values()]
+        self.record_struct = struct.Struct(TELEMETRY_FORMAT + "H" * len(groups))
+        self.pack_into = self.record_struct.pack_into
+        self.record_size = self.record_struct.size
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.buffer = bytearray(capacity * self.record_size)
+        self.head = 0  # Records packed so far
+        self.flushed = 0  # Records written to the file so far
+        self.dropped = 0
+        
+        self.file = open(path, "wb")
+        header = json.dumps({"fields": self.fields, "format": self.record_struct.format}).encode()
+        self.file.write(TELEMETRY_MAGIC + struct.pack("<II", TELEMETRY_VERSION, len(header)) + header)
+        
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="telemetry-writer", daemon=True)
+        self.thread.start()
+    
+    def record(self, frame, frame_ms, collision_tests, score, layer, health, quality):
+        """Store one record: the TELEMETRY_FIELDS values, then the group counts read here"""
+        head = self.head
+        pending = head - self.flushed
+        if pending >= self.capacity:
+            self.dropped += 1
+            return
+        self.slots[head % self.capacity] = (frame, frame_ms, collision_tests, score, layer, health, quality,
+                                            *map(len, self.group_items))
+        self.head = head + 1
+        if pending == self.capacity // 2:
+            self.wake.set()
+    
+    def run(self):
+        while not self.stop.is_set():
+            self.wake.wait(1.0)  # Flush at least once a second
+            self.wake.clear()
+            self.flush()
+        self.flush()
+    
+    def flush(self):
+        head = self.head
+        slots = self.slots
+        pack_into = self.pack_into
+        buffer = self.buffer
+        size = self.record_size
+        for offset, index in enumerate(range(self.flushed, head)):
+            pack_into(buffer, offset * size, *slots[index % self.capacity])
+        self.file.write(memoryview(buffer)[:(head - self.flushed) * size])
+        self.flushed = head
+    
+    def close(self):
+        self.stop.set()
+        self.wake.set()
+        self.thread.join()
+        self.file.close()
+        if self.dropped:
+            print(f"Telemetry dropped {self.dropped} records")
+
+def read_telemetry(path):
+    """Return (field names, struct.Struct, raw record bytes) from a telemetry file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != TELEMETRY_MAGIC:
+        raise ValueError(f"{path} is not a telemetry file")
+    version, header_size = struct.unpack_from("<II", data, 4)
+    if version != TELEMETRY_VERSION:
+        raise ValueError(f"{path}: unsupported telemetry version {version}")
+    header = json.loads(data[12:12 + header_size])
+    record_struct = struct.Struct(header["format"])
+    records = data[12 + header_size:]
+    # Ignore a partial record left by a crash
+    records = records[:len(records) - len(records) % record_struct.size]
+    return header["fields"], record_struct, records
+
+def telemetry_to_csv(path, out_path):
+    fields, record_struct, records = read_telemetry(path)
+    with open(out_path, "w") as f:
+        f.write(",".join(fields) + "\n")
+        for values in record_struct.iter_unpack(records):
+            f.write(",".join(f"{value:.4f}" if isinstance(value, float) else str(value)
+                             for value in values) + "\n")
+
+def telemetry_to_numpy(path):
+    """Load a telemetry file as a NumPy structured array (one row per frame)"""
+    if np is None:
+        raise ImportError("NumPy is needed to load telemetry as an array")
+    fields, record_struct, records = read_telemetry(path)
+    codes = record_struct.format.lstrip("<")
+    dtype = np.dtype([(name, "<" + code) for name, code in zip(fields, codes)])
+    return np.frombuffer(records, dtype=dtype)
+
+class QualityGovernor:
+    """Trades drawing detail for frame rate.
+    
+    Watches a rolling window of frame times. When the average runs close to
+    the frame budget, the next feature in QUALITY_FEATURES is switched off.
+    Features come back one at a time, in reverse order, after frames have
+    stayed well under budget for a while. The gap between the two thresholds,
+    the longer wait before restoring and the cooldown after every change keep
+    quality from flapping. apply(feature, enabled) does the actual switching.
+    """
+    def __init__(self, apply, budget_ms=1000 / FPS, window=60, drop_ratio=0.9, restore_ratio=0.6,
+                 restore_frames=180, cooldown=120):
+        self.apply = apply
+        self.budget_ms = budget_ms
+        self.drop_ms = budget_ms * drop_ratio
+        self.restore_ms = budget_ms * restore_ratio
+        self.restore_frames = restore_frames
+        self.cooldown = cooldown
+        self.samples = deque(maxlen=window)
+        self.total = 0.0
+        self.headroom = 0  # Consecutive frames with the average under restore_ms
+        self.frames_since_change = 0
+        self.dropped = 0  # QUALITY_FEATURES[:dropped] are switched off
+        for feature in QUALITY_FEATURES:
+            apply(feature, True)
+    
+    def record(self, frame_ms):
+        samples = self.samples
+        if len(samples) == samples.maxlen:
+            self.total -= samples[0]
+        samples.append(frame_ms)
+        self.total += frame_ms
+        self.frames_since_change += 1
+        if len(samples) < samples.maxlen or self.frames_since_change < self.cooldown:
+            return
+        
+        average = self.total / len(samples)
+        if average > self.drop_ms and self.dropped < len(QUALITY_FEATURES):
+            self.change(self.dropped, False, f"average frame {average:.1f} ms over the last {len(samples)} "
+                                             f"frames, budget {self.budget_ms:.1f} ms")
+            self.dropped += 1
+        elif average < self.restore_ms and self.dropped > 0:
+            self.headroom += 1
+            if self.headroom >= self.restore_frames:
+                self.dropped -= 1
+                self.change(self.dropped, True, f"average frame {average:.1f} ms for {self.headroom} "
+                                                f"frames, under {self.restore_ms:.1f} ms")
+        else:
+            self.headroom = 0
+    
+    @property
+    def level(self):
+        """Number of features still enabled"""
+        return len(QUALITY_FEATURES) - self.dropped
+    
+    def change(self, index, enabled, reason):
+        feature = QUALITY_FEATURES[index]
+        self.apply(feature, enabled)
+        print(f"Quality: {'restored' if enabled else 'dropped'} {feature} ({reason})")
+        self.headroom = 0
+        self.frames_since_change = 0
+        self.samples.clear()
+        self.total = 0.0
+
+class SurfaceTracker:
+    """Debug mode that counts every Surface created, per frame and per call site.
+    
+    install() replaces pygame.Surface and pygame.font.Font with subclasses
+    that report what they create, and wraps the transform functions and
+    image.load. Call sites are "function:line" of the code that asked for
+    the surface; misses in TextCache and ShadeCache are charged to their
+    caller. end_frame() totals the frame and flags it when its surfaces add
+    up to more than budget_bytes. Surfaces made by copy() or convert() of a
+    surface that didn't come from the constructor are not seen, and fonts
+    opened before install() are not tracked.
+    """
+    TRANSFORMS = ("scale", "smoothscale", "scale_by", "smoothscale_by", "scale2x", "rotate",
+                  "rotozoom", "flip", "chop", "laplacian")
+    
+    def __init__(self, budget_bytes=0, max_reports=20):
+        self.budget_bytes = budget_bytes
+        self.max_reports = max_reports  # Flagged frames printed before going quiet
+        self.frame_sites = {}  # Call site -> [surfaces, bytes] in the current frame
+        self.sites = {}  # Call site -> [surfaces, bytes, frames] over the whole run
+        self.frames = 0
+        self.flagged = 0
+        self.originals = None
+    
+    def record(self, surface, depth=2):
+        caller = sys._getframe(depth)
+        while caller.f_code in (TextCache.render.__code__, ShadeCache.draw.__code__):
+            caller = caller.f_back
+        site = f"{caller.f_code.co_name}:{caller.f_lineno}"
+        entry = self.frame_sites.get(site)
+        if entry is None:
+            entry = self.frame_sites[site] = [0, 0]
+        entry[0] += 1
+        entry[1] += surface.get_pitch() * surface.get_height()
+    
+    def install(self):
+        if self.originals:
+            return
+        tracker = self
+        self.originals = {"Surface": pygame.Surface, "Font": pygame.font.Font, "load": pygame.image.load,
+                          "transform": {name: getattr(pygame.transform, name)
+                                        for name in self.TRANSFORMS if hasattr(pygame.transform, name)}}
+        
+        class TrackedSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                tracker.record(self)
+        
+        class TrackedFont(pygame.font.Font):
+            def render(self, *args, **kwargs):
+                surface = super().render(*args, **kwargs)
+                tracker.record(surface)
+                return surface
+        
+        def wrap(function):
+            def tracked(*args, **kwargs):
+                surface = function(*args, **kwargs)
+                # Functions given a destination surface draw into it instead
+                if all(surface is not arg for arg in args) and all(surface is not arg for arg in kwargs.values()):
+                    tracker.record(surface)
+                return surface
+            return tracked
+        
+        pygame.Surface = TrackedSurface
+        pygame.font.Font = TrackedFont
+        pygame.image.load = wrap(pygame.image.load)
+        for name, function in self.originals["transform"].items():
+            setattr(pygame.transform, name, wrap(function))
+    
+    def uninstall(self):
+        if not self.originals:
+            return
+        pygame.Surface = self.originals["Surface"]
+        pygame.font.Font = self.originals["Font"]
+        pygame.image.load = self.originals["load"]
+        for name, function in self.originals["transform"].items():
+            setattr(pygame.transform, name, function)
+        self.originals = None
+    
+    def end_frame(self, frame):
+        """Close the current frame; returns its (surfaces, bytes)"""
+        count = 0
+        total = 0
+        for site, (surfaces, size) in self.frame_sites.items():
+            count += surfaces
+            total += size
+            entry = self.sites.get(site)
+            if entry is None:
+                entry = self.sites[site] = [0, 0, 0]
+            entry[0] += surfaces
+            entry[1] += size
+            entry[2] += 1
+        self.frames += 1
+        
+        if total > self.budget_bytes:
+            self.flagged += 1
+            if self.flagged <= self.max_reports:
+                worst = sorted(self.frame_sites.items(), key=lambda item: -item[1][1])[:3]
+                sites = ", ".join(f"{site} x{surfaces} ({size / 1024:.1f} KB)" for site, (surfaces, size) in worst)
+                print(f"Frame {frame}: {count} surfaces, {total / 1024:.1f} KB over the "
+                      f"{self.budget_bytes / 1024:.1f} KB budget - {sites}")
+        self.frame_sites = {}
+        return count, total
+    
+    def discard_frame(self):
+        """Forget what was created since the last frame (start-up, loading screens)"""
+        self.frame_sites = {}
+    
+    def report(self):
+        print(f"Surface allocations: {self.flagged} of {self.frames} frames over budget")
+        for site, (surfaces, size, frames) in sorted(self.sites.items(), key=lambda item: -item[1][1]):
+            print(f"  {site:<40} {surfaces:>8} surfaces {size / 1048576:>9.1f} MB in {frames} frames")
+
+class FrameCapture:
+    """Records gameplay as an image sequence without stalling the game loop.
+    
+    capture() blits the frame into one of a fixed set of preallocated
+    buffers and queues it; encoder threads turn queued frames into PNG or
+    raw RGB files and hand the buffers back. The compression in zlib and the
+    file writes run without the GIL, so the encoders really do work in
+    parallel with the game. If every buffer is still waiting to be encoded,
+    the "drop" policy skips the frame (and counts it) while "block" waits
+    for a free buffer, slowing the game down instead.
+    """
+    def __init__(self, directory, size, image_format="png", policy="drop", buffers=8, workers=None):
+        self.directory = directory
+        self.width, self.height = size
+        self.image_format = image_format
+        self.policy = policy
+        self.frames = 0  # Frames offered to capture()
+        self.written = 0
+        self.dropped = 0
+        self.lock = threading.Lock()  # The encoder threads all count into written
+        os.makedirs(directory, exist_ok=True)
+        
+        # RGB byte order whatever the platform, so buffers can be written out as they are
+        self.free = queue.Queue()
+        for _ in range(buffers):
+            self.free.put(pygame.Surface(size, 0, 24, (0xFF, 0xFF00, 0xFF0000, 0)))
+        self.pending = queue.Queue()
+        
+        workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.threads = [threading.Thread(target=self.run, name=f"capture-encoder-{i}", daemon=True)
+                        for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+        
+        with open(os.path.join(directory, "capture.json"), "w") as f:
+            json.dump({"width": self.width, "height": self.height, "format": image_format, "fps": FPS}, f)
+    
+    def capture(self, surface):
+        frame = self.frames
+        self.frames += 1
+        try:
+            buffer = self.free.get(block=self.policy == "block")
+        except queue.Empty:
+            self.dropped += 1
+            return
+        buffer.blit(surface, (0, 0))
+        self.pending.put((frame, buffer))
+    
+    def run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            frame, buffer = item
+            try:
+                self.encode(frame, buffer)
+                with self.lock:
+                    self.written += 1
+            except (OSError, pygame.error) as e:
+                print(f"Could not write frame {frame}: {e}")
+            finally:
+                self.free.put(buffer)
+    
+    def encode(self, frame, buffer):
+        pitch = buffer.get_pitch()
+        stride = self.width * 3
+        with memoryview(buffer.get_buffer()) as pixels:
+            if self.image_format == "raw":
+                with open(os.path.join(self.directory, f"frame_{frame:06d}.rgb"), "wb") as f:
+                    for y in range(self.height):
+                        f.write(pixels[y * pitch:y * pitch + stride])
+                return
+            
+            # PNG scanlines: a filter byte (0 = none) before each row of RGB
+            scanlines = bytearray((stride + 1) * self.height)
+            for y in range(self.height):
+                start = y * (stride + 1) + 1
+                scanlines[start:start + stride] = pixels[y * pitch:y * pitch + stride]
+        
+        with open(os.path.join(self.directory, f"frame_{frame:06d}.png"), "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+            write_png_chunk(f, b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+            write_png_chunk(f, b"IDAT", zlib.compress(scanlines, 1))  # Fast level: frames are large
+            write_png_chunk(f, b"IEND", b"")
+    
+    def close(self):
+        """Wait for queued frames to be written and report what was captured"""
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
+        print(f"Captured {self.written} of {self.frames} frames to {self.directory} ({self.dropped} dropped)")
+
+def write_png_chunk(f, tag, data):
+    f.write(struct.pack(">I", len(data)) + tag)
+    f.write(data)
+    f.write(struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+class ParticleSystem:
+    """Sparks and debris kept in NumPy arrays, one slot per particle.
+    
+    Slots are handed out as a ring, so once every slot is live a new
+    particle replaces the oldest one. update() integrates all particles in
+    a few array operations and draw() stamps every live particle straight
+    into the target surface's pixels: each stamp is pre-rendered once per
+    colour, then written for all particles of that size with one indexed
+    assignment per stamp pixel, through a flat view of the surface buffer.
+    Everything works in preallocated scratch arrays, so the only array
+    data allocated per frame are np.compress's internal temporaries.
+    """
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.gravity = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.int16)  # Frames left; 0 is a free slot
+        self.color = np.zeros(capacity, np.intp)  # Index into self.palette, ready for np.take
+        # Scratch for update() and draw(); draw() packs the live particles into the front
+        self.alive = np.zeros(capacity, bool)
+        self.chosen = np.zeros(capacity, bool)
+        self.inside = np.zeros(capacity, bool)
+        self.live_x = np.zeros(capacity, np.float32)
+        self.live_y = np.zeros(capacity, np.float32)
+        self.live_life = np.zeros(capacity, np.int16)
+        self.live_color = np.zeros(capacity, np.intp)
+        self.ix = np.zeros(capacity, np.intp)
+        self.iy = np.zeros(capacity, np.intp)
+        self.index = np.zeros(capacity, np.intp)  # Pixel index in the surface buffer
+        self.stamp_index = np.zeros(capacity, np.intp)
+        self.stamp_color = np.zeros(capacity, np.intp)
+        self.pixel_index = np.zeros(capacity, np.intp)
+        self.pixel_values = np.zeros(capacity, np.uint32)
+        self.random_a = np.zeros(capacity, np.float32)  # Scratch for emit()
+        self.random_b = np.zeros(capacity, np.float32)
+        self.cursor = 0  # Next slot to hand out
+        self.live = 0  # Upper bound on live particles, exact after update()
+        self.enabled = True  # Drawing only; the QualityGovernor may switch it off
+        self.rng = np.random.default_rng(seed)
+        self.palette = []
+        self.palette_index = {}
+        self.stamps = {}  # Surface pixel format -> stamps mapped to that format
+    
+    @property
+    def memory_bytes(self):
+        size = sum(array.nbytes for array in vars(self).values() if isinstance(array, np.ndarray))
+        for stamps in self.stamps.values():
+            size += sum(pixels.nbytes for _, _, pixels in stamps)
+        return size
+    
+    def candidate(self):
+        return None  # Preallocated once
+    
+    def color_index(self, color):
+        if color not in self.palette_index:
+            self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+            self.stamps.clear()  # Re-render with the new colour
+        return self.palette_index[color]
+    
+    def emit(self, x, y, count, color, speed=(1.0, 4.0), life=(20, 40), gravity=0.0,
+             direction=0.0, spread=2 * math.pi):
+        """Emit count particles from (x, y) within spread radians of direction"""
+        count = min(count, self.capacity)
+        if self.cursor + count > self.capacity:
+            # Fill up to the end of the ring, then carry on from the start
+            first = self.capacity - self.cursor
+            self.emit(x, y, first, color, speed, life, gravity, direction, spread)
+            count -= first
+        start = self.cursor
+        slots = slice(start, start + count)
+        self.cursor = (start + count) % self.capacity
+        
+        rng = self.rng
+        angles = rng.random(dtype=np.float32, out=self.random_a[:count])
+        angles -= 0.5
+        angles *= spread
+        angles += direction
+        speeds = rng.random(dtype=np.float32, out=self.random_b[:count])
+        speeds *= speed[1] - speed[0]
+        speeds += speed[0]
+        np.cos(angles, out=self.vx[slots])
+        self.vx[slots] *= speeds
+        np.sin(angles, out=self.vy[slots])
+        self.vy[slots] *= speeds
+        self.x[slots] = x
+        self.y[slots] = y
+        self.gravity[slots] = gravity
+        lifetimes = rng.random(dtype=np.float32, out=self.random_a[:count])
+        lifetimes *= life[1] - life[0] + 1
+        lifetimes += life[0]
+        np.copyto(self.life[slots], lifetimes, casting="unsafe")  # Truncates to whole frames
+        self.color[slots] = self.color_index(color)
+        self.live = min(self.capacity, self.live + count)
+    
+    def update(self, scroll_speed):
+        if not self.live:
+            return
+        self.vy += self.gravity
+        self.x += self.vx
+        self.y += self.vy
+        self.y += scroll_speed  # Debris stays with the rock it came from
+        np.greater(self.life, 0, out=self.alive)
+        np.subtract(self.life, 1, out=self.life, where=self.alive)
+        self.live = int(np.count_nonzero(self.life))
+    
+    def clear(self):
+        self.life[:] = 0
+        self.live = 0
+    
+    def render_stamps(self, surface):
+        """Pre-render every stamp in every palette colour, mapped to surface's pixel format"""
+        stamps = []
+        for size, pattern in PARTICLE_STAMPS:
+            offsets = [(dx - size // 2, dy - size // 2)
+                       for dy, row in enumerate(pattern) for dx, cell in enumerate(row) if cell != "."]
+            pixels = np.zeros((len(self.palette), len(offsets)), np.uint32)
+            for index, color in enumerate(self.palette):
+                core = tuple(min(255, channel + 100) for channel in color)
+                stamp = pygame.Surface((size, size), 0, surface)
+                for dy, row in enumerate(pattern):
+                    for dx, cell in enumerate(row):
+                        if cell != ".":
+                            stamp.set_at((dx, dy), core if cell == "#" else color)
+                stamp_pixels = pygame.surfarray.pixels2d(stamp)
+                pixels[index] = [stamp_pixels[dx + size // 2, dy + size // 2] for dx, dy in offsets]
+                del stamp_pixels
+            stamps.append((size // 2, offsets, pixels))
+        return stamps
+    
+    def draw(self, surface):
+        if not (self.live and self.enabled) or surface.get_bytesize() != 4:
+            return
+        key = (surface.get_bitsize(), surface.get_masks())
+        if key not in self.stamps:
+            self.stamps[key] = self.render_stamps(surface)
+        
+        # Pack the live particles into the front of the scratch arrays
+        alive = self.alive
+        np.greater(self.life, 0, out=alive)
+        count = int(np.count_nonzero(alive))
+        live_y = self.live_y[:count]
+        life = self.live_life[:count]
+        color = self.live_color[:count]
+        x = self.ix[:count]
+        y = self.iy[:count]
+        np.compress(alive, self.x, out=self.live_x[:count])
+        np.compress(alive, self.y, out=live_y)
+        np.compress(alive, self.life, out=life)
+        np.compress(alive, self.color, out=color)
+        np.copyto(x, self.live_x[:count], casting="unsafe")  # Truncates like astype()
+        np.copyto(y, live_y, casting="unsafe")
+        
+        chosen = self.chosen[:count]
+        inside = self.inside[:count]
+        width, height = surface.get_size()
+        row = surface.get_pitch() // 4
+        index = self.index[:count]
+        np.multiply(y, row, out=index)
+        index += x
+        view = surface.get_view("1")
+        pixels = np.frombuffer(view, np.uint32)
+        for stage, (radius, offsets, stamp_pixels) in enumerate(self.stamps[key]):
+            # Large stamps while young, small ones as they fade
+            if stage == 0:
+                np.greater(life, PARTICLE_FADE, out=chosen)
+            else:
+                np.less_equal(life, PARTICLE_FADE, out=chosen)
+            for coords, limit in ((x, width), (y, height)):
+                np.greater_equal(coords, radius, out=inside)
+                chosen &= inside
+                np.less(coords, limit - radius, out=inside)
+                chosen &= inside
+            stamped = int(np.count_nonzero(chosen))
+            stamp_index = self.stamp_index[:stamped]
+            stamp_color = self.stamp_color[:stamped]
+            pixel_index = self.pixel_index[:stamped]
+            values = self.pixel_values[:stamped]
+            np.compress(chosen, index, out=stamp_index)
+            np.compress(chosen, color, out=stamp_color)
+            for pixel, (dx, dy) in enumerate(offsets):
+                np.add(stamp_index, dy * row + dx, out=pixel_index)
+                np.take(stamp_pixels[:, pixel], stamp_color, out=values)
+                pixels[pixel_index] = values
+        del pixels, view  # Unlocks the surface
+
+class GameConfig:
+    """Settings for one Game, normally taken from the command line"""
+    def __init__(self, scale=None, seed=None, level_file=None, checkpoint_file=None, save_file=SAVE_FILE,
+                 telemetry_file=None, adaptive_quality=True, capture_dir=None, capture_format="png",
+                 capture_policy="drop", sound=True, surface_budget=None, memory_budget=None,
+                 memory_policy="lru", stream_backgrounds=True):
+        self.scale = scale  # Window scale factor (1, 2 or 4); None uses the saved setting
+        self.seed = seed  # Level seed; None picks a new one for every run
+        self.level_file = level_file  # Timeline JSON to play instead of compiled levels
+        self.checkpoint_file = checkpoint_file  # Where layer checkpoints are kept between sessions
+        self.save_file = save_file  # Progress and settings; None keeps them in memory only
+        self.telemetry_file = telemetry_file  # Per-frame binary log for offline analysis
+        self.adaptive_quality = adaptive_quality  # Drop drawing detail when frames run long
+        self.capture_dir = capture_dir  # Save every frame here as an image sequence
+        self.capture_format = capture_format  # "png" or "raw" (RGB bytes)
+        self.capture_policy = capture_policy  # "drop" frames or "block" when the encoders fall behind
+        self.sound = sound  # Open the mixer for effects and music
+        self.surface_budget = surface_budget  # Bytes of new Surfaces per frame before it is flagged; None doesn't track
+        self.memory_budget = memory_budget  # Bytes for all caches together; None uses MEMORY_BUDGET
+        self.memory_policy = memory_policy  # "lru" or "cost", see MemoryBudget
+        self.stream_backgrounds = stream_backgrounds  # Decode only the layers about to be seen
+
 class Game:
-    def __init__(self):
+    # Game attributes saved in a checkpoint along with the player, entities and RNG
+    CHECKPOINT_FIELDS = ("current_layer", "layer_progress", "world_y", "orbs_spawned_this_layer",
+                         "score", "layers_completed", "nina_note_found", "nina_note_spawned",
+                         "nina_note_message_timer", "timeline_cursor", "refill_cursor", "orb_timer", "orb_cursor")
+    
+    def __init__(self, config=None):
+        self.config = config or GameConfig()
+        
+        # One memory budget for every cache; close() puts back the settings it replaces
+        self.previous_memory = (MEMORY.max_bytes, MEMORY.policy)
+        MEMORY.max_bytes = self.config.memory_budget or MEMORY_BUDGET
+        MEMORY.policy = self.config.memory_policy
+        
+        # Debug mode: count the Surfaces created every frame
+        self.surface_tracker = None
+        if self.config.surface_budget is not None:
+            self.surface_tracker = SurfaceTracker(self.config.surface_budget)
+            self.surface_tracker.install()
+        
+        # Progress and settings from earlier sessions
+        self.save_store = SaveStore(self.config.save_file)
+        self.checkpoint_writer = CheckpointFile(self.config.checkpoint_file) if self.config.checkpoint_file else None
+        if self.config.scale:
+            self.save_store.set_setting("scale", self.config.scale)
+        self.scale_factor = self.config.scale or self.save_store.setting("scale", 1)
+        
+        # Only the subsystems the game uses; the mixer is opened by the SoundBank
+        pygame.display.init()
+        pygame.font.init()
+        
         # Set up scaled display
-        if SCALE_FACTOR > 1:
+        if self.scale_factor > 1:
             # Create a base surface at original resolution
             self.base_screen = pygame.Surface((BASE_WIDTH, BASE_HEIGHT))
             # Create the actual window at scaled resolution
-            self.screen = pygame.display.set_mode((BASE_WIDTH * SCALE_FACTOR, BASE_HEIGHT * SCALE_FACTOR))
+            self.screen = pygame.display.set_mode((BASE_WIDTH * self.scale_factor, BASE_HEIGHT * self.scale_factor))
         else:
             # No scaling needed
             self.base_screen = None
             self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
             
-        pygame.display.set_caption(f"ZT Miner - Chapter I: The Escape (Scale: {SCALE_FACTOR}x)")
+        pygame.display.set_caption(f"ZT Miner - Chapter I: The Escape (Scale: {self.scale_factor}x)")
         self.clock = pygame.time.Clock()
         self.running = True
         
+        # Pre-scaled assets baked with --bake, if present
+        self.asset_bundle = AssetBundle.open(ASSET_BUNDLE_PATH, bundle_stamp())
+        
+        # Sprites and pre-rendered animation frames shared by all entities
+        self.atlas = MEMORY.register("atlas", load_graphics(self.asset_bundle))
+        
+        # Sound effects decoded up front, music streamed per layer
+        self.sounds = SoundBank(self.config.sound)
+        
         # Game state
-        self.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100)
-        self.enemies = []
-        self.static_enemies = []
-        self.obstacles = []
-        self.enemy_bullets = []  # Global list for enemy bullets
-        self.pattern_bullets = []  # Global list for pattern bullets
-        self.health_orbs = []  # List for health orbs
+        self.create_world()
+        self.collision_tests = 0
+        self.telemetry = None
+        if self.config.telemetry_file:
+            self.telemetry = TelemetryWriter(self.config.telemetry_file, self.world.groups)
+        self.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, self.player_bullets)
         self.current_layer = 0
         self.layer_progress = 0
-        self.layer_height = 3000  # Height of each layer
-        self.scroll_speed = 2
+        self.layer_height = LAYER_HEIGHT  # Height of each layer
+        self.scroll_speed = SCROLL_SPEED
         self.world_y = 0  # World position for scrolling
-        self.spawn_timer = 0
-        self.static_spawn_timer = 0
-        self.obstacle_formation_timer = 0
-        self.health_orb_spawn_timer = 0  # Timer for health orb spawning
         self.orbs_spawned_this_layer = 0  # Track orbs spawned in current layer
-        self.obstacle_formation_timer = 0
+        self.orb_timer = 0  # Frames since the last health orb spawned
+        self.load_levels()
         self.game_over = False
         self.victory = False
-        self.checkpoints = {0: SCREEN_HEIGHT - 100}  # Layer: player_y position
+        self.checkpoints = {}  # Layer: snapshot taken when the layer started
+        self.checkpoint_due = False
         
         # NiNa's note feature
         self.nina_note_found = False
@@ -1158,6 +3635,8 @@ class Game:
         
         # Score system
         self.score = 0
+        self.layer_frames = 0  # Ticks spent in the current layer, retries included
+        self.run_frames = 0  # Ticks since the run started, None once resumed from a file
         self.layer_completion_bonus = [1000, 1500, 2000, 2500, 3000]  # Bonus for completing each layer
         self.enemy_kill_points = {"basic": 100, "aggressive": 150}
         self.static_enemy_kill_points = {"circular": 200, "spiral": 250, "aimed": 300}
@@ -1165,12 +3644,33 @@ class Game:
         self.layers_completed = []  # Track which layers have been completed for bonus
         
         # UI
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.large_font = pygame.font.Font(None, 48)
-        
-        # Background system
-        self.background_manager = BackgroundManager()
+        self.font = FONTS.get(36)
+        self.small_font = FONTS.get(24)
+        self.large_font = FONTS.get(48)
+        
+        # Background system; layer images decode on a worker thread while the intro shows
+        self.asset_progress = 0.0
+        self.background_manager = BackgroundManager(self.asset_bundle, async_load=True,
+                                                     on_progress=self.on_asset_progress,
+                                                     streaming=self.config.stream_backgrounds)
+        MEMORY.register("backgrounds", self.background_manager)
+        MEMORY.enforce()
+        if self.background_manager.ready():
+            self.wait_for_assets()
+        
+        # Image sequence capture of the unscaled frame
+        self.capture = None
+        if self.config.capture_dir:
+            self.capture = FrameCapture(self.config.capture_dir, (BASE_WIDTH, BASE_HEIGHT),
+                                        self.config.capture_format, self.config.capture_policy)
+        
+        # Drawing detail follows the measured frame time
+        self.governor = None
+        if self.config.adaptive_quality:
+            self.governor = QualityGovernor(self.apply_quality)
+        else:
+            for feature in QUALITY_FEATURES:
+                self.apply_quality(feature, True)
         
         # Story state
         self.show_intro = True
@@ -1181,72 +3681,240 @@ class Game:
         self.conversation_scene = ConversationScene()
         self.first_time_player = self.check_first_time_player()
         
-        # Outro scene system
+        # Outro scene system (created when the outro is opened)
         self.show_outro = False
-        self.outro_scene = OutroScene()
+        self.outro_scene = None
         
         # NiNa's note
-        self.nina_note = None
         self.nina_note_spawned = False
         
         # If first time player, show conversation instead of simple intro
         if self.first_time_player:
             self.show_intro = False
             self.show_conversation = True
+        
+        self.start_checkpoints()
+    
+    def create_world(self):
+        """Register every entity group with the systems that process it"""
+        self.world = World()
+        
+        # Player bullets are drawn by Player.draw so the drill stays on top
+        self.player_bullets = self.world.register(Archetype(
+            "player_bullets", velocity=True, scrolls=False, drawn=False,
+            bounds=(-math.inf, 0, math.inf, math.inf)))
+        self.enemy_movement = EnemyMovement()
+        self.enemies = self.world.register(Archetype(
+            "enemies", EnemyList(), batch_update=lambda enemies: self.enemy_movement.update(enemies, self.player),
+            update=lambda enemy: enemy.update(self.player, self.enemy_bullets),
+            bullet_damage=20, on_destroyed=self.on_enemy_destroyed,
+            contact_damage=15, contact_priority=3, contact_consumes="on_damage"))
+        self.static_enemies = self.world.register(Archetype(
+            "static_enemies", update=lambda static_enemy: static_enemy.update(self.player, self.pattern_bullets),
+            bullet_damage=15, on_destroyed=self.on_static_enemy_destroyed,
+            contact_damage=20, contact_priority=4))
+        self.obstacle_pool = ObstaclePool()
+        # Sparks and debris; purely visual, so they live outside the World
+        self.particles = ParticleSystem(seed=self.config.seed) if np else None
+        if self.particles:
+            MEMORY.register("particles", self.particles)
+        self.obstacles = self.world.register(Archetype(
+            "obstacles", EntityList(recycle=self.obstacle_pool.release), bullet_damage=10, drill_damage=8, on_destroyed=self.on_obstacle_destroyed,
+            contact_damage=5, contact_priority=5, drill_shields=True))
+        self.nina_notes = self.world.register(Archetype(
+            "nina_notes", update=NiNaNote.update,
+            bullet_damage=10, drill_damage=8, on_destroyed=self.on_nina_note_destroyed))
+        self.health_orbs = self.world.register(Archetype(
+            "health_orbs", update=HealthOrb.update,
+            contact_priority=2, contact_consumes="always", on_contact=self.on_health_orb_collected))
+        self.enemy_bullets = self.world.register(Archetype(
+            "enemy_bullets", velocity=True, bounds=(-math.inf, -50, math.inf, SCREEN_HEIGHT + 50),
+            contact_damage=10, contact_priority=0, contact_consumes="always"))
+        self.pattern_bullets = self.world.register(Archetype(
+            "pattern_bullets", velocity=True, bounds=(-50, -50, SCREEN_WIDTH + 50, SCREEN_HEIGHT + 50),
+            contact_damage=12, contact_priority=1, contact_consumes="always"))
+    
+    def load_levels(self):
+        """Compile (or load) the spawn timelines for a run and rewind to the start"""
+        if self.config.level_file:
+            self.level_seed = None
+            self.levels = load_levels(self.config.level_file, self.layer_height)
+        else:
+            self.level_seed = self.config.seed if self.config.seed is not None else random.randrange(2 ** 32)
+            self.levels = compile_levels(self.level_seed, self.layer_height, self.scroll_speed)
+        self.rewind_timeline()
+    
+    def start_checkpoints(self):
+        """Resume from the checkpoint file if there is one, else checkpoint the start"""
+        data = None
+        if self.config.checkpoint_file:
+            data = read_checkpoint_file(self.config.checkpoint_file)
+        if data:
+            try:
+                self.restore_checkpoint(data)
+            except (pickle.UnpicklingError, EOFError, KeyError, AttributeError) as e:
+                print(f"Could not resume from {self.config.checkpoint_file}: {e}")
+                self.restart_game()
+                return
+            self.checkpoints = {self.current_layer: data}
+            self.run_frames = None  # Time spent in earlier sessions is unknown
+            print(f"Resumed layer {self.current_layer + 1} from {self.config.checkpoint_file}")
+        else:
+            self.checkpoints = {}
+            self.save_checkpoint()
+    
+    def take_checkpoint(self):
+        """Serialize the full game state (call between ticks, after World.flush)"""
+        state = {
+            "fields": {name: getattr(self, name) for name in self.CHECKPOINT_FIELDS},
+            "level_seed": self.level_seed,
+            "player": self.player,
+            "groups": {name: list(entities) for name, entities in self.world.groups.items()},
+            "random": random.getstate(),
+        }
+        return pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+    
+    def save_checkpoint(self):
+        """Checkpoint the start of the current layer, on disk too if configured"""
+        data = self.take_checkpoint()
+        self.checkpoints[self.current_layer] = data
+        if self.checkpoint_writer:
+            self.checkpoint_writer.save(data)
+    
+    def restore_checkpoint(self, data):
+        """Put the game back exactly as it was when the snapshot was taken"""
+        state = load_checkpoint(data)
+        for name, value in state["fields"].items():
+            setattr(self, name, value)
+        if state["level_seed"] != self.level_seed and not self.config.level_file:
+            self.level_seed = state["level_seed"]
+            self.levels = compile_levels(self.level_seed, self.layer_height, self.scroll_speed)
+        self.world.clear()
+        if self.particles:
+            self.particles.clear()
+        for name, entities in state["groups"].items():
+            self.world.groups[name].extend(entities)
+        self.player = state["player"]
+        self.player.bullets = self.player_bullets
+        random.setstate(state["random"])
+    
+    def rewind_timeline(self):
+        """Move the spawn cursors back to the start of the current layer"""
+        self.timeline_cursor = 0
+        self.refill_cursor = 0
+        self.orb_cursor = 0
+    
+    def emit_particles(self, entity, count, color, **kwargs):
+        """Burst of particles from the centre of entity"""
+        if self.particles:
+            x, y = entity.get_rect().center
+            self.particles.emit(x, y, count, color, **kwargs)
+    
+    def on_enemy_destroyed(self, enemy):
+        # Award points for enemy kill
+        self.score += self.enemy_kill_points[enemy.enemy_type]
+        self.sounds.play("explosion")
+        self.emit_particles(enemy, 60, LAYER_THEMES[enemy.layer]["enemy_color"])
+    
+    def on_static_enemy_destroyed(self, static_enemy):
+        # Award points for static enemy kill
+        self.score += self.static_enemy_kill_points[static_enemy.pattern_type]
+        self.sounds.play("explosion")
+        self.emit_particles(static_enemy, 90, LAYER_THEMES[static_enemy.layer]["static_enemy_color"])
+    
+    def on_obstacle_destroyed(self, obstacle):
+        # Award points for obstacle destruction
+        if obstacle.obstacle_type in self.obstacle_destroy_points:
+            self.score += self.obstacle_destroy_points[obstacle.obstacle_type]
+        self.sounds.play("explosion")
+        self.emit_particles(obstacle, 120, LAYER_THEMES[obstacle.layer]["obstacle_color"],
+                            speed=(0.5, 3.0), life=(30, 60), gravity=0.1)
+    
+    def on_nina_note_destroyed(self, nina_note):
+        # Note was found!
+        self.sounds.play("note")
+        self.emit_particles(nina_note, 300, (255, 182, 193), speed=(0.5, 2.5), life=(60, 120))
+        self.nina_note_found = True
+        self.nina_note_message_timer = 180  # Show message for 3 seconds
+        self.save_store.update(nina_note_found=True)
+    
+    def on_health_orb_collected(self, orb):
+        # Heal the player
+        heal_amount = int(self.player.max_health * orb.heal_amount)
+        self.player.health = min(self.player.max_health, self.player.health + heal_amount)
+        # Play healing sound effect
+        self.sounds.play("heal")
+    
+    def apply_quality(self, feature, enabled):
+        """Switch one of the QUALITY_FEATURES on or off"""
+        if feature == "particles":
+            if self.particles:
+                self.particles.enabled = enabled
+        elif feature == "blend":
+            self.background_manager.blend_enabled = enabled
+        elif feature == "damage_overlays":
+            Obstacle.damage_overlay = enabled
+            NiNaNote.damage_overlay = enabled
+        elif feature == "health_bars":
+            Enemy.health_bars = enabled
+            StaticEnemy.health_bars = enabled
+        elif feature == "tint_flashes":
+            Player.tint_flashes = enabled
+    
+    def on_asset_progress(self, loaded, total):
+        # Called from the loader thread
+        self.asset_progress = loaded / total
+    
+    def wait_for_assets(self):
+        """Readiness barrier: block until gameplay assets are loaded"""
+        self.background_manager.finish_loading()
+        self.asset_progress = 1.0
     
     def check_first_time_player(self):
         """Check if this is the player's first time playing"""
-        try:
-            with open("player_data.txt", "r") as f:
-                data = f.read().strip()
-                return data != "played_before"
-        except FileNotFoundError:
-            return True
+        return not self.save_store.data["played_before"]
     
     def mark_player_as_returning(self):
         """Mark that the player has played before"""
-        try:
-            with open("player_data.txt", "w") as f:
-                f.write("played_before")
-        except Exception as e:
-            print(f"Could not save player data: {e}")
+        self.save_store.update(played_before=True)
         
     def restart_game(self):
         """Restart the entire game from the beginning"""
-        # Reset player
-        self.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100)
-        
         # Clear all game objects
-        self.enemies.clear()
-        self.static_enemies.clear()
-        self.obstacles.clear()
-        self.enemy_bullets.clear()
-        self.pattern_bullets.clear()
-        self.health_orbs.clear()  # Clear health orbs when restarting
+        self.world.clear()
+        if self.particles:
+            self.particles.clear()
+        
+        # Reset player
+        self.player = Player(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, self.player_bullets)
         self.orbs_spawned_this_layer = 0  # Reset orb counter
+        self.orb_timer = 0
         
-        # Reset game state
+        # Reset game state; a fresh seed gives a new set of levels
         self.current_layer = 0
         self.layer_progress = 0
         self.world_y = 0
-        self.spawn_timer = 0
-        self.static_spawn_timer = 0
-        self.obstacle_formation_timer = 0
+        if self.config.seed is None and not self.config.level_file:
+            self.load_levels()
+        else:
+            self.rewind_timeline()
         self.game_over = False
         self.victory = False
         self.show_outro = False
         self.show_nina_note = False
         
         # Reset NiNa's note variables
-        self.nina_note = None
         self.nina_note_found = False
         self.nina_note_spawned = False
         self.nina_note_message_timer = 0
         
         # Reset score and checkpoints
         self.score = 0
+        self.layer_frames = 0
+        self.run_frames = 0
         self.layers_completed = []
-        self.checkpoints = {0: SCREEN_HEIGHT - 100}
+        self.checkpoints = {}
+        self.save_checkpoint()
     
     def handle_events(self):
         keys_pressed = pygame.key.get_pressed()
@@ -1308,6 +3976,10 @@ class Game:
             if self.intro_timer <= 0:
                 self.show_intro = False
             return
+        
+        # Gameplay needs the layer images: wait here if the loader is still running
+        if self.background_manager.loader:
+            self.wait_for_assets()
             
         if self.game_over or self.victory:
             return
@@ -1317,7 +3989,10 @@ class Game:
             return
             
         keys = pygame.key.get_pressed()
+        shots = len(self.player_bullets.items)
         self.player.update(keys)
+        if len(self.player_bullets.items) > shots:
+            self.sounds.play("player_shot")
         
         # Check if player died
         if self.player.health <= 0:
@@ -1326,6 +4001,10 @@ class Game:
             self.game_over = True
             return
         
+        self.layer_frames += 1
+        if self.run_frames is not None:
+            self.run_frames += 1
+        
         # Layer progression and world scrolling
         self.layer_progress += self.scroll_speed
         self.world_y += self.scroll_speed  # Move world position
@@ -1335,10 +4014,13 @@ class Game:
             if self.current_layer not in self.layers_completed:
                 self.score += self.layer_completion_bonus[self.current_layer]
                 self.layers_completed.append(self.current_layer)
+            self.save_store.record_layer(self.current_layer, self.score, self.layer_frames)
+            self.layer_frames = 0
             
             self.current_layer += 1
             self.layer_progress = 0
-            self.checkpoints[self.current_layer] = self.player.y
+            self.rewind_timeline()
+            self.checkpoint_due = True  # Taken once this tick has finished
             
         # Victory condition
         if self.current_layer >= 4 and self.layer_progress >= self.layer_height // 2:
@@ -1346,212 +4028,119 @@ class Game:
             if 4 not in self.layers_completed:
                 self.score += self.layer_completion_bonus[4]
                 self.layers_completed.append(4)
+            self.save_store.record_layer(4, self.score, self.layer_frames)
+            self.save_store.record_run(self.score, self.run_frames)
+            self.sounds.fade_music(2000)
             self.victory = True
+            # The session is over; the next one starts from the beginning
+            if self.checkpoint_writer:
+                self.checkpoint_writer.remove()
             return
         
-        # Spawn NiNa's note in layer 4 (Upper Crust)
-        if self.current_layer == 3 and not self.nina_note_spawned:
-            # Spawn NiNa's note somewhere in the first half of the layer
-            if self.layer_progress > 500 and self.layer_progress < self.layer_height // 2:
-                x = random.randint(SCREEN_WIDTH // 4, 3 * SCREEN_WIDTH // 4)
-                y = -50  # Just above the screen
-                self.nina_note = NiNaNote(x, y)
-                self.nina_note_spawned = True
-        
-        # Update NiNa's note if it exists
-        if self.nina_note:
-            self.nina_note.update(self.scroll_speed)
-            # Remove if it goes off screen
-            if self.nina_note.y > SCREEN_HEIGHT + 50:
-                self.nina_note = None
+        # Only the backgrounds about to be seen stay decoded
+        self.background_manager.update_residency(self.current_layer, self.layer_progress, self.layer_height)
+        
+        # Music follows the layer, fading with the background blend
+        self.sounds.update_music(self.current_layer, self.layer_progress, self.layer_height,
+                                 self.background_manager.blend_zone_height, self.scroll_speed)
         
         # Update message timer
         if self.nina_note_message_timer > 0:
             self.nina_note_message_timer -= 1
         
-        # Spawn enemies and obstacles with progressive difficulty
-        self.spawn_timer += 1
-        self.static_spawn_timer += 1
-        self.obstacle_formation_timer += 1
-        
-        # Progressive spawn rates - faster spawning in higher layers
-        enemy_spawn_rate = max(30, 60 - (self.current_layer * 10))  # 60, 50, 40, 30, 30 frames
-        static_spawn_rate = max(120, 180 - (self.current_layer * 15))  # 180, 165, 150, 135, 120 frames
-        
-        if self.spawn_timer >= enemy_spawn_rate:
-            self.spawn_enemies()
-            self.spawn_timer = 0
-            
-        if self.static_spawn_timer >= static_spawn_rate:
-            self.spawn_static_enemies()
-            self.static_spawn_timer = 0
-            
-        if self.obstacle_formation_timer >= 90:  # Spawn obstacle formations every 1.5 seconds
-            self.spawn_obstacle_formations()
-            self.obstacle_formation_timer = 0
-            
-        # Health orb spawning
-        self.health_orb_spawn_timer += 1
-        if self.health_orb_spawn_timer >= 600:  # Spawn health orbs every 10 seconds
-            self.spawn_health_orbs()
-            
-        # Update health orbs
-        for orb in self.health_orbs[:]:
-            orb.update(self.scroll_speed)
-            # Remove orbs that are off-screen
-            if orb.y > SCREEN_HEIGHT + 50:
-                self.health_orbs.remove(orb)
+        # Spawn everything the layer's timeline has reached
+        events = self.levels[self.current_layer].events
+        while self.timeline_cursor < len(events) and events[self.timeline_cursor]["progress"] <= self.layer_progress:
+            self.spawn_event(events[self.timeline_cursor])
+            self.timeline_cursor += 1
             
         # Always ensure some basic obstacles are present
         if len(self.obstacles) < 2:
             self.spawn_basic_obstacles()
         
-        # Update enemies (they move with screen scroll)
-        for enemy in self.enemies[:]:
-            enemy.update(self.player, self.enemy_bullets)
-            enemy.y += self.scroll_speed  # Move with world
-            if enemy.y > SCREEN_HEIGHT + 50:
-                self.enemies.remove(enemy)
-                
-        # Update static enemies (they move with screen scroll)
-        for static_enemy in self.static_enemies[:]:
-            static_enemy.update(self.player, self.pattern_bullets)
-            static_enemy.y += self.scroll_speed  # Move with world
-            if static_enemy.y > SCREEN_HEIGHT + 50:
-                self.static_enemies.remove(static_enemy)
-        
-        # Update global bullet lists
-        for bullet in self.enemy_bullets[:]:
-            bullet.update()
-            bullet.y += self.scroll_speed  # Move with world
-            if bullet.y > SCREEN_HEIGHT + 50 or bullet.y < -50:
-                self.enemy_bullets.remove(bullet)
-                
-        for bullet in self.pattern_bullets[:]:
-            bullet.update()
-            bullet.y += self.scroll_speed  # Move with world
-            if (bullet.x < -50 or bullet.x > SCREEN_WIDTH + 50 or 
-                bullet.y < -50 or bullet.y > SCREEN_HEIGHT + 50):
-                self.pattern_bullets.remove(bullet)
-        
-        # Update obstacles (they are static in world, so they move with scroll)
-        for obstacle in self.obstacles[:]:
-            obstacle.y += self.scroll_speed  # Move with world scroll
-            if obstacle.y > SCREEN_HEIGHT + 50:
-                self.obstacles.remove(obstacle)
+        # Health orbs every 10 seconds, retried every frame until one finds room
+        self.orb_timer += 1
+        orb_rolls = self.levels[self.current_layer].orb_rolls
+        if self.orb_timer >= 600 and orb_rolls:
+            if self.spawn_health_orb([orb_rolls[self.orb_cursor % len(orb_rolls)]]):
+                self.orb_timer = 0
+            self.orb_cursor += 1
+        
+        # Behaviour, movement, world scroll and culling for every entity
+        # (removals are deferred, so the item lists only grow during the update)
+        shots = len(self.enemy_bullets.items) + len(self.pattern_bullets.items)
+        self.world.update(self.scroll_speed)
+        if len(self.enemy_bullets.items) + len(self.pattern_bullets.items) > shots:
+            self.sounds.play("enemy_shot")
+        if self.particles:
+            self.particles.update(self.scroll_speed)
         
         # Collision detection
         self.check_collisions()
         
-        # Remove off-screen obstacles
-        for obstacle in self.obstacles[:]:
-            if obstacle.y > SCREEN_HEIGHT + 50:
-                self.obstacles.remove(obstacle)
+        # Apply this tick's removals
+        self.world.flush()
+        
+        if self.checkpoint_due:
+            self.save_checkpoint()
+            self.checkpoint_due = False
+    
+    def spawn_event(self, event):
+        kind = event["kind"]
+        if kind == "enemy":
+            self.spawn_enemy(event)
+        elif kind == "static_enemy":
+            self.spawn_static_enemy(event)
+        elif kind == "formation":
+            self.spawn_obstacle_formation(event)
+        elif kind == "health_orb":
+            self.spawn_health_orb(event["candidates"])
+        elif kind == "nina_note" and not self.nina_note_spawned:
+            self.nina_notes.append(NiNaNote(event["x"], -50))  # Just above the screen
+            self.nina_note_spawned = True
     
-    def spawn_enemies(self):
+    def spawn_enemy(self, event):
         # Progressive difficulty - more enemies in higher layers
         max_enemies = 2 + (self.current_layer * 3)
-        enemy_spawn_rate = max(30, 60 - (self.current_layer * 10))  # Faster spawning in higher layers
         
         if len(self.enemies) < max_enemies:
-            x = random.randint(0, SCREEN_WIDTH - 30)
-            y = -self.world_y - random.randint(100, 200)  # Spawn ahead in world space
-            enemy_type = random.choice(["basic", "aggressive"])
-            self.enemies.append(Enemy(x, y, enemy_type, self.current_layer))
+            y = -self.world_y - event["offset"]  # Spawn ahead in world space
+            self.enemies.append(Enemy(event["x"], y, event["type"], self.current_layer,
+                                      event.get("speed"), event.get("direction"), event.get("shoot_timer")))
     
-    def spawn_static_enemies(self):
+    def spawn_static_enemy(self, event):
         # Progressive difficulty - more static enemies in higher layers
         max_static_enemies = 2 + self.current_layer  # 2, 3, 4, 5, 6 static enemies per layer
         
         if len(self.static_enemies) < max_static_enemies:
-            x = random.randint(50, SCREEN_WIDTH - 90)
-            y = -self.world_y - random.randint(150, 300)  # Spawn ahead in world space
-            pattern_type = random.choice(["circular", "spiral", "aimed"])
-            self.static_enemies.append(StaticEnemy(x, y, pattern_type, self.current_layer))
+            y = -self.world_y - event["offset"]  # Spawn ahead in world space
+            self.static_enemies.append(StaticEnemy(event["x"], y, event["type"], self.current_layer))
+    
+    def spawn_obstacles(self, rows):
+        acquire = self.obstacle_pool.acquire
+        for x, offset, width, height, obstacle_type in rows:
+            # Spawn ahead of current world position
+            self.obstacles.append(acquire(x, -self.world_y - offset, width, height, self.current_layer, obstacle_type))
     
     def spawn_basic_obstacles(self):
         """Ensure there are always some basic obstacles visible"""
-        for _ in range(2):
-            # Make obstacles 1/3 to 2/3 of screen width
-            width = random.randint(SCREEN_WIDTH // 3, 2 * SCREEN_WIDTH // 3)
-            height = random.randint(40, 80)
-            # Position them across the screen width, accounting for obstacle width
-            x = random.randint(0, SCREEN_WIDTH - width)
-            # Spawn ahead of current world position
-            y = -self.world_y - random.randint(200, 400)
-            obstacle_type = random.choice(["basic", "crystal", "reinforced"])
-            self.obstacles.append(Obstacle(x, y, width, height, self.current_layer, obstacle_type))
+        refills = self.levels[self.current_layer].refills
+        self.spawn_obstacles(refills[self.refill_cursor % len(refills)])
+        self.refill_cursor += 1
     
-    def spawn_obstacle_formations(self):
+    def spawn_obstacle_formation(self, event):
         if len(self.obstacles) < 8:  # Reduced threshold to allow more obstacles
-            formation_type = random.choice(["wall", "maze", "scattered", "tunnel", "cluster"])
-            
-            if formation_type == "wall":
-                # Create a wall with gaps - wider obstacles
-                y = -self.world_y - random.randint(300, 500)
-                gap_size = random.randint(120, 180)
-                gap_start = random.randint(60, SCREEN_WIDTH - gap_size - 60)
-                
-                # Left part of wall
-                if gap_start > 20:
-                    self.obstacles.append(Obstacle(0, y, gap_start, 60, self.current_layer, "reinforced"))
-                # Right part of wall
-                if gap_start + gap_size < SCREEN_WIDTH - 20:
-                    self.obstacles.append(Obstacle(gap_start + gap_size, y, SCREEN_WIDTH - (gap_start + gap_size), 60, self.current_layer, "reinforced"))
-                    
-            elif formation_type == "maze":
-                # Create maze-like obstacles - wider rectangles
-                base_y = -self.world_y - random.randint(400, 600)
-                for i in range(3):
-                    width = random.randint(SCREEN_WIDTH // 3, SCREEN_WIDTH // 2)
-                    x = random.randint(0, SCREEN_WIDTH - width)
-                    y = base_y + i * 80
-                    obstacle_type = random.choice(["basic", "crystal"])
-                    self.obstacles.append(Obstacle(x, y, width, 50, self.current_layer, obstacle_type))
-                    
-            elif formation_type == "tunnel":
-                # Create tunnel walls - full width barriers with gap
-                y = -self.world_y - random.randint(350, 550)
-                tunnel_width = random.randint(140, 220)
-                tunnel_start = random.randint(40, SCREEN_WIDTH - tunnel_width - 40)
-                
-                # Left wall
-                if tunnel_start > 20:
-                    self.obstacles.append(Obstacle(0, y, tunnel_start, 100, self.current_layer, "indestructible"))
-                # Right wall
-                if tunnel_start + tunnel_width < SCREEN_WIDTH - 20:
-                    self.obstacles.append(Obstacle(tunnel_start + tunnel_width, y, SCREEN_WIDTH - (tunnel_start + tunnel_width), 100, self.current_layer, "indestructible"))
-                    
-            elif formation_type == "cluster":
-                # Create a cluster of wide rectangular obstacles
-                base_y = -self.world_y - random.randint(300, 500)
-                for i in range(3):
-                    width = random.randint(SCREEN_WIDTH // 3, SCREEN_WIDTH // 2)
-                    x = random.randint(0, SCREEN_WIDTH - width)
-                    y = base_y + i * 60
-                    obstacle_type = random.choice(["basic", "crystal", "reinforced"])
-                    self.obstacles.append(Obstacle(x, y, width, 45, self.current_layer, obstacle_type))
-                    
-            else:  # scattered
-                for _ in range(random.randint(2, 4)):
-                    width = random.randint(SCREEN_WIDTH // 3, 2 * SCREEN_WIDTH // 3)
-                    height = random.randint(40, 70)
-                    x = random.randint(0, SCREEN_WIDTH - width)
-                    y = -self.world_y - random.randint(250, 450)
-                    obstacle_type = random.choice(["basic", "crystal", "reinforced"])
-                    self.obstacles.append(Obstacle(x, y, width, height, self.current_layer, obstacle_type))
-    def spawn_health_orbs(self):
-        """Spawn health orbs in the current layer"""
-        # Only spawn if we haven't reached the limit for this layer
-        max_orbs_per_layer = random.randint(1, 3)
-        
-        if self.orbs_spawned_this_layer < max_orbs_per_layer:
-            # Position the orb in a clear area
-            x = random.randint(50, SCREEN_WIDTH - 50)
-            y = -50  # Spawn just above the screen
+            self.spawn_obstacles(event["obstacles"])
+    
+    def spawn_health_orb(self, candidates):
+        """Spawn a health orb at the first clear (orb limit, x) candidate; True if one spawned"""
+        for max_orbs_per_layer, x in candidates:
+            # Only spawn if we haven't reached the limit for this layer
+            if self.orbs_spawned_this_layer >= max_orbs_per_layer:
+                continue
             
             # Check if the position is clear of obstacles
-            orb_rect = pygame.Rect(x, y, 20, 20)
+            orb_rect = pygame.Rect(x, -50, 20, 20)  # Spawn just above the screen
             clear_position = True
             
             for obstacle in self.obstacles:
@@ -1560,159 +4149,86 @@ class Game:
                     break
             
             if clear_position:
-                self.health_orbs.append(HealthOrb(x, y))
+                self.health_orbs.append(HealthOrb(x, -50))
                 self.orbs_spawned_this_layer += 1
-                self.health_orb_spawn_timer = 0  # Reset timer
+                return True
+        return False
     
     def check_collisions(self):
+        self.world.sync_hitboxes()
         player_rect = self.player.get_rect()
+        tests = 0  # Candidate pairs, for telemetry
         
-        # Player bullets vs enemies
-        for bullet in self.player.bullets[:]:
-            bullet_rect = bullet.get_rect()
-            for enemy in self.enemies[:]:
-                if bullet_rect.colliderect(enemy.get_rect()):
-                    self.player.bullets.remove(bullet)
-                    if enemy.take_damage(20):
-                        # Award points for enemy kill
-                        self.score += self.enemy_kill_points[enemy.enemy_type]
-                        self.enemies.remove(enemy)
-                    break
-        
-        # Player bullets vs static enemies
-        for bullet in self.player.bullets[:]:
-            bullet_rect = bullet.get_rect()
-            for static_enemy in self.static_enemies[:]:
-                if bullet_rect.colliderect(static_enemy.get_rect()):
-                    self.player.bullets.remove(bullet)
-                    if static_enemy.take_damage(15):
-                        # Award points for static enemy kill
-                        self.score += self.static_enemy_kill_points[static_enemy.pattern_type]
-                        self.static_enemies.remove(static_enemy)
-                    break
-        
-        # Player bullets vs obstacles
-        for bullet in self.player.bullets[:]:
+        # Player bullets vs shootable entities (enemies, static enemies, obstacles, NiNa's note)
+        for bullet in self.player.bullets:
             bullet_rect = bullet.get_rect()
-            for obstacle in self.obstacles[:]:
-                if bullet_rect.colliderect(obstacle.get_rect()):
+            for archetype in self.world.shootable:
+                tests += len(archetype.entities)
+                target = self.world.first_hit(bullet_rect, archetype)
+                if target:
                     self.player.bullets.remove(bullet)
-                    if obstacle.take_damage(10):
-                        # Award points for obstacle destruction
-                        if obstacle.obstacle_type in self.obstacle_destroy_points:
-                            self.score += self.obstacle_destroy_points[obstacle.obstacle_type]
-                        self.obstacles.remove(obstacle)
+                    if target.take_damage(archetype.bullet_damage):
+                        archetype.on_destroyed(target)
+                        archetype.entities.remove(target)
+                    else:
+                        self.sounds.play("hit")
                     break
         
-        # Player bullets vs NiNa's note
-        if self.nina_note:
-            for bullet in self.player.bullets[:]:
-                bullet_rect = bullet.get_rect()
-                if bullet_rect.colliderect(self.nina_note.get_rect()):
-                    self.player.bullets.remove(bullet)
-                    if self.nina_note.take_damage(10):
-                        # Note was found!
-                        self.nina_note_found = True
-                        self.nina_note_message_timer = 180  # Show message for 3 seconds
-                        self.nina_note = None
-                    break
-        
-        # Player drill vs obstacles
+        # Player drill vs drillable entities (obstacles, NiNa's note)
         if self.player.drill_active:
-            drill_rect = pygame.Rect(self.player.x + 15, self.player.y - 10, 10, 15)
-            for obstacle in self.obstacles[:]:
-                if drill_rect.colliderect(obstacle.get_rect()):
-                    if obstacle.take_damage(8):
-                        # Award points for obstacle destruction with drill
-                        if obstacle.obstacle_type in self.obstacle_destroy_points:
-                            self.score += self.obstacle_destroy_points[obstacle.obstacle_type]
-                        self.obstacles.remove(obstacle)
-            
-            # Player drill vs NiNa's note
-            if self.nina_note and drill_rect.colliderect(self.nina_note.get_rect()):
-                if self.nina_note.take_damage(8):
-                    # Note was found!
-                    self.nina_note_found = True
-                    self.nina_note_message_timer = 180  # Show message for 3 seconds
-                    self.nina_note = None
-        
-        # Enemy bullets vs player (from global list)
-        for bullet in self.enemy_bullets[:]:
-            if bullet.get_rect().colliderect(player_rect):
-                self.enemy_bullets.remove(bullet)
-                self.player.take_damage(10)
-        
-        # Static enemy pattern bullets vs player (from global list)
-        for bullet in self.pattern_bullets[:]:
-            if bullet.get_rect().colliderect(player_rect):
-                self.pattern_bullets.remove(bullet)
-                self.player.take_damage(12)
-        
-        # Health orbs vs player
-        for orb in self.health_orbs[:]:
-            if orb.get_rect().colliderect(player_rect):
-                # Heal the player
-                heal_amount = int(self.player.max_health * orb.heal_amount)
-                self.player.health = min(self.player.max_health, self.player.health + heal_amount)
-                self.health_orbs.remove(orb)
-                # Play healing sound effect
-                # self.heal_sound.play()
-        
-        # Enemies vs player
-        for enemy in self.enemies:
-            if enemy.get_rect().colliderect(player_rect):
-                if self.player.take_damage(15):
-                    self.enemies.remove(enemy)
-        
-        # Static enemies vs player
-        for static_enemy in self.static_enemies:
-            if static_enemy.get_rect().colliderect(player_rect):
-                self.player.take_damage(20)
-        
-        # Obstacles vs player (only if not drilling or obstacle is indestructible)
-        for obstacle in self.obstacles:
-            if obstacle.get_rect().colliderect(player_rect):
-                if not self.player.drill_active or obstacle.obstacle_type == "indestructible":
-                    self.player.take_damage(5)
+            drill_rect = self.player.get_drill_rect()
+            for archetype in self.world.drillable:
+                tests += len(archetype.entities)
+                for entity in self.world.hits(drill_rect, archetype):
+                    # Chips fly back past the drill tip
+                    self.sounds.play("drill")
+                    if self.particles:
+                        self.particles.emit(drill_rect.centerx, drill_rect.top, 6, LAYER_THEMES[self.current_layer]["obstacle_color"],
+                                            speed=(1.0, 3.0), life=(10, 25), gravity=0.2,
+                                            direction=math.pi / 2, spread=math.pi)
+                    if entity.take_damage(archetype.drill_damage):
+                        archetype.on_destroyed(entity)
+                        archetype.entities.remove(entity)
+        
+        # Hazards and pickups vs player
+        for archetype in self.world.hazards:
+            tests += len(archetype.entities)
+            for entity in self.world.hits(player_rect, archetype):
+                if archetype.on_contact:
+                    archetype.on_contact(entity)
+                damaged = False
+                if archetype.contact_damage:
+                    # Drilling through destructible obstacles doesn't hurt
+                    if not (archetype.drill_shields and self.player.drill_active and entity.destructible):
+                        damaged = self.player.take_damage(archetype.contact_damage)
+                        if damaged:
+                            self.sounds.play("player_hit")
+                if (archetype.contact_consumes == "always"
+                        or (archetype.contact_consumes == "on_damage" and damaged)):
+                    archetype.entities.remove(entity)
+        
+        self.collision_tests = tests
     
     def restart_from_checkpoint(self):
+        """Restore the snapshot taken when the current layer started"""
+        score = self.score
+        self.restore_checkpoint(self.checkpoints[self.current_layer])
+        self.score = score  # The death penalty and points scored since still count
         self.player.health = self.player.max_health
-        self.player.y = self.checkpoints.get(self.current_layer, SCREEN_HEIGHT - 100)
-        self.player.x = SCREEN_WIDTH // 2
-        #self.enemies.clear()
-        #self.static_enemies.clear()
-        #self.obstacles.clear()
-        self.enemy_bullets.clear()
-        self.pattern_bullets.clear()
-        self.health_orbs.clear()  # Clear health orbs when restarting
         self.orbs_spawned_this_layer = 0  # Reset orb counter
         self.game_over = False
-        self.layer_progress = 0
-        # Reset world position to current layer
-        self.world_y = self.current_layer * self.layer_height
+        self.sounds.restart_music()  # Even if it had faded out in the blend zone
     
     def draw(self):
         # Determine which surface to draw on
         draw_surface = self.base_screen if self.base_screen else self.screen
         
-        # Draw layered background with blending
-        self.background_manager.draw_blended_background(
-            draw_surface, 
-            self.current_layer, 
-            self.layer_progress, 
-            self.layer_height, 
-            self.world_y
-        )
-        
         if self.show_outro:
             self.outro_scene.draw(draw_surface)
             
             # If we're using scaling, scale up the base surface to the screen
             if self.base_screen:
-                scaled_surface = pygame.transform.scale(self.base_screen, 
-                                                      (BASE_WIDTH * SCALE_FACTOR, 
-                                                       BASE_HEIGHT * SCALE_FACTOR))
-                self.screen.blit(scaled_surface, (0, 0))
+                pygame.transform.scale(self.base_screen, self.screen.get_size(), self.screen)
             return
         
         if self.show_conversation:
@@ -1720,10 +4236,7 @@ class Game:
             
             # If we're using scaling, scale up the base surface to the screen
             if self.base_screen:
-                scaled_surface = pygame.transform.scale(self.base_screen, 
-                                                      (BASE_WIDTH * SCALE_FACTOR, 
-                                                       BASE_HEIGHT * SCALE_FACTOR))
-                self.screen.blit(scaled_surface, (0, 0))
+                pygame.transform.scale(self.base_screen, self.screen.get_size(), self.screen)
             return
         
         if self.show_intro:
@@ -1731,10 +4244,7 @@ class Game:
             
             # If we're using scaling, scale up the base surface to the screen
             if self.base_screen:
-                scaled_surface = pygame.transform.scale(self.base_screen, 
-                                                      (BASE_WIDTH * SCALE_FACTOR, 
-                                                       BASE_HEIGHT * SCALE_FACTOR))
-                self.screen.blit(scaled_surface, (0, 0))
+                pygame.transform.scale(self.base_screen, self.screen.get_size(), self.screen)
             return
             
         if self.show_nina_note:
@@ -1742,38 +4252,23 @@ class Game:
             
             # If we're using scaling, scale up the base surface to the screen
             if self.base_screen:
-                scaled_surface = pygame.transform.scale(self.base_screen, 
-                                                      (BASE_WIDTH * SCALE_FACTOR, 
-                                                       BASE_HEIGHT * SCALE_FACTOR))
-                self.screen.blit(scaled_surface, (0, 0))
+                pygame.transform.scale(self.base_screen, self.screen.get_size(), self.screen)
             return
         
+        # Draw layered background with blending
+        self.background_manager.draw_blended_background(
+            draw_surface, 
+            self.current_layer, 
+            self.layer_progress, 
+            self.layer_height, 
+            self.world_y
+        )
+        
         # Draw game objects
         self.player.draw(draw_surface)
-        
-        for enemy in self.enemies:
-            enemy.draw(draw_surface)
-            
-        for static_enemy in self.static_enemies:
-            static_enemy.draw(draw_surface)
-        
-        for obstacle in self.obstacles:
-            obstacle.draw(draw_surface)
-            
-        # Draw NiNa's note if it exists
-        if self.nina_note:
-            self.nina_note.draw(draw_surface)
-            
-        # Draw health orbs
-        for health_orb in self.health_orbs:
-            health_orb.draw(draw_surface)
-            
-        # Draw global bullet lists
-        for bullet in self.enemy_bullets:
-            bullet.draw(draw_surface)
-            
-        for bullet in self.pattern_bullets:
-            bullet.draw(draw_surface)
+        self.world.draw(draw_surface)
+        if self.particles:
+            self.particles.draw(draw_surface)
         
         # Draw UI
         self.draw_ui(draw_surface)
@@ -1781,7 +4276,7 @@ class Game:
         # Draw "Found NiNa's note" message if timer is active
         if self.nina_note_message_timer > 0:
             # Light pink color (255, 182, 193)
-            message_text = self.font.render("Found NiNa's note", True, (255, 182, 193))
+            message_text = TEXT_CACHE.render(self.font, "Found NiNa's note", (255, 182, 193))
             message_rect = message_text.get_rect(center=(SCREEN_WIDTH // 2, 40))
             draw_surface.blit(message_text, message_rect)
         
@@ -1792,10 +4287,7 @@ class Game:
         
         # If we're using scaling, scale up the base surface to the screen
         if self.base_screen:
-            scaled_surface = pygame.transform.scale(self.base_screen, 
-                                                   (BASE_WIDTH * SCALE_FACTOR, 
-                                                    BASE_HEIGHT * SCALE_FACTOR))
-            self.screen.blit(scaled_surface, (0, 0))
+            pygame.transform.scale(self.base_screen, self.screen.get_size(), self.screen)
     
     def draw_intro(self, surface):
         surface.fill(BLACK)
@@ -1820,17 +4312,24 @@ class Game:
         y_offset = 50
         for i, line in enumerate(intro_text):
             if i == 0:  # Title
-                text = self.font.render(line, True, YELLOW)
+                text = TEXT_CACHE.render(self.font, line, YELLOW)
             elif "Controls:" in line or line.startswith("Arrow") or line.startswith("SPACE") or line.startswith("X"):
-                text = self.small_font.render(line, True, GREEN)
+                text = TEXT_CACHE.render(self.small_font, line, GREEN)
             elif line.startswith("Press I"):
-                text = self.small_font.render(line, True, YELLOW)
+                text = TEXT_CACHE.render(self.small_font, line, YELLOW)
             else:
-                text = self.small_font.render(line, True, WHITE)
+                text = TEXT_CACHE.render(self.small_font, line, WHITE)
             
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
             surface.blit(text, text_rect)
             y_offset += 30 if i == 0 else 25
+        
+        # Asset loading progress
+        if self.asset_progress < 1.0:
+            progress_width = 300
+            progress_x = (SCREEN_WIDTH - progress_width) // 2
+            pygame.draw.rect(surface, DARK_GRAY, (progress_x, SCREEN_HEIGHT - 20, progress_width, 4))
+            pygame.draw.rect(surface, WHITE, (progress_x, SCREEN_HEIGHT - 20, progress_width * self.asset_progress, 4))
     
     def draw_ui(self, surface):
         # Health bar
@@ -1841,12 +4340,12 @@ class Game:
         pygame.draw.rect(surface, GREEN, (10, 10, health_bar_width * health_ratio, health_bar_height))
         
         # Health text
-        health_text = self.small_font.render(f"Health: {self.player.health}/{self.player.max_health}", True, WHITE)
+        health_text = TEXT_CACHE.render(self.small_font, f"Health: {self.player.health}/{self.player.max_health}", WHITE)
         surface.blit(health_text, (10, 35))
         
         # Layer info
         layer_name = LAYER_THEMES[self.current_layer]["name"]
-        layer_text = self.small_font.render(f"Layer: {layer_name}", True, WHITE)
+        layer_text = TEXT_CACHE.render(self.small_font, f"Layer: {layer_name}", WHITE)
         surface.blit(layer_text, (10, 60))
         
         # Progress bar
@@ -1857,21 +4356,18 @@ class Game:
         pygame.draw.rect(surface, BLUE, (10, 85, progress_bar_width * progress_ratio, progress_bar_height))
         
         # Score display (top-right corner)
-        score_text = self.font.render(f"Score: {self.score:,}", True, YELLOW)
+        score_text = TEXT_CACHE.render(self.font, f"Score: {self.score:,}", YELLOW)
         score_rect = score_text.get_rect()
         score_rect.topright = (SCREEN_WIDTH - 10, 10)
         surface.blit(score_text, score_rect)
     
     def draw_game_over(self, surface):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        surface.blit(overlay, (0, 0))
+        SHADES.draw(surface, BLACK, 128, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
         
-        game_over_text = self.font.render("SHIP DESTROYED", True, RED)
-        penalty_text = self.small_font.render("-1,000 Point Penalty Applied", True, RED)
-        score_text = self.font.render(f"Current Score: {self.score:,}", True, YELLOW)
-        restart_text = self.small_font.render("Press R to restart from checkpoint", True, WHITE)
+        game_over_text = TEXT_CACHE.render(self.font, "SHIP DESTROYED", RED)
+        penalty_text = TEXT_CACHE.render(self.small_font, "-1,000 Point Penalty Applied", RED)
+        score_text = TEXT_CACHE.render(self.font, f"Current Score: {self.score:,}", YELLOW)
+        restart_text = TEXT_CACHE.render(self.small_font, "Press R to restart from checkpoint", WHITE)
         
         game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 60))
         penalty_rect = penalty_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 30))
@@ -1884,30 +4380,27 @@ class Game:
         surface.blit(restart_text, restart_rect)
     
     def draw_victory(self, surface):
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        surface.blit(overlay, (0, 0))
+        SHADES.draw(surface, BLACK, 128, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
         
-        victory_text = self.large_font.render("ESCAPE SUCCESSFUL!", True, GREEN)
-        success_text = self.small_font.render("You have reached the surface and joined your kind!", True, WHITE)
+        victory_text = TEXT_CACHE.render(self.large_font, "ESCAPE SUCCESSFUL!", GREEN)
+        success_text = TEXT_CACHE.render(self.small_font, "You have reached the surface and joined your kind!", WHITE)
         
         # Calculate score breakdown
         layer_bonus_total = sum(self.layer_completion_bonus[i] for i in self.layers_completed)
         
-        final_score_text = self.font.render(f"FINAL SCORE: {self.score:,}", True, YELLOW)
-        breakdown_text = self.small_font.render(f"Layer Completion Bonuses: {layer_bonus_total:,}", True, WHITE)
+        final_score_text = TEXT_CACHE.render(self.font, f"FINAL SCORE: {self.score:,}", YELLOW)
+        breakdown_text = TEXT_CACHE.render(self.small_font, f"Layer Completion Bonuses: {layer_bonus_total:,}", WHITE)
         combat_score = self.score - layer_bonus_total
-        combat_text = self.small_font.render(f"Combat & Destruction: {combat_score:,}", True, WHITE)
+        combat_text = TEXT_CACHE.render(self.small_font, f"Combat & Destruction: {combat_score:,}", WHITE)
         
         # Victory screen options
-        replay_text = self.small_font.render("Press R to replay the game", True, GREEN)
-        outro_text = self.small_font.render("Press O to view outro", True, YELLOW)
+        replay_text = TEXT_CACHE.render(self.small_font, "Press R to replay the game", GREEN)
+        outro_text = TEXT_CACHE.render(self.small_font, "Press O to view outro", YELLOW)
         
         # Add NiNa's note option if found
         if self.nina_note_found:
             # Light pink color (255, 182, 193)
-            nina_note_text = self.small_font.render("Press N to read NiNa's note", True, (255, 182, 193))
+            nina_note_text = TEXT_CACHE.render(self.small_font, "Press N to read NiNa's note", (255, 182, 193))
         
         # Position all text elements
         victory_rect = victory_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
@@ -1936,7 +4429,7 @@ class Game:
         surface.fill(BLACK)
         
         # Title
-        title_text = self.font.render("NiNa's Note", True, (255, 182, 193))  # Light pink
+        title_text = TEXT_CACHE.render(self.font, "NiNa's Note", (255, 182, 193))  # Light pink
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 100))
         surface.blit(title_text, title_rect)
         
@@ -1951,32 +4444,196 @@ class Game:
         
         y_offset = 180
         for line in note_lines:
-            line_text = self.small_font.render(line, True, WHITE)
+            line_text = TEXT_CACHE.render(self.small_font, line, WHITE)
             line_rect = line_text.get_rect(center=(SCREEN_WIDTH // 2, y_offset))
             surface.blit(line_text, line_rect)
             y_offset += 30
         
         # Coordinates (blinking effect)
         if pygame.time.get_ticks() % 1000 < 500:  # Blink every half second
-            coords_text = self.font.render("X-7721.Y-9043.Z-1138", True, (255, 182, 193))  # Light pink
+            coords_text = TEXT_CACHE.render(self.font, "X-7721.Y-9043.Z-1138", (255, 182, 193))  # Light pink
             coords_rect = coords_text.get_rect(center=(SCREEN_WIDTH // 2, y_offset + 20))
             surface.blit(coords_text, coords_rect)
         
         # Return instruction
-        back_text = self.small_font.render("Press any key to return", True, GRAY)
+        back_text = TEXT_CACHE.render(self.small_font, "Press any key to return", GRAY)
         back_rect = back_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
         surface.blit(back_text, back_rect)
     
+    def record_telemetry(self, frame, frame_ms):
+        self.telemetry.record(frame, frame_ms, self.collision_tests, self.score, self.current_layer,
+                              self.player.health, self.governor.level if self.governor else len(QUALITY_FEATURES))
+    
     def run(self):
+        first_frame = True
+        frame = 0
+        if self.surface_tracker:
+            self.surface_tracker.discard_frame()  # Start-up
         while self.running:
+            frame_start = time.perf_counter()
             self.handle_events()
             self.update()
             self.draw()
+            if self.capture:
+                self.capture.capture(self.base_screen or self.screen)
             pygame.display.flip()
+            frame_ms = (time.perf_counter() - frame_start) * 1000
+            if self.governor:
+                self.governor.record(frame_ms)
+            if self.telemetry:
+                self.record_telemetry(frame, frame_ms)
+            if self.surface_tracker:
+                self.surface_tracker.end_frame(frame)
+            if first_frame:
+                print(f"First frame after {(time.perf_counter() - START_TIME) * 1000:.0f} ms")
+                first_frame = False
+            frame += 1
             self.clock.tick(FPS)
-        
+        self.close()
+    
+    def close(self):
+        if self.telemetry:
+            self.telemetry.close()
+        if self.capture:
+            self.capture.close()
+        self.save_store.close()
+        if self.checkpoint_writer:
+            self.checkpoint_writer.close()
+        self.sounds.close()
+        if self.surface_tracker:
+            self.surface_tracker.report()
+            self.surface_tracker.uninstall()
+        if self.config.memory_budget:
+            MEMORY.report()
+        # The caches registered here go with the game
+        for name in ("atlas", "backgrounds", "particles"):
+            MEMORY.unregister(name)
+        MEMORY.max_bytes, MEMORY.policy = self.previous_memory
         pygame.quit()
 
-if __name__ == "__main__":
-    game = Game()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='ZT Miner - Chapter I: The Escape')
+    parser.add_argument('--scale', type=int, choices=[1, 2, 4],
+                        help='Scale factor for the game window (1, 2, or 4); remembered for next time')
+    parser.add_argument('--bake', action='store_true',
+                        help='Write the pre-scaled asset bundle and exit')
+    parser.add_argument('--seed', type=int,
+                        help='Seed for the level timelines (random by default)')
+    parser.add_argument('--level', metavar='FILE',
+                        help='Play the level timelines in a JSON file')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='Keep layer checkpoints in FILE and resume from it on start')
+    parser.add_argument('--fixed-quality', action='store_true',
+                        help='Always draw every effect, even when frames run over budget')
+    parser.add_argument('--track-surfaces', type=float, nargs='?', const=0, metavar='KB',
+                        help='Debug: count the Surfaces created every frame by call site and flag '
+                             'frames that create more than KB of them (default 0)')
+    parser.add_argument('--memory-budget', type=float, metavar='MB',
+                        help=f'Megabytes kept in caches and backgrounds (default {MEMORY_BUDGET // 1048576}); '
+                             'usage per cache is printed on exit')
+    parser.add_argument('--memory-policy', choices=['lru', 'cost'], default='lru',
+                        help='Evict the least recently used entry, or the one that frees the most '
+                             'memory for the least work to rebuild')
+    parser.add_argument('--preload-backgrounds', action='store_true',
+                        help='Decode every layer background at start instead of streaming them')
+    parser.add_argument('--mute', action='store_true',
+                        help='Play without sound effects or music')
+    parser.add_argument('--capture', metavar='DIR',
+                        help='Record every frame to DIR as an image sequence')
+    parser.add_argument('--capture-format', choices=['png', 'raw'], default='png',
+                        help='Image format for --capture (raw is RGB bytes, described by capture.json)')
+    parser.add_argument('--capture-policy', choices=['drop', 'block'], default='drop',
+                        help='When the encoders fall behind, drop frames or slow the game down')
+    parser.add_argument('--telemetry', metavar='FILE',
+                        help='Log per-frame timings, entity counts and score to FILE')
+    parser.add_argument('--export-telemetry', nargs=2, metavar=('FILE', 'OUT'),
+                        help='Convert a telemetry log to OUT (.csv, or .npy with NumPy) and exit')
+    parser.add_argument('--dump-level', metavar='FILE',
+                        help='Write the compiled level timelines to a JSON file and exit')
+    parser.add_argument('--check-level', metavar='FILE',
+                        help='Validate a level timeline JSON file and exit')
+    parser.add_argument('--check-formations', nargs='?', const=FORMATION_FILE, metavar='FILE',
+                        help='Validate the formation library and check every formation is passable, then exit')
+    return parser.parse_args(argv)
+
+def dump_levels(path, seed):
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    levels = compile_levels(seed, LAYER_HEIGHT, SCROLL_SPEED)
+    save_levels(path, levels, seed)
+    for timeline in levels:
+        kinds = {}
+        for event in timeline.events:
+            kinds[event["kind"]] = kinds.get(event["kind"], 0) + 1
+        summary = ", ".join(f"{count} {kind}" for kind, count in kinds.items())
+        print(f"Layer {timeline.layer}: {summary}")
+    print(f"Wrote seed {seed} to {path}")
+
+def check_formations(path):
+    try:
+        library = FormationLibrary.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Invalid formation library: {e}")
+        return False
+    passable = True
+    for template in library.templates.values():
+        opening, verdict = template.passability()
+        print(f"{template.name:<12} {template.kind:<5} narrowest opening {opening:>3} px  {verdict}")
+        if verdict == "blocked":
+            passable = False
+    if not passable:
+        print("Some formations can block a 40 px ship")
+    return passable
+
+def check_levels(path):
+    try:
+        load_levels(path, LAYER_HEIGHT)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Invalid level file: {e}")
+        return False
+    print(f"{path} is valid")
+    return True
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    if args.bake:
+        # Converting images needs a display mode, but no visible window
+        pygame.display.init()
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        bake_asset_bundle()
+        pygame.quit()
+        return
+    
+    if args.export_telemetry:
+        path, out_path = args.export_telemetry
+        if out_path.endswith(".npy"):
+            np.save(out_path, telemetry_to_numpy(path))
+        else:
+            telemetry_to_csv(path, out_path)
+        return
+    if args.dump_level:
+        dump_levels(args.dump_level, args.seed)
+        return
+    if args.check_level:
+        if not check_levels(args.check_level):
+            raise SystemExit(1)
+        return
+    if args.check_formations:
+        if not check_formations(args.check_formations):
+            raise SystemExit(1)
+        return
+    
+    game = Game(GameConfig(scale=args.scale, seed=args.seed, level_file=args.level,
+                           checkpoint_file=args.checkpoint, telemetry_file=args.telemetry,
+                           adaptive_quality=not args.fixed_quality, capture_dir=args.capture,
+                           capture_format=args.capture_format, capture_policy=args.capture_policy,
+                           sound=not args.mute,
+                           surface_budget=None if args.track_surfaces is None else int(args.track_surfaces * 1024),
+                           memory_budget=args.memory_budget and int(args.memory_budget * 1048576),
+                           memory_policy=args.memory_policy,
+                           stream_backgrounds=not args.preload_backgrounds))
     game.run()
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ a = Analysis(
     ['zt_miner.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('res/formations.json', 'res')],  # Required at startup, unlike the other assets
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},